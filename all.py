@@ -9,46 +9,157 @@ Version: 2.0.0
 This script handles PDF translation with Arabic text support.
 """
 
-from reportlab.lib.pagesizes import letter, A4
-import pdfplumber
-import pytesseract
-from pdf2image import convert_from_path
-from googletrans import Translator
 import re
 import logging
-from PIL import Image, ImageFont, ImageDraw, ImageEnhance, ImageFilter
 import os
 from pathlib import Path
 import shutil
 from datetime import datetime
-from typing import List, Dict, Optional, Union, Tuple, Any, Set
-from reportlab.pdfgen import canvas
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont
+from typing import List, Dict, Optional, Union, Tuple, Any, Set, NamedTuple
 import tempfile
-from PyPDF2 import PdfReader, PdfWriter
 from io import BytesIO
-import arabic_reshaper
-from bidi.algorithm import get_display
 import sys
 import time
 import json
-from tqdm import tqdm
 import urllib.request
 import logging.handlers
 import threading
-from concurrent.futures import ThreadPoolExecutor, as_completed
-import requests
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
 import hashlib
+import functools
 import atexit
-from collections import defaultdict
+import mmap
+from array import array
+from collections import Counter, defaultdict, OrderedDict
+from operator import attrgetter, itemgetter
 import subprocess
+import queue
 from typing import Dict, List, Optional, Tuple
 import argparse
 from dataclasses import dataclass
+from types import MappingProxyType
 import gc
 import warnings
 from text_block_manager import TextBlockManager  # استيراد TextBlockManager
+try:
+    import orjson
+except ImportError:
+    orjson = None
+try:
+    import re2
+except ImportError:
+    re2 = None
+try:
+    import pypdfium2 as pdfium
+except ImportError:
+    pdfium = None
+try:
+    import numpy as np
+except ImportError:
+    np = None
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+try:
+    import psutil
+except ImportError:
+    psutil = None
+try:
+    import cv2
+except ImportError:
+    cv2 = None
+
+
+# حجم صفحة الذاكرة لتحويل قراءات /proc/self/statm إلى بايتات
+try:
+    _PAGESIZE = os.sysconf('SC_PAGE_SIZE')
+except (AttributeError, ValueError, OSError):
+    _PAGESIZE = 4096
+
+# كائن psutil.Process للعملية الحالية (يُعاد إنشاؤه فقط بعد fork)
+_psutil_process = None
+
+
+def _current_process():
+    """الحصول على كائن psutil.Process المخزن للعملية الحالية"""
+    global _psutil_process
+    if _psutil_process is None or _psutil_process.pid != os.getpid():
+        _psutil_process = psutil.Process()
+    return _psutil_process
+
+
+def _json_loads(data: Union[bytes, str]) -> Any:
+    """تحليل JSON عبر orjson عند توفره مع الرجوع إلى json القياسية"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _json_dumps(obj: Any) -> bytes:
+    """تحويل كائن إلى JSON مضغوط (بدون مسافات بادئة) عبر orjson عند توفره"""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def _json_default(obj: Any) -> Any:
+    """تحويل التواريخ إلى ISO 8601 (كما يفعل orjson تلقائياً) والمسارات إلى نصوص"""
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    if isinstance(obj, Path):
+        return str(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _json_dumps_pretty(obj: Any) -> bytes:
+    """تحويل كائن إلى JSON منسق للقراءة (التقارير) عبر orjson عند توفره"""
+    if orjson is not None:
+        return orjson.dumps(obj, default=_json_default,
+                            option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, ensure_ascii=False, indent=2, default=_json_default).encode('utf-8')
+
+
+def _load_json_file(path: Path) -> Any:
+    """تحميل ملف JSON عبر mmap دون قراءته كاملاً في ذاكرة بايثون"""
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return None
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if orjson is not None:
+                with memoryview(mm) as view:
+                    return orjson.loads(view)
+            return json.loads(mm[:])
+
+
+def _compile_linear(pattern: str):
+    """تجميع النمط عبر re2 (مطابقة خطية دون تراجع) عند توفره، وإلا عبر re"""
+    if re2 is not None:
+        try:
+            return re2.compile(pattern)
+        except Exception:
+            pass
+    return re.compile(pattern)
+
+
+def _get_translator():
+    """إنشاء مترجم Google مع تأجيل استيراد المكتبة حتى الحاجة إليها"""
+    from googletrans import Translator
+    return Translator()
+
+
+@functools.lru_cache(maxsize=None)
+def _get_reshaper():
+    """إنشاء مُشكّل النص العربي مرة واحدة (مع الإبقاء على الحركات)"""
+    import arabic_reshaper
+    return arabic_reshaper.ArabicReshaper(configuration={'delete_harakat': False})
+
+
+@functools.lru_cache(maxsize=50_000)
+def _shape_bidi(text: str) -> str:
+    """إعادة تشكيل النص العربي وترتيبه للعرض مع حفظ النتائج المتكررة"""
+    from bidi.algorithm import get_display
+    return get_display(_get_reshaper().reshape(text))
 
 # تجاهل تحذيرات الخطوط غير الضرورية
 warnings.filterwarnings('ignore', category=UserWarning, 
@@ -69,6 +180,66 @@ MOVE_PATTERNS = {
     'mate': r'#'
 }
 
+# أنماط مجمّعة مسبقاً لمسارات معالجة الكتل المتكررة
+# (أنماط الشطرنج عبر re2 عند توفره؛ الأنماط ذات النظر الخلفي/الأمامي تبقى على re)
+_BLANK_LINES_RE = re.compile(r'\n\s*\n')
+_CASTLING_RE = _compile_linear(r'O-O-O|O-O')
+_CASTLING_NAMES = {'O-O-O': 'تبييت طويل', 'O-O': 'تبييت قصير'}
+_PIECE_MOVE_RE = _compile_linear(r'([KQRBN])?([a-h][1-8])')
+_CAPTURE_RE = _compile_linear(r'x')
+_PROMOTION_RE = _compile_linear(r'=([QRBN])')
+_WHITESPACE_RE = re.compile(r'\s+')
+_PUNCT_SPACE_BEFORE_RE = re.compile(r'\s+([.,!?:;])')
+_PUNCT_SPACE_AFTER_RE = re.compile(r'([.,!?:;])(?!\s)')
+_QUOTE_RE = re.compile(r'(?<!["\'"])"(?!["\'""])')
+_PAREN_OPEN_SPACE_RE = re.compile(r'\(\s+')
+_PAREN_CLOSE_SPACE_RE = re.compile(r'\s+\)')
+_PAREN_SPLIT_RE = re.compile(r'([()])')
+# فحص سريع: هل يحتوي النص على ما تعالجه خطوات تنسيق الترقيم؟
+_PUNCT_PROBE_RE = re.compile(r'[.,!?:;()"]')
+_ANNOTATION_RE = _compile_linear(r'\?\?|!!|\?!|!\?|!|\?')
+_ANNOTATION_NAMES = {
+    '!!': 'نقلة ممتازة',
+    '!': 'نقلة جيدة',
+    '??': 'خطأ فادح',
+    '?': 'نقلة ضعيفة',
+    '!?': 'نقلة مثيرة للاهتمام',
+    '?!': 'نقلة مشكوك فيها'
+}
+_CTRL_CHARS_RE = re.compile(r'[\x00-\x08\x0B\x0C\x0E-\x1F\x7F-\x9F]')
+# فحص سريع: هل يحتوي النص على محارف تحكم أو أقواس أو أرقام عربية تحتاج إلى تنظيف؟
+_CLEAN_PROBE_RE = re.compile(r'[\x00-\x08\x0B\x0C\x0E-\x1F\x7F-\x9F「」『』٠-٩]')
+# كشف الحروف العربية (النطاق الأساسي، والنطاقات الممتدة لتحديد الاتجاه)
+_ARABIC_RE = re.compile(r'[\u0600-\u06FF]')
+_ARABIC_EXTENDED_RE = re.compile(r'[\u0600-\u06FF\u0750-\u077F\u08A0-\u08FF]')
+_LATIN_RE = re.compile(r'[a-zA-Z]')
+# أنماط تنظيف نصوص PDFTextProcessor
+_BADCHAR_RE = re.compile(r'[^\w\s\.\,\!\?\;\:\-\(\)\[\]\{\}\'\"\،\؛\؟]')
+_PUNCT_RUN_RE = re.compile(r'[\.\,\!\?\;\:\-]{2,}')
+_EMPTY_BRACKETS_RE = re.compile(r'\(\s*\)|\[\s*\]|\{\s*\}')
+_SENTENCE_BREAK_RE = re.compile(r'(?<=[.!?])\s+')
+_LIST_ITEM_RE = re.compile(r'^\s*[\-\*\•\d]+\.?\s')
+# أنماط الحركات الخاصة في ChessNotationProcessor (تُدمج مع أسماء القطع والمصطلحات في نمط واحد)
+_SPECIAL_MOVES_PATTERN = (
+    r'(?P<long>O-O-O)'                          # التبييت الطويل
+    r'|(?P<short>O-O(?!-O))'                    # التبييت القصير
+    r'|(?P<capture>(?P<src>\w+)x(?P<dst>\w+))'  # الأسر
+)
+# محارف مخططات الشطرنج
+_DIAGRAM_CHARS = frozenset('♔♕♖♗♘♙♚♛♜♝♞♟.|-+')
+# فاصل لدمج عدة نصوص وتنظيفها بتمريرة واحدة (محرف غير مستخدم في النصوص)
+_CLEAN_SEP = '\uffff'
+# جدول توحيد الأقواس والأرقام العربية لاستخدامه مع str.translate
+_CLEAN_TEXT_TT = str.maketrans({
+    '「': '"', '」': '"', '『': '"', '』': '"',
+    **{ar: en for ar, en in zip('٠١٢٣٤٥٦٧٨٩', '0123456789')}
+})
+
+
+def _has_arabic(text: str) -> bool:
+    """التحقق من وجود حرف عربي (النص ASCII بالكامل يُستبعد فوراً دون تشغيل النمط)"""
+    return not text.isascii() and _ARABIC_EXTENDED_RE.search(text) is not None
+
 # === تهيئة النظام والثوابت ===
 SYSTEM_CONFIG = {
     'creation_date': '2025-01-24 16:56:48',
@@ -87,6 +258,9 @@ class ConfigManager:
     DEFAULT_VERSION = "2.0.0"
     DEFAULT_MEMORY_THRESHOLD = 1024  # بالميجابايت
     DEFAULT_MAX_FILE_SIZE = 100 * 1024 * 1024  # 100 ميجابايت
+
+    # مستمع طابور السجلات المشترك (يُنشأ مرة واحدة)
+    _log_listener = None
     
     def __init__(self):
         """تهيئة مدير الإعدادات"""
@@ -123,9 +297,20 @@ class ConfigManager:
             'fonts': self.base_dir / 'fonts'
         }
         
-        # إنشاء المجلدات
+        # إنشاء المجلدات: مجموعة فريدة تشمل الآباء مرتبة حسب العمق، مع
+        # استدعاء os.mkdir واحد لكل مجلد بدلاً من mkdir(parents=True) لكل مسار
+        existing_ancestors = set(self.base_dir.parents)
+        needed = set()
         for dir_path in dirs.values():
-            dir_path.mkdir(parents=True, exist_ok=True)
+            for path in (dir_path, *dir_path.parents):
+                if path in existing_ancestors:
+                    break
+                needed.add(path)
+        for dir_path in sorted(needed, key=lambda p: len(p.parts)):
+            try:
+                os.mkdir(dir_path)
+            except FileExistsError:
+                pass
             
         return dirs
     
@@ -136,6 +321,7 @@ class ConfigManager:
             'user': self.user,
             'memory_threshold': self.DEFAULT_MEMORY_THRESHOLD,
             'max_file_size': self.DEFAULT_MAX_FILE_SIZE,
+            'strict_validate': False,
             'font_paths': [
                 str(self.dirs['fonts'] / 'Amiri-Regular.ttf'),
                 '/usr/share/fonts/truetype/fonts-arabeyes/ae_AlArabiya.ttf',
@@ -152,7 +338,9 @@ class ConfigManager:
             'translation': {
                 'batch_size': 10,
                 'timeout': 30,
-                'retries': 3
+                'retries': 3,
+                'source_lang': 'en',
+                'target_lang': 'ar'
             },
             'output': {
                 'dpi': 300,
@@ -168,9 +356,8 @@ class ConfigManager:
 
         try:
             if self.config_path.exists():
-                with open(self.config_path, 'r', encoding='utf-8') as f:
-                    loaded_config = json.load(f)
-                    return {**default_config, **loaded_config}
+                loaded_config = _load_json_file(self.config_path) or {}
+                return {**default_config, **loaded_config}
             return default_config
         except Exception as e:
             logging.error(f"خطأ في تحميل ملف الإعدادات: {e}")
@@ -192,16 +379,27 @@ class ConfigManager:
 
     def _setup_logging(self):
         """إعداد نظام التسجيل"""
+        if ConfigManager._log_listener is not None:
+            return
+
         log_file = self.dirs['logs'] / f"config_{datetime.now().strftime('%Y%m%d')}.log"
-        
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.FileHandler(log_file),
-                logging.StreamHandler()
-            ]
+        formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+        handlers = [logging.FileHandler(log_file), logging.StreamHandler()]
+        for handler in handlers:
+            handler.setFormatter(formatter)
+
+        # الكتابة الفعلية تتم في خيط خلفي؛ الاستدعاء يضيف السجل إلى الطابور فقط
+        log_queue = queue.SimpleQueue()
+        listener = logging.handlers.QueueListener(
+            log_queue, *handlers, respect_handler_level=True
         )
+        listener.start()
+        atexit.register(listener.stop)
+
+        root_logger = logging.getLogger()
+        root_logger.handlers = [logging.handlers.QueueHandler(log_queue)]
+        root_logger.setLevel(logging.INFO)
+        ConfigManager._log_listener = listener
 
     def get(self, key: str, default: Any = None) -> Any:
         """الحصول على قيمة إعداد معين"""
@@ -252,52 +450,199 @@ class ConfigManager:
     def max_file_size(self) -> int:
         """الحصول على الحد الأقصى لحجم الملف"""
         return self.config.get('max_file_size', self.DEFAULT_MAX_FILE_SIZE)
+
+    @property
+    def strict_validate(self) -> bool:
+        """التحقق الصارم من ملفات PDF (المرور على شجرة الصفحات كاملة)"""
+        return self.config.get('strict_validate', False)
         
 
 class CacheManager:
     """إدارة التخزين المؤقت للترجمات"""
     
+    # الحد الأقصى لعدد النصوص في الذاكرة السريعة
+    MEM_CACHE_SIZE = 100_000
+    # عدد عمليات الكتابة قبل الحفظ على القرص
+    FLUSH_EVERY = 256
+    # اللغة الهدف التي تُخزن ترجماتها بمفتاح النص وحده (توافقاً مع الملفات السابقة)
+    DEFAULT_TARGET_LANG = 'ar'
+    
     def __init__(self):
         self.cache_dir = Path(__file__).parent / 'cache'
         self.cache_dir.mkdir(exist_ok=True)
-        self.cache_file = self.cache_dir / 'translations.json'
-        self.cache = self.load_cache()
+        # سجل إلحاقي: سطر JSON واحد {hash: text} لكل ترجمة
+        self.cache_file = self.cache_dir / 'translations.jsonl'
+        self.legacy_cache_file = self.cache_dir / 'translations.json'
         self.lock = threading.Lock()
+        # يسلسل أخذ اللقطة مع كتابتها: لا تُكتب لقطة أقدم فوق ما أُلحق بعدها
+        self._io_lock = threading.Lock()
+        # ذاكرة LRU مفهرسة بـ (اللغة الهدف، النص الخام) لتجنب إعادة الترميز والتجزئة
+        self._mem_cache: OrderedDict = OrderedDict()
+        # الترجمات التي لم تُلحق بالملف بعد
+        self._pending: Dict[str, str] = {}
+        self._needs_rewrite = False
+        self._dirty = False
+        self._writes_since_flush = 0
+        self.cache = self.load_cache()
+        # حفظ التغييرات المتبقية عند إنهاء البرنامج
+        atexit.register(self.save_cache)
 
     def load_cache(self) -> Dict[str, str]:
         """تحميل الترجمات المخزنة مؤقتاً"""
         try:
             if self.cache_file.exists():
-                with open(self.cache_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
+                cache = {}
+                with open(self.cache_file, 'rb') as f:
+                    if os.fstat(f.fileno()).st_size == 0:
+                        return cache
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                        for line in iter(mm.readline, b''):
+                            line = line.strip()
+                            if not line:
+                                continue
+                            try:
+                                for key, value in _json_loads(line).items():
+                                    cache[sys.intern(key)] = sys.intern(value)
+                            except (ValueError, TypeError, AttributeError):
+                                # تجاهل سطر ناقص ناتج عن انقطاع الكتابة
+                                logging.warning("تم تجاهل سطر تالف في ذاكرة الترجمات المؤقتة")
+                return cache
+
+            if self.legacy_cache_file.exists():
+                # ترحيل الملف القديم إلى الصيغة الإلحاقية عند أول حفظ
+                cache = _load_json_file(self.legacy_cache_file) or {}
+                self._needs_rewrite = True
+                self._dirty = bool(cache)
+                return cache
             return {}
         except Exception as e:
             logging.error(f"خطأ في تحميل الذاكرة المؤقتة: {e}")
             return {}
 
+    @staticmethod
+    def _dump_line(key: str, value: str) -> bytes:
+        """تحويل ترجمة واحدة إلى سطر JSONL"""
+        return _json_dumps({key: value}) + b'\n'
+
     def save_cache(self) -> bool:
-        """حفظ الترجمات في الذاكرة المؤقتة"""
+        """حفظ الترجمات في الذاكرة المؤقتة (إلحاق الجديد فقط عند وجود تغييرات)"""
+        with self._io_lock:
+            return self._write_snapshot()
+
+    def _write_snapshot(self) -> bool:
+        """أخذ لقطة من التغييرات وكتابتها على القرص (يُستدعى وقفل الإدخال والإخراج مأخوذ)"""
+        rewrite = False
+        entries = {}
         try:
             with self.lock:
-                with open(self.cache_file, 'w', encoding='utf-8') as f:
-                    json.dump(self.cache, f, ensure_ascii=False, indent=4)
+                if not self._dirty:
+                    return True
+                if self._pending:
+                    # نشر نسخة جديدة من القاموس دفعة واحدة (نسخ عند الكتابة)؛
+                    # القراء يرون إما النسخة القديمة أو الجديدة كاملة
+                    self.cache = {**self.cache, **self._pending}
+                rewrite = self._needs_rewrite
+                entries = self.cache if rewrite else self._pending
+                self._pending = {}
+                self._needs_rewrite = False
+                self._dirty = False
+                self._writes_since_flush = 0
+
+            data = b''.join(self._dump_line(k, v) for k, v in entries.items())
+            if rewrite:
+                # إعادة كتابة كاملة وذرية (بعد المسح أو الترحيل)
+                tmp_file = self.cache_file.with_suffix('.jsonl.tmp')
+                with open(tmp_file, 'wb') as f:
+                    f.write(data)
+                os.replace(tmp_file, self.cache_file)
+            elif data:
+                with open(self.cache_file, 'ab') as f:
+                    f.write(data)
             return True
         except Exception as e:
+            with self.lock:
+                if rewrite:
+                    self._needs_rewrite = True
+                else:
+                    self._pending = {**entries, **self._pending}
+                self._dirty = True
             logging.error(f"خطأ في حفظ الذاكرة المؤقتة: {e}")
             return False
 
-    def get_translation(self, text: str) -> Optional[str]:
+    @classmethod
+    def _hash_text(cls, text: Union[str, bytes]) -> str:
+        """حساب مفتاح التخزين للنص (SHA-256 المسرّع عتادياً عبر OpenSSL)"""
+        data = text if isinstance(text, bytes) else text.encode('utf-8')
+        return hashlib.sha256(data).digest()[:16].hex()
+
+    @classmethod
+    def _cache_key(cls, text: str, target_lang: str) -> str:
+        """مفتاح التخزين لترجمة النص إلى لغة معينة"""
+        if target_lang == cls.DEFAULT_TARGET_LANG:
+            return cls._hash_text(text)
+        return cls._hash_text(f"{target_lang}\x1f{text}")
+
+    @staticmethod
+    def _legacy_hash_text(text: str) -> str:
+        """مفتاح MD5 القديم للتوافق مع ملفات الذاكرة المؤقتة السابقة"""
+        return hashlib.md5(text.encode()).hexdigest()
+
+    def _remember(self, mem_key: Tuple[str, str], translation: str) -> None:
+        """إضافة ترجمة إلى ذاكرة LRU مع إزالة الأقدم عند الامتلاء (يُستدعى والقفل مأخوذ)"""
+        self._mem_cache[mem_key] = translation
+        self._mem_cache.move_to_end(mem_key)
+        while len(self._mem_cache) > self.MEM_CACHE_SIZE:
+            self._mem_cache.popitem(last=False)
+
+    def get_translation(self, text: str, target_lang: str = DEFAULT_TARGET_LANG) -> Optional[str]:
         """الحصول على ترجمة مخزنة"""
-        text_hash = hashlib.md5(text.encode()).hexdigest()
-        return self.cache.get(text_hash)
-
-    def store_translation(self, text: str, translation: str) -> bool:
+        mem_key = (target_lang, text)
+        with self.lock:
+            translation = self._mem_cache.get(mem_key)
+            if translation is not None:
+                self._mem_cache.move_to_end(mem_key)
+                return translation
+
+        text_hash = self._cache_key(text, target_lang)
+        # قراءة الترجمات المعلقة قبل القاموس المنشور: النشر يستبدل القاموس
+        # أولاً ثم يفرغ المعلقات، فلا تضيع ترجمة بين المرجعين
+        pending = self._pending
+        cache = self.cache
+        translation = pending.get(text_hash)
+        if translation is None:
+            translation = cache.get(text_hash)
+        migrated = False
+        if translation is None and target_lang == self.DEFAULT_TARGET_LANG:
+            # البحث بالمفتاح القديم وترحيله إلى المفتاح الجديد
+            translation = cache.get(self._legacy_hash_text(text))
+            migrated = translation is not None
+        if translation is not None:
+            with self.lock:
+                if migrated:
+                    self._pending[text_hash] = translation
+                    self._dirty = True
+                self._remember(mem_key, translation)
+        return translation
+
+    def store_translation(self, text: str, translation: str,
+                          target_lang: str = DEFAULT_TARGET_LANG) -> bool:
         """تخزين ترجمة جديدة"""
         try:
+            text_hash = self._cache_key(text, target_lang)
+            # مشاركة كائن واحد بين الترجمات المتطابقة المتكررة
+            if isinstance(translation, str):
+                translation = sys.intern(translation)
             with self.lock:
-                text_hash = hashlib.md5(text.encode()).hexdigest()
-                self.cache[text_hash] = translation
+                # الكتابة في المعلقات فقط؛ تُنشر في self.cache عند الحفظ
+                self._pending[text_hash] = translation
+                self._remember((target_lang, text), translation)
+                self._dirty = True
+                self._writes_since_flush += 1
+                should_flush = self._writes_since_flush >= self.FLUSH_EVERY
+            # الحفظ خارج القفل لتجنب الانتظار المتبادل مع save_cache
+            if should_flush:
                 return self.save_cache()
+            return True
         except Exception as e:
             logging.error(f"خطأ في تخزين الترجمة: {e}")
             return False
@@ -307,7 +652,11 @@ class CacheManager:
         try:
             with self.lock:
                 self.cache = {}
-                return self.save_cache()
+                self._mem_cache.clear()
+                self._pending = {}
+                self._needs_rewrite = True
+                self._dirty = True
+            return self.save_cache()
         except Exception as e:
             logging.error(f"خطأ في مسح الذاكرة المؤقتة: {e}")
             return False   
@@ -316,7 +665,37 @@ class CacheManager:
 class FontManager:
     """إدارة الخطوط وتحميلها"""
     
+    # جلسة HTTP مشتركة لإعادة استخدام اتصالات TCP/TLS بين التحميلات
+    _session = None
+    _session_lock = threading.Lock()
+    # مهلة الاتصال ومهلة القراءة بالثواني
+    DOWNLOAD_TIMEOUT = (5, 30)
+
+    @classmethod
+    def _get_session(cls) -> 'requests.Session':
+        """الحصول على جلسة HTTP المشتركة وإنشاؤها عند أول استخدام"""
+        if cls._session is None:
+            import requests
+            from urllib3.util.retry import Retry
+            with cls._session_lock:
+                if cls._session is None:
+                    session = requests.Session()
+                    # إعادة المحاولة مع تراجع أُسّي للأخطاء المؤقتة على مستوى النقل
+                    retries = Retry(
+                        total=3,
+                        backoff_factor=0.3,
+                        status_forcelist=[429, 502, 503, 504]
+                    )
+                    adapter = requests.adapters.HTTPAdapter(
+                        pool_connections=4, pool_maxsize=4, max_retries=retries
+                    )
+                    session.mount('https://', adapter)
+                    session.mount('http://', adapter)
+                    cls._session = session
+        return cls._session
+
     def __init__(self, config_manager: ConfigManager):
+        from reportlab.pdfbase import pdfmetrics
         self.logger = logging.getLogger(__name__)
         self.config = config_manager
         self.font_name: str = "ArabicFont"
@@ -324,6 +703,8 @@ class FontManager:
         self.base_path = Path(__file__).parent
         self.fonts_dir = self.base_path / "fonts"
         self.fonts_dir.mkdir(exist_ok=True)
+        # نسخة محلية من أسماء الخطوط المسجلة لتجنب الاستعلام المتكرر من reportlab
+        self._registered_fonts: Set[str] = set(pdfmetrics.getRegisteredFontNames())
         self._setup_fonts()
 
     def _setup_fonts(self) -> None:
@@ -334,6 +715,8 @@ class FontManager:
 
     def register_default_fonts(self) -> None:
         """تسجيل الخطوط الافتراضية"""
+        from reportlab.pdfbase import pdfmetrics
+        from reportlab.pdfbase.ttfonts import TTFont
         default_fonts = [
             ('Helvetica', 'Helvetica'),
             ('Helvetica-Bold', 'Helvetica-Bold'),
@@ -341,12 +724,50 @@ class FontManager:
             ('Times-Bold', 'Times-Bold')
         ]
         for font_name, font_path in default_fonts:
-            if font_name not in pdfmetrics.getRegisteredFontNames():
+            if font_name not in self._registered_fonts:
                 try:
                     pdfmetrics.registerFont(TTFont(font_name, font_path))
+                    self._registered_fonts.add(font_name)
                 except Exception as e:
                     self.logger.warning(f"فشل تسجيل الخط {font_name}: {e}")
 
+    # نتائج البحث عن الخطوط مشتركة بين النسخ:
+    # {(المجلد، الكلمات): ({كل مجلد فرعي ممسوح: وقت تعديله}، الخطوط)}
+    _FOUND_FONTS: Dict[Tuple[str, Tuple[str, ...]], Tuple[Dict[str, float], List[str]]] = {}
+    FONT_EXTENSIONS = frozenset({'.ttf', '.otf'})
+
+    @classmethod
+    def _walk_fonts(cls, root: str, dir_mtimes: Optional[Dict[str, float]] = None):
+        """البحث التكراري عن ملفات الخطوط باستخدام os.scandir (مع تسجيل وقت تعديل كل مجلد ممسوح)"""
+        stack = [root]
+        while stack:
+            directory = stack.pop()
+            try:
+                if dir_mtimes is not None:
+                    dir_mtimes[directory] = os.stat(directory).st_mtime
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                stack.append(entry.path)
+                            elif os.path.splitext(entry.name)[1].lower() in cls.FONT_EXTENSIONS:
+                                yield entry.path
+                        except OSError:
+                            continue
+            except OSError:
+                continue
+
+    @staticmethod
+    def _dirs_unchanged(dir_mtimes: Dict[str, float]) -> bool:
+        """التحقق من أن أي مجلد ممسوح لم يتغير منذ آخر بحث (إضافة خط في مجلد فرعي تغير وقت تعديله)"""
+        for directory, mtime in dir_mtimes.items():
+            try:
+                if os.stat(directory).st_mtime != mtime:
+                    return False
+            except OSError:
+                return False
+        return True
+
     def check_font_paths(self) -> List[str]:
         """التحقق من مسارات الخطوط المتوفرة"""
         possible_font_dirs = [
@@ -359,30 +780,44 @@ class FontManager:
         ]
         
         found_fonts: List[str] = []
-        arab_keywords = ['arab', 'amiri', 'noto', 'freesans']
+        arab_keywords = ('arab', 'amiri', 'noto', 'freesans')
         
         self.logger.info("جاري البحث عن الخطوط المتوفرة...")
         for font_dir in possible_font_dirs:
-            if font_dir.exists():
-                self.logger.info(f"البحث في المجلد: {font_dir}")
-                for font_path in font_dir.rglob("*.[to][tt][ff]"):
-                    if any(kw in font_path.name.lower() for kw in arab_keywords):
-                        found_fonts.append(str(font_path))
-                        self.logger.info(f"تم العثور على خط: {font_path}")
+            if not font_dir.is_dir():
+                continue
+
+            cache_key = (str(font_dir), arab_keywords)
+            cached = self._FOUND_FONTS.get(cache_key)
+            if cached is not None and self._dirs_unchanged(cached[0]):
+                found_fonts.extend(cached[1])
+                continue
+
+            self.logger.info(f"البحث في المجلد: {font_dir}")
+            dir_fonts = []
+            dir_mtimes: Dict[str, float] = {}
+            for font_path in self._walk_fonts(str(font_dir), dir_mtimes):
+                if any(kw in os.path.basename(font_path).lower() for kw in arab_keywords):
+                    dir_fonts.append(font_path)
+                    self.logger.info(f"تم العثور على خط: {font_path}")
+            self._FOUND_FONTS[cache_key] = (dir_mtimes, dir_fonts)
+            found_fonts.extend(dir_fonts)
         
         return found_fonts
 
     def download_font(self, font_name: str, url: str) -> bool:
         """تحميل خط من الإنترنت"""
+        font_path = self.fonts_dir / font_name
+        tmp_path = None
         try:
-            font_path = self.fonts_dir / font_name
+            from tqdm import tqdm
             self.logger.info(f"جاري تحميل الخط {font_name}...")
             
-            response = requests.get(url, stream=True)
+            response = self._get_session().get(url, stream=True, timeout=self.DOWNLOAD_TIMEOUT)
             response.raise_for_status()
             
             total_size = int(response.headers.get('content-length', 0))
-            block_size = 1024
+            block_size = 65536
             progress_bar = tqdm(
                 total=total_size,
                 unit='iB',
@@ -390,25 +825,33 @@ class FontManager:
                 desc=f"تحميل {font_name}"
             )
             
-            with open(font_path, 'wb') as f:
+            # التحميل إلى ملف مؤقت فريد ثم النقل الذري: التحميل المنقطع لا يترك ملف .ttf ناقصاً
+            fd, tmp_path = tempfile.mkstemp(dir=self.fonts_dir, prefix=f"{font_name}.", suffix='.part')
+            with os.fdopen(fd, 'wb') as f:
                 for data in response.iter_content(block_size):
                     progress_bar.update(len(data))
                     f.write(data)
+            os.replace(tmp_path, font_path)
             
             progress_bar.close()
             self.logger.info(f"تم تحميل الخط بنجاح: {font_path}")
             return True
             
         except Exception as e:
+            if tmp_path is not None:
+                Path(tmp_path).unlink(missing_ok=True)
             self.logger.error(f"خطأ في تحميل الخط {font_name}: {e}")
             return False
 
     def load_font(self, font_path: str) -> bool:
         """تحميل خط معين"""
         try:
+            from reportlab.pdfbase import pdfmetrics
+            from reportlab.pdfbase.ttfonts import TTFont
             font_name = f"Arabic_{Path(font_path).stem}"
-            if font_name not in pdfmetrics.getRegisteredFontNames():
+            if font_name not in self._registered_fonts:
                 pdfmetrics.registerFont(TTFont(font_name, font_path))
+                self._registered_fonts.add(font_name)
                 self.loaded_fonts.append(font_path)
                 self.logger.info(f"تم تحميل الخط: {font_path}")
                 return True
@@ -429,11 +872,8 @@ class FontManager:
             # محاولة تحميل الخطوط من الإنترنت إذا لم تتوفر محلياً
             if not self.loaded_fonts:
                 self.logger.warning("لم يتم العثور على خطوط محلية. جاري التحميل من الإنترنت...")
-                for font_name, url in self.font_urls.items():
-                    if self.download_font(font_name, url):
-                        font_path = self.fonts_dir / font_name
-                        if self.load_font(str(font_path)):
-                            return True
+                if self.font_urls and self._download_first_font():
+                    return True
 
             return bool(self.loaded_fonts)
 
@@ -441,6 +881,27 @@ class FontManager:
             self.logger.error(f"خطأ في تهيئة الخطوط: {str(e)}")
             return False
 
+    def _download_first_font(self) -> bool:
+        """تحميل الخطوط بالتوازي واعتماد أول خط ناجح حسب ترتيب font_urls (لا أسرعها تحميلاً)"""
+        executor = ThreadPoolExecutor(max_workers=len(self.font_urls))
+        try:
+            futures = {
+                executor.submit(self.download_font, font_name, url): font_name
+                for font_name, url in self.font_urls.items()
+            }
+            for future, font_name in futures.items():
+                if not future.result():
+                    continue
+                font_path = self.fonts_dir / font_name
+                if self.load_font(str(font_path)):
+                    # إلغاء التحميلات التي لم تبدأ بعد
+                    for pending in futures:
+                        pending.cancel()
+                    return True
+            return False
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
     def get_arabic_font(self) -> Optional[str]:
         """الحصول على مسار الخط العربي المحمل"""
         return next(iter(self.loaded_fonts), None)
@@ -467,9 +928,50 @@ class ResourceManager:
         self._locks[resource_id] = state
 
 
+def _arabic_font_candidates(fonts_dir: Path) -> List[Path]:
+    """ملفات الخطوط العربية المرشحة بترتيب الأفضلية"""
+    return [
+        # الخطوط المحلية أولاً
+        fonts_dir / "Amiri-Regular.ttf",
+        fonts_dir / "ae_AlArabiya.ttf",
+        
+        # خطوط النظام
+        Path("/usr/share/fonts/truetype/fonts-arabeyes/ae_AlArabiya.ttf"),
+        Path("/usr/share/fonts/truetype/fonts-arabeyes/ae_Furat.ttf"),
+        Path("/usr/share/fonts/truetype/fonts-arabeyes/ae_Khalid.ttf"),
+        Path("/usr/share/fonts/truetype/fonts-arabeyes/ae_Salem.ttf"),
+        
+        # خطوط احتياطية
+        Path("/usr/share/fonts/truetype/freefont/FreeSans.ttf")
+    ]
+
+
+@functools.lru_cache(maxsize=None)
+def _register_pdf_fonts(font_names: Tuple[str, ...] = ('Amiri-Regular', 'Arabic')) -> Tuple[str, ...]:
+    """تسجيل الخطوط العربية المستخدمة في الرسم مرة واحدة لكل عملية وإرجاع الأسماء المسجلة"""
+    from reportlab.pdfbase import pdfmetrics
+    from reportlab.pdfbase.ttfonts import TTFont
+    registered = set(pdfmetrics.getRegisteredFontNames())
+    missing = [name for name in font_names if name not in registered]
+    if missing:
+        fonts_dir = Path(__file__).parent / "fonts"
+        for font_path in _arabic_font_candidates(fonts_dir):
+            if not font_path.exists():
+                continue
+            try:
+                for name in missing:
+                    pdfmetrics.registerFont(TTFont(name, str(font_path)))
+                    registered.add(name)
+                break
+            except Exception as e:
+                logging.debug(f"فشل تسجيل الخط {font_path}: {str(e)}")
+    return tuple(name for name in font_names if name in registered)
+
+
 class ArabicTextHandler:
     """معالجة النصوص العربية والخطوط"""
     def __init__(self):
+        self.logger = logging.getLogger(__name__)
         self.font_size = 12
         self.font_name = 'Arabic'  # إضافة متغير font_name
         self.initialize_fonts()
@@ -477,6 +979,8 @@ class ArabicTextHandler:
     def initialize_fonts(self):
         """تهيئة الخطوط العربية"""
         try:
+            from reportlab.pdfbase import pdfmetrics
+            from reportlab.pdfbase.ttfonts import TTFont
             # تجنب إعادة تحميل الخطوط إذا كانت مسجلة مسبقاً
             if self.font_name in pdfmetrics.getRegisteredFontNames():
                 logging.debug(f"الخط {self.font_name} مسجل مسبقاً")
@@ -491,24 +995,8 @@ class ArabicTextHandler:
             warnings.filterwarnings('ignore', category=UserWarning, 
                                   message='.*Can\'t open file "(Helvetica|Times-Roman|Times-Bold)".*')
 
-            # قائمة الخطوط العربية
-            arabic_fonts = [
-                # الخطوط المحلية أولاً
-                fonts_dir / "Amiri-Regular.ttf",
-                fonts_dir / "ae_AlArabiya.ttf",
-                
-                # خطوط النظام
-                Path("/usr/share/fonts/truetype/fonts-arabeyes/ae_AlArabiya.ttf"),
-                Path("/usr/share/fonts/truetype/fonts-arabeyes/ae_Furat.ttf"),
-                Path("/usr/share/fonts/truetype/fonts-arabeyes/ae_Khalid.ttf"),
-                Path("/usr/share/fonts/truetype/fonts-arabeyes/ae_Salem.ttf"),
-                
-                # خطوط احتياطية
-                Path("/usr/share/fonts/truetype/freefont/FreeSans.ttf")
-            ]
-
             # محاولة تحميل خط عربي موجود
-            for font_path in arabic_fonts:
+            for font_path in _arabic_font_candidates(fonts_dir):
                 if font_path.exists():
                     try:
                         pdfmetrics.registerFont(TTFont(self.font_name, str(font_path)))
@@ -548,6 +1036,8 @@ class ArabicTextHandler:
     def download_arabic_font(self):
         """تحميل الخط العربي من الإنترنت"""
         try:
+            from reportlab.pdfbase import pdfmetrics
+            from reportlab.pdfbase.ttfonts import TTFont
             font_urls = [
                 "https://github.com/google/fonts/raw/main/ofl/amiri/Amiri-Regular.ttf",
                 "https://github.com/aerrami/arabic-fonts/raw/master/ae_AlArabiya.ttf"
@@ -555,30 +1045,38 @@ class ArabicTextHandler:
             
             fonts_dir = Path(__file__).parent / "fonts"
             
+            # استخدام الخطوط المحملة مسبقاً قبل اللجوء إلى الشبكة
             for font_url in font_urls:
-                try:
-                    font_name = Path(font_url).name
-                    font_path = fonts_dir / font_name
-                    
-                    if font_path.exists():  # تجنب إعادة التحميل
-                        logging.debug(f"الخط {font_name} موجود مسبقاً")
+                font_path = fonts_dir / Path(font_url).name
+                if font_path.exists():  # تجنب إعادة التحميل
+                    try:
+                        logging.debug(f"الخط {font_path.name} موجود مسبقاً")
                         pdfmetrics.registerFont(TTFont(self.font_name, str(font_path)))
                         return True
+                    except Exception as e:
+                        logging.debug(f"فشل تحميل الخط {font_path.name}: {str(e)}")
 
-                    logging.info(f"جاري محاولة تحميل الخط: {font_name}")
-                    response = requests.get(font_url)
-                    response.raise_for_status()
-                    
-                    with open(font_path, 'wb') as f:
-                        f.write(response.content)
-                    
-                    pdfmetrics.registerFont(TTFont(self.font_name, str(font_path)))
-                    logging.info(f"تم تحميل الخط {font_name} بنجاح")
-                    return True
-                    
-                except Exception as e:
-                    logging.debug(f"فشل تحميل الخط {font_name}: {str(e)}")
-                    continue
+            # تحميل جميع الروابط بالتوازي واعتماد أول خط ناجح
+            executor = ThreadPoolExecutor(max_workers=len(font_urls))
+            try:
+                futures = [
+                    executor.submit(self._fetch_font, font_url, fonts_dir)
+                    for font_url in font_urls
+                ]
+                for future in as_completed(futures):
+                    font_path = future.result()
+                    if font_path is None:
+                        continue
+                    try:
+                        pdfmetrics.registerFont(TTFont(self.font_name, str(font_path)))
+                        logging.info(f"تم تحميل الخط {font_path.name} بنجاح")
+                        for pending in futures:
+                            pending.cancel()
+                        return True
+                    except Exception as e:
+                        logging.debug(f"فشل تحميل الخط {font_path.name}: {str(e)}")
+            finally:
+                executor.shutdown(wait=False, cancel_futures=True)
             
             logging.error("فشل تحميل جميع الخطوط المتاحة")
             return False
@@ -587,12 +1085,27 @@ class ArabicTextHandler:
             logging.error(f"خطأ في تحميل الخط العربي: {e}")
             return False
 
+    @staticmethod
+    def _fetch_font(font_url: str, fonts_dir: Path) -> Optional[Path]:
+        """تحميل ملف خط واحد وإرجاع مساره أو None عند الفشل"""
+        font_name = Path(font_url).name
+        try:
+            logging.info(f"جاري محاولة تحميل الخط: {font_name}")
+            response = FontManager._get_session().get(font_url, timeout=FontManager.DOWNLOAD_TIMEOUT)
+            response.raise_for_status()
+            
+            font_path = fonts_dir / font_name
+            with open(font_path, 'wb') as f:
+                f.write(response.content)
+            return font_path
+        except Exception as e:
+            logging.debug(f"فشل تحميل الخط {font_name}: {str(e)}")
+            return None
+
     def process_arabic_text(self, text):
         """معالجة النص العربي"""
         try:
-            reshaped_text = arabic_reshaper.reshape(text)
-            bidi_text = get_display(reshaped_text)
-            return bidi_text
+            return _shape_bidi(text)
         except Exception as e:
             print(f"خطأ في معالجة النص العربي: {e}")
             return text
@@ -608,11 +1121,258 @@ class ArabicTextHandler:
             print(f"خطأ في حساب أبعاد النص: {e}")
             return 0, 0
 
+    def get_text_dimensions_batch(self, texts: List[str]) -> Tuple[List[float], List[float]]:
+        """حساب أبعاد مجموعة من النصوص دفعة واحدة"""
+        try:
+            char_width = self.font_size * 0.6
+            height = self.font_size * 1.2
+            widths = [len(_shape_bidi(text)) * char_width for text in texts]
+            return widths, [height] * len(widths)
+        except Exception as e:
+            self.logger.error(f"خطأ في حساب أبعاد النصوص: {e}")
+            return [0] * len(texts), [0] * len(texts)
+
 class TextProcessor:
+    # القواميس والأنماط ثابتة ومشتركة بين جميع النسخ (للقراءة فقط)
+    # أنماط الشطرنج
+    chess_patterns = MappingProxyType({
+        'moves': r'[KQRBN]?[a-h][1-8]',            # حركات القطع
+        'captures': r'x',                           # الضرب
+        'castling': r'O-O(?:-O)?',                 # التبييت
+        'check': r'\+',                            # الشاه
+        'mate': r'#',                              # الكش مات
+        'pieces': r'[KQRBN]',                      # القطع
+        'annotations': r'[!?]{1,2}',               # علامات التعليق
+        'move_numbers': r'\d+\.',                  # أرقام النقلات
+        'score': r'(?:1-0|0-1|1/2-1/2|\*)',       # نتيجة المباراة
+        'nag': r'\$\d+',                          # رموز NAG
+        'coordinates': r'[a-h][1-8]',              # إحداثيات المربعات
+        'promotions': r'=[QRBN]',                  # الترقية
+        'pin_symbols': r'†|‡',                     # رموز التثبيت
+        'fork_symbols': r'⚔|∆',                    # رموز الشوكة
+        'variation_start': r'\(',                  # بداية التنويع
+        'variation_end': r'\)',                    # نهاية التنويع
+        'comment_start': r'\{',                    # بداية التعليق
+        'comment_end': r'\}',                      # نهاية التعليق
+    })
+
+    # تجميع الأنماط مرة واحدة، ودمجها في نمط واحد للمسح بتمريرة واحدة
+    _chess_patterns_compiled = MappingProxyType({
+        name: re.compile(pattern)
+        for name, pattern in chess_patterns.items()
+    })
+    _chess_re = re.compile('|'.join(
+        f'(?P<{name}>{pattern})'
+        for name, pattern in chess_patterns.items()
+    ))
+
+    # المحارف الوحيدة الممكنة في سطر تدوين خالص؛ فحص المجموعة يرفض معظم النصوص قبل أي نمط
+    _notation_chars = frozenset('KQRBNabcdefgh0123456789xO+#=-/.!?½* \t\n')
+    # كلمة واحدة من التدوين: رقم نقلة (مع نقلة ملاصقة اختيارياً)، نقلة أو تبييت، نتيجة، أو تعليق
+    # (بديل واحد يجمع أنماط النقلة والتبييت والنتيجة ورقم النقلة و½-½ التي كانت تُجرَّب واحداً واحداً)
+    _notation_move = r'(?:[KQRBN]?[a-h]?[1-8]?x?[a-h][1-8](?:=[QRBN])?|O-O(?:-O)?)[+#]?[!?]{0,2}'
+    _notation_token_re = re.compile(
+        rf'\d{{1,4}}\.(?:\.\.)?(?:{_notation_move})?|{_notation_move}'
+        r'|[01](?:/[01])?-[01](?:/[01])?|1/2-1/2|½-½|\*|[!?]{1,2}'
+    )
+
+    # قاموس القطع
+    chess_pieces_ar = MappingProxyType({
+        # القطع الإنجليزية والعربية (كبيرة)
+        'K': 'ملك',
+        'Q': 'وزير',
+        'R': 'طابية',
+        'B': 'فيل',
+        'N': 'حصان',
+        'P': 'بيدق',
+        # القطع الإنجليزية والعربية (صغيرة)
+        'k': 'ملك',
+        'q': 'وزير',
+        'r': 'طابية',
+        'b': 'فيل',
+        'n': 'حصان',
+        'p': 'بيدق',
+    })
+
+    # رموز القطع للمخططات
+    diagram_symbols = MappingProxyType({
+        '♔': 'ملك أبيض',
+        '♕': 'وزير أبيض',
+        '♖': 'طابية بيضاء',
+        '♗': 'فيل أبيض',
+        '♘': 'حصان أبيض',
+        '♙': 'بيدق أبيض',
+        '♚': 'ملك أسود',
+        '♛': 'وزير أسود',
+        '♜': 'طابية سوداء',
+        '♝': 'فيل أسود',
+        '♞': 'حصان أسود',
+        '♟': 'بيدق أسود',
+    })
+
+    # جدول استبدال رموز المخططات بتمريرة واحدة عبر str.translate
+    _piece_trans = str.maketrans({
+        symbol: f"[{name}]"
+        for symbol, name in diagram_symbols.items()
+        if len(symbol) == 1
+    })
+
+    # قاموس المصطلحات الشطرنجية
+    chess_terms = MappingProxyType({
+        # المصطلحات الأساسية
+        'check': 'كش',
+        'mate': 'مات',
+        'stalemate': 'تعادل بالتجميد',
+        'castle': 'تبييت',
+        'promote': 'ترقية',
+        'capture': 'ضرب',
+        'en passant': 'أخذ في المرور',
+        
+        # المصطلحات التكتيكية
+        'pin': 'تثبيت',
+        'fork': 'شوكة',
+        'skewer': 'سفود',
+        'discovered attack': 'هجوم مكشوف',
+        'double attack': 'هجوم مزدوج',
+        'double check': 'كش مزدوج',
+        'overloading': 'إرهاق القطعة',
+        'deflection': 'إبعاد القطعة',
+        'interference': 'تداخل',
+        'zwischenzug': 'نقلة بينية',
+        'zugzwang': 'إجبار على الحركة',
+        
+        # مصطلحات الافتتاح
+        'opening': 'افتتاح',
+        'development': 'تطوير',
+        'center': 'مركز',
+        'fianchetto': 'تطوير الفيل',
+        'gambit': 'تضحية افتتاحية',
+        'counter gambit': 'تضحية مضادة',
+        
+        # مصطلحات وسط اللعبة
+        'middlegame': 'وسط اللعبة',
+        'initiative': 'المبادرة',
+        'attack': 'هجوم',
+        'defense': 'دفاع',
+        'counterplay': 'لعب مضاد',
+        'prophylaxis': 'وقاية',
+        
+        # مصطلحات نهاية اللعبة
+        'endgame': 'نهاية اللعبة',
+        'passing pawn': 'بيدق متقدم',
+        'outside passed pawn': 'بيدق متقدم خارجي',
+        'protected passed pawn': 'بيدق متقدم محمي',
+        'connected pawns': 'بيادق متصلة',
+        'isolated pawn': 'بيدق معزول',
+        'doubled pawns': 'بيادق مضاعفة',
+        'backward pawn': 'بيدق متأخر',
+        'majority': 'أغلبية بيادق',
+        
+        # مصطلحات التقييم
+        'advantage': 'أفضلية',
+        'winning advantage': 'أفضلية حاسمة',
+        'slight advantage': 'أفضلية طفيفة',
+        'equal': 'تعادل',
+        'unclear': 'موقف غير واضح',
+        'compensation': 'تعويض',
+        'initiative': 'مبادرة',
+        'counterplay': 'لعب مضاد',
+    })
+
+    # نمط واحد لجميع المصطلحات، الأطول أولاً حتى لا تسبق 'check' عبارة 'double check'
+    _chess_terms_re = re.compile(
+        r'\b(?:' + '|'.join(
+            map(re.escape, sorted(chess_terms, key=len, reverse=True))
+        ) + r')\b',
+        re.IGNORECASE
+    )
+
+    # نمط إحصاء المصطلحات العربية بتمريرة واحدة، مع وزن كل مطابقة بعدد
+    # المصطلحات التي تحتويها (مثل 'كش' داخل 'كش مزدوج') ليطابق العد السابق
+    _term_stats_re = re.compile(
+        '|'.join(map(re.escape, sorted(set(chess_terms.values()), key=len, reverse=True)))
+    )
+    _term_stats_weights = {}
+    for _term in set(chess_terms.values()):
+        _term_stats_weights[_term] = sum(map(_term.count, chess_terms.values()))
+    del _term
+    _term_stats_weights = MappingProxyType(_term_stats_weights)
+
+    # ترجمات رموز NAG
+    nag_translations = MappingProxyType({
+        # تقييم النقلات
+        '$1': 'نقلة قوية',
+        '$2': 'نقلة ضعيفة',
+        '$3': 'نقلة ممتازة',
+        '$4': 'خطأ فادح',
+        '$5': 'نقلة مثيرة للتساؤل',
+        '$6': 'نقلة مشكوك فيها',
+        '$7': 'نقلة مجبرة',
+        '$8': 'النقلة الوحيدة',
+        '$9': 'أسوأ نقلة',
+        '$10': 'موقف متعادل',
+        '$11': 'موقف متكافئ',
+        '$12': 'موقف معقد',
+        '$13': 'موقف غامض',
+        '$14': 'أفضلية طفيفة للأبيض',
+        '$15': 'أفضلية طفيفة للأسود',
+        '$16': 'أفضلية للأبيض',
+        '$17': 'أفضلية للأسود',
+        '$18': 'فوز للأبيض',
+        '$19': 'فوز للأسود',
+        '$20': 'أفضلية حاسمة للأبيض',
+        '$21': 'أفضلية حاسمة للأسود',
+        
+        # تقييمات إضافية
+        '$22': 'ضغط شديد',
+        '$23': 'موقف حرج',
+        '$24': 'مرونة أكبر',
+        '$25': 'تنمية متأخرة',
+        '$26': 'مبادرة',
+        '$27': 'هجوم',
+        '$28': 'تعويض عن المادة',
+        '$29': 'تعويض عن الموقف',
+        '$30': 'خط هجومي',
+        '$31': 'خط دفاعي',
+        '$32': 'ضغط على المركز',
+        '$33': 'ضغط على الجناح',
+        '$34': 'قيود موقعية',
+        '$35': 'خط تطوير',
+        '$36': 'خط مضاد'
+    })
+    # نمط واحد لجميع رموز NAG، الأطول أولاً حتى لا يطابق '$1' داخل '$10'
+    _nag_re = re.compile('|'.join(
+        map(re.escape, sorted(nag_translations, key=len, reverse=True))
+    ))
+
+    __slots__ = (
+        'arabic_handler', 'translation_processor', 'notation_processor', 'processed_blocks',
+        '_process_block_cached', 'total_chars', 'errors', 'chess_stats'
+    )
+
+    @classmethod
+    def is_chess_notation(cls, text: str) -> bool:
+        """التحقق مما إذا كان النص تدوين شطرنج خالصاً (نقلات وأرقام ونتائج فقط) لا يُترجم"""
+        tokens = text.split()
+        if not tokens or not cls._notation_chars.issuperset(text):
+            return False
+        fullmatch = cls._notation_token_re.fullmatch
+        return all(fullmatch(token) for token in tokens)
+
+    # الحد الأقصى لعدد الكتل المعالجة المحفوظة في الذاكرة
+    BLOCK_CACHE_SIZE = 10_000
+
     def __init__(self):
         self.arabic_handler = None
+        # معالج الترجمة المجمّعة (يُنشأ عند أول دفعة إن لم يُمرَّر)
+        self.translation_processor = None
+        # ترجمة الحركات الخاصة والأسر وأسماء القطع في التدوين
+        self.notation_processor = ChessNotationProcessor()
         self.processed_blocks = 0
-        self.translation_cache = {}
+        # ذاكرة LRU محدودة الحجم لكل نسخة بدلاً من قاموس ينمو بلا حد
+        self._process_block_cached = functools.lru_cache(
+            maxsize=self.BLOCK_CACHE_SIZE
+        )(self._process_block_uncached)
         self.total_chars = 0
         self.errors = []
         self.chess_stats = {
@@ -623,179 +1383,11 @@ class TextProcessor:
             'terms_found': 0,
             'variations_found': 0
         }
-        
-        # تهيئة الأنماط والقواميس
-        self._init_chess_patterns()
-        self._init_chess_pieces()
-        self._init_chess_terms()
-        self._init_nag_translations()
-
-    def _init_chess_patterns(self):
-        """تهيئة أنماط الشطرنج"""
-        self.chess_patterns = {
-            'moves': r'[KQRBN]?[a-h][1-8]',            # حركات القطع
-            'captures': r'x',                           # الضرب
-            'castling': r'O-O(?:-O)?',                 # التبييت
-            'check': r'\+',                            # الشاه
-            'mate': r'#',                              # الكش مات
-            'pieces': r'[KQRBN]',                      # القطع
-            'annotations': r'[!?]{1,2}',               # علامات التعليق
-            'move_numbers': r'\d+\.',                  # أرقام النقلات
-            'score': r'(?:1-0|0-1|1/2-1/2|\*)',       # نتيجة المباراة
-            'nag': r'\$\d+',                          # رموز NAG
-            'coordinates': r'[a-h][1-8]',              # إحداثيات المربعات
-            'promotions': r'=[QRBN]',                  # الترقية
-            'pin_symbols': r'†|‡',                     # رموز التثبيت
-            'fork_symbols': r'⚔|∆',                    # رموز الشوكة
-            'variation_start': r'\(',                  # بداية التنويع
-            'variation_end': r'\)',                    # نهاية التنويع
-            'comment_start': r'\{',                    # بداية التعليق
-            'comment_end': r'\}',                      # نهاية التعليق
-        }
-
-
-    def _init_chess_pieces(self):
-        """تهيئة قاموس القطع"""
-        self.chess_pieces_ar = {
-            # القطع الإنجليزية والعربية (كبيرة)
-            'K': 'ملك',
-            'Q': 'وزير',
-            'R': 'طابية',
-            'B': 'فيل',
-            'N': 'حصان',
-            'P': 'بيدق',
-            # القطع الإنجليزية والعربية (صغيرة)
-            'k': 'ملك',
-            'q': 'وزير',
-            'r': 'طابية',
-            'b': 'فيل',
-            'n': 'حصان',
-            'p': 'بيدق',
-        }
-        
-        # رموز القطع للمخططات
-        self.diagram_symbols = {
-            '♔': 'ملك أبيض',
-            '♕': 'وزير أبيض',
-            '♖': 'طابية بيضاء',
-            '♗': 'فيل أبيض',
-            '♘': 'حصان أبيض',
-            '♙': 'بيدق أبيض',
-            '♚': 'ملك أسود',
-            '♛': 'وزير أسود',
-            '♜': 'طابية سوداء',
-            '♝': 'فيل أسود',
-            '♞': 'حصان أسود',
-            '♟': 'بيدق أسود',
-        }
-
-    def _init_chess_terms(self):
-        """تهيئة قاموس المصطلحات الشطرنجية"""
-        self.chess_terms = {
-            # المصطلحات الأساسية
-            'check': 'كش',
-            'mate': 'مات',
-            'stalemate': 'تعادل بالتجميد',
-            'castle': 'تبييت',
-            'promote': 'ترقية',
-            'capture': 'ضرب',
-            'en passant': 'أخذ في المرور',
-            
-            # المصطلحات التكتيكية
-            'pin': 'تثبيت',
-            'fork': 'شوكة',
-            'skewer': 'سفود',
-            'discovered attack': 'هجوم مكشوف',
-            'double attack': 'هجوم مزدوج',
-            'double check': 'كش مزدوج',
-            'overloading': 'إرهاق القطعة',
-            'deflection': 'إبعاد القطعة',
-            'interference': 'تداخل',
-            'zwischenzug': 'نقلة بينية',
-            'zugzwang': 'إجبار على الحركة',
-            
-            # مصطلحات الافتتاح
-            'opening': 'افتتاح',
-            'development': 'تطوير',
-            'center': 'مركز',
-            'fianchetto': 'تطوير الفيل',
-            'gambit': 'تضحية افتتاحية',
-            'counter gambit': 'تضحية مضادة',
-            
-            # مصطلحات وسط اللعبة
-            'middlegame': 'وسط اللعبة',
-            'initiative': 'المبادرة',
-            'attack': 'هجوم',
-            'defense': 'دفاع',
-            'counterplay': 'لعب مضاد',
-            'prophylaxis': 'وقاية',
-            
-            # مصطلحات نهاية اللعبة
-            'endgame': 'نهاية اللعبة',
-            'passing pawn': 'بيدق متقدم',
-            'outside passed pawn': 'بيدق متقدم خارجي',
-            'protected passed pawn': 'بيدق متقدم محمي',
-            'connected pawns': 'بيادق متصلة',
-            'isolated pawn': 'بيدق معزول',
-            'doubled pawns': 'بيادق مضاعفة',
-            'backward pawn': 'بيدق متأخر',
-            'majority': 'أغلبية بيادق',
-            
-            # مصطلحات التقييم
-            'advantage': 'أفضلية',
-            'winning advantage': 'أفضلية حاسمة',
-            'slight advantage': 'أفضلية طفيفة',
-            'equal': 'تعادل',
-            'unclear': 'موقف غير واضح',
-            'compensation': 'تعويض',
-            'initiative': 'مبادرة',
-            'counterplay': 'لعب مضاد',
-        }
 
-    
-    def _init_nag_translations(self):
-        """تهيئة ترجمات رموز NAG"""
-        self.nag_translations = {
-            # تقييم النقلات
-            '$1': 'نقلة قوية',
-            '$2': 'نقلة ضعيفة',
-            '$3': 'نقلة ممتازة',
-            '$4': 'خطأ فادح',
-            '$5': 'نقلة مثيرة للتساؤل',
-            '$6': 'نقلة مشكوك فيها',
-            '$7': 'نقلة مجبرة',
-            '$8': 'النقلة الوحيدة',
-            '$9': 'أسوأ نقلة',
-            '$10': 'موقف متعادل',
-            '$11': 'موقف متكافئ',
-            '$12': 'موقف معقد',
-            '$13': 'موقف غامض',
-            '$14': 'أفضلية طفيفة للأبيض',
-            '$15': 'أفضلية طفيفة للأسود',
-            '$16': 'أفضلية للأبيض',
-            '$17': 'أفضلية للأسود',
-            '$18': 'فوز للأبيض',
-            '$19': 'فوز للأسود',
-            '$20': 'أفضلية حاسمة للأبيض',
-            '$21': 'أفضلية حاسمة للأسود',
-            
-            # تقييمات إضافية
-            '$22': 'ضغط شديد',
-            '$23': 'موقف حرج',
-            '$24': 'مرونة أكبر',
-            '$25': 'تنمية متأخرة',
-            '$26': 'مبادرة',
-            '$27': 'هجوم',
-            '$28': 'تعويض عن المادة',
-            '$29': 'تعويض عن الموقف',
-            '$30': 'خط هجومي',
-            '$31': 'خط دفاعي',
-            '$32': 'ضغط على المركز',
-            '$33': 'ضغط على الجناح',
-            '$34': 'قيود موقعية',
-            '$35': 'خط تطوير',
-            '$36': 'خط مضاد'
-        }
+    def iter_chess_tokens(self, text: str):
+        """استخراج رموز الشطرنج من النص بتمريرة واحدة كأزواج (النوع، التطابق)"""
+        for match in self._chess_re.finditer(text):
+            yield match.lastgroup, match
 
     def process_text(self, text: str) -> str:
         """معالجة النص المستخرج من PDF"""
@@ -808,16 +1400,7 @@ class TextProcessor:
             
             processed_blocks = []
             for block in blocks:
-                # التحقق من الذاكرة المؤقتة
-                if block in self.translation_cache:
-                    processed_block = self.translation_cache[block]
-                else:
-                    # معالجة الكتلة
-                    processed_block = self._process_block(block)
-                    if processed_block:
-                        # معالجة مصطلحات الشطرنج
-                        processed_block = self._process_chess_content(processed_block)
-                        self.translation_cache[block] = processed_block
+                processed_block = self._process_block_cached(block)
 
                 if processed_block:
                     processed_blocks.append(processed_block)
@@ -833,31 +1416,53 @@ class TextProcessor:
             logging.error(f"خطأ في معالجة النص: {str(e)}")
             return None
 
+    def _process_block_uncached(self, block: str) -> Optional[str]:
+        """معالجة الكتلة ومصطلحات الشطرنج فيها (تُستدعى عبر ذاكرة LRU)"""
+        processed_block = self._process_block(block)
+        if processed_block:
+            processed_block = sys.intern(self._process_chess_content(processed_block))
+        return processed_block
+
+    def cache_info(self):
+        """إحصائيات ذاكرة الكتل المعالجة"""
+        return self._process_block_cached.cache_info()
+
     def _split_into_blocks(self, text: str) -> List[str]:
         """تقسيم النص إلى كتل"""
         try:
-            # تقسيم بناءً على السطور الفارغة والمخططات
+            # تقسيم بناءً على السطور الفارغة والمخططات عبر مواضع البداية والنهاية
+            # في النص الأصلي، دون نسخ السطور إلا عند إغلاق الكتلة
             blocks = []
-            current_block = []
-            lines = text.split('\n')
-            
-            for line in lines:
+            block_start = block_end = -1
+            pos = 0
+            text_len = len(text)
+            
+            while pos <= text_len:
+                eol = text.find('\n', pos)
+                if eol == -1:
+                    eol = text_len
+                line = text[pos:eol]
+                
                 if self._is_diagram_line(line):
                     # حفظ الكتلة السابقة إذا وجدت
-                    if current_block:
-                        blocks.append('\n'.join(current_block))
-                        current_block = []
+                    if block_start >= 0:
+                        blocks.append(text[block_start:block_end])
+                        block_start = -1
                     # إضافة سطر المخطط كتلة منفصلة
                     blocks.append(line)
-                elif line.strip():
-                    current_block.append(line)
-                elif current_block:
-                    blocks.append('\n'.join(current_block))
-                    current_block = []
+                elif not line.isspace() and line:
+                    if block_start < 0:
+                        block_start = pos
+                    block_end = eol
+                elif block_start >= 0:
+                    blocks.append(text[block_start:block_end])
+                    block_start = -1
+                
+                pos = eol + 1
             
             # إضافة الكتلة الأخيرة إذا وجدت
-            if current_block:
-                blocks.append('\n'.join(current_block))
+            if block_start >= 0:
+                blocks.append(text[block_start:block_end])
             
             return [block for block in blocks if block.strip()]
 
@@ -888,8 +1493,7 @@ class TextProcessor:
     def _is_diagram_line(self, line: str) -> bool:
         """التحقق مما إذا كان السطر يمثل جزءاً من مخطط شطرنج"""
         # التحقق من وجود رموز قطع الشطرنج
-        diagram_chars = set('♔♕♖♗♘♙♚♛♜♝♞♟.|-+')
-        return any(char in diagram_chars for char in line)
+        return not _DIAGRAM_CHARS.isdisjoint(line)
 
     def _is_diagram_block(self, text: str) -> bool:
         """التحقق مما إذا كان النص يمثل مخطط شطرنج"""
@@ -897,27 +1501,80 @@ class TextProcessor:
         if len(lines) >= 8:
             diagram_lines = 0
             for line in lines:
-                if self._is_diagram_line(line):
+                if not _DIAGRAM_CHARS.isdisjoint(line):
                     diagram_lines += 1
-            return diagram_lines >= 8
+                    if diagram_lines >= 8:
+                        return True
         return False
 
+    # الدوال الحسابية أدناه خالية من الآثار الجانبية وتُرجع (النتيجة، عدد العناصر)
+    # حتى يمكن حفظها في LRU وتطبيق الإحصائيات عند كل استدعاء، بما فيه الإصابات
+
+    @staticmethod
+    @functools.lru_cache(maxsize=4096)
+    def _compute_chess_diagram(text: str) -> Tuple[str, int]:
+        """استبدال رموز القطع في المخطط وعدّ أسطره"""
+        # رموز القطع من محارف المخطط، فلا تظهر إلا في أسطر المخطط؛
+        # لذا يُستبدل النص كاملاً بتمريرة واحدة بدلاً من سطر بسطر
+        diagram_lines = sum(
+            1 for line in text.split('\n') if not _DIAGRAM_CHARS.isdisjoint(line)
+        )
+        return text.translate(TextProcessor._piece_trans), diagram_lines
+
+    @staticmethod
+    @functools.lru_cache(maxsize=4096)
+    def _compute_chess_moves(text: str) -> Tuple[str, int]:
+        """ترجمة نقلات الشطرنج وعدّها"""
+        pieces_ar = TextProcessor.chess_pieces_ar
+
+        # معالجة التبييت (الطويل أولاً ضمن البديل حتى لا يطابقه القصير)
+        text = _CASTLING_RE.sub(lambda m: _CASTLING_NAMES[m.group()], text)
+        
+        # معالجة النقلات العادية بتمريرة واحدة
+        moves_found = 0
+
+        def _replace_move(match):
+            nonlocal moves_found
+            moves_found += 1
+            piece, square = match.groups()
+            return f"{pieces_ar.get(piece, 'قطعة')} إلى {square}"
+
+        text = _PIECE_MOVE_RE.sub(_replace_move, text)
+        
+        # معالجة الضرب
+        text = _CAPTURE_RE.sub('يضرب', text)
+        
+        # معالجة الترقية
+        text = _PROMOTION_RE.sub(lambda m: f"يرقى إلى {pieces_ar[m.group(1)]}", text)
+        
+        return text, moves_found
+
+    @staticmethod
+    @functools.lru_cache(maxsize=4096)
+    def _compute_chess_annotations(text: str) -> Tuple[str, int]:
+        """ترجمة علامات التقييم ورموز NAG وعدّ العلامات"""
+        # معالجة علامات التقييم بتمريرة واحدة (الرموز الأطول أولاً)
+        annotations_found = 0
+
+        def _replace_annotation(match):
+            nonlocal annotations_found
+            annotations_found += 1
+            return f" ({_ANNOTATION_NAMES[match.group()]}) "
+
+        text = _ANNOTATION_RE.sub(_replace_annotation, text)
+        
+        # معالجة رموز NAG
+        nag_translations = TextProcessor.nag_translations
+        text = TextProcessor._nag_re.sub(lambda m: f" ({nag_translations[m.group()]}) ", text)
+        
+        return text, annotations_found
+
     def _process_chess_diagram(self, text: str) -> str:
         """معالجة مخطط الشطرنج"""
         try:
-            lines = text.split('\n')
-            processed_lines = []
-            
-            # معالجة كل سطر في المخطط
-            for line in lines:
-                if self._is_diagram_line(line):
-                    # استبدال رموز القطع بأسمائها العربية
-                    for symbol, name in self.diagram_symbols.items():
-                        line = line.replace(symbol, f"[{name}]")
-                    self.chess_stats['diagrams_found'] += 1
-                processed_lines.append(line)
-            
-            return '\n'.join(processed_lines)
+            text, diagram_lines = self._compute_chess_diagram(text)
+            self.chess_stats['diagrams_found'] += diagram_lines
+            return text
 
         except Exception as e:
             self.errors.append(f"خطأ في معالجة مخطط الشطرنج: {str(e)}")
@@ -926,51 +1583,37 @@ class TextProcessor:
     def _process_chess_moves(self, text: str) -> str:
         """معالجة نقلات الشطرنج"""
         try:
-            # معالجة التبييت
-            text = re.sub(r'O-O-O', 'تبييت طويل', text)
-            text = re.sub(r'O-O', 'تبييت قصير', text)
-            
-            # معالجة النقلات العادية
-            for match in re.finditer(r'([KQRBN])?([a-h][1-8])', text):
-                piece, square = match.groups()
-                piece_name = self.chess_pieces_ar.get(piece, 'قطعة')
-                text = text.replace(match.group(), f"{piece_name} إلى {square}")
-                self.chess_stats['moves_found'] += 1
-            
-            # معالجة الضرب
-            text = re.sub(r'x', 'يضرب', text)
-            
-            # معالجة الترقية
-            text = re.sub(r'=([QRBN])', lambda m: f"يرقى إلى {self.chess_pieces_ar[m.group(1)]}", text)
-            
+            text, moves_found = self._compute_chess_moves(text)
+            self.chess_stats['moves_found'] += moves_found
             return text
 
         except Exception as e:
             self.errors.append(f"خطأ في معالجة نقلات الشطرنج: {str(e)}")
             return text
 
+    def _process_chess_terms(self, text: str) -> str:
+        """ترجمة مصطلحات الشطرنج بتمريرة واحدة"""
+        try:
+            return self._chess_terms_re.sub(
+                lambda m: self.chess_terms[m.group(0).lower()], text
+            )
+        except Exception as e:
+            self.errors.append(f"خطأ في معالجة مصطلحات الشطرنج: {str(e)}")
+            return text
+
+    def _process_chess_notation(self, text: str) -> str:
+        """ترجمة تدوين الشطرنج (التبييت والأسر وأسماء القطع) عبر ChessNotationProcessor"""
+        try:
+            return self.notation_processor.process_chess_notation(text)
+        except Exception as e:
+            self.errors.append(f"خطأ في معالجة تدوين الشطرنج: {str(e)}")
+            return text
+
     def _process_chess_annotations(self, text: str) -> str:
         """معالجة تعليقات وعلامات الشطرنج"""
         try:
-            # معالجة علامات التقييم
-            annotations = {
-                '!!': 'نقلة ممتازة',
-                '!': 'نقلة جيدة',
-                '??': 'خطأ فادح',
-                '?': 'نقلة ضعيفة',
-                '!?': 'نقلة مثيرة للاهتمام',
-                '?!': 'نقلة مشكوك فيها'
-            }
-            
-            for symbol, meaning in annotations.items():
-                text = text.replace(symbol, f" ({meaning}) ")
-                if symbol in text:
-                    self.chess_stats['annotations_found'] += 1
-            
-            # معالجة رموز NAG
-            for nag, translation in self.nag_translations.items():
-                text = text.replace(nag, f" ({translation}) ")
-            
+            text, annotations_found = self._compute_chess_annotations(text)
+            self.chess_stats['annotations_found'] += annotations_found
             return text
 
         except Exception as e:
@@ -984,27 +1627,18 @@ class TextProcessor:
             # تتبع مستوى التنويعات
             level = 0
             result = []
-            buffer = ""
             
-            for char in text:
-                if char == '(':
-                    if buffer:
-                        result.append(buffer)
-                        buffer = ""
+            # تقسيم النص عند الأقواس مع الإبقاء عليها كرموز مستقلة
+            for part in _PAREN_SPLIT_RE.split(text):
+                if part == '(':
                     level += 1
                     result.append(f"\nالتنويع {level}: ")
                     self.chess_stats['variations_found'] += 1
-                elif char == ')':
-                    if buffer:
-                        result.append(buffer)
-                        buffer = ""
+                elif part == ')':
                     level -= 1
                     result.append("\nنهاية التنويع\n")
-                else:
-                    buffer += char
-                    
-            if buffer:
-                result.append(buffer)
+                elif part:
+                    result.append(part)
                 
             return ''.join(result)
 
@@ -1015,13 +1649,17 @@ class TextProcessor:
     def _update_chess_stats(self, text: str) -> None:
         """تحديث إحصائيات الشطرنج"""
         try:
-            # إحصاء القطع
-            for piece in self.chess_pieces_ar.keys():
-                self.chess_stats['pieces_found'] += text.count(piece)
+            # إحصاء القطع بتمريرة واحدة على المحارف
+            counts = Counter(text)
+            self.chess_stats['pieces_found'] += sum(
+                counts[piece] for piece in self.chess_pieces_ar if len(piece) == 1
+            )
             
-            # إحصاء المصطلحات
-            for term in self.chess_terms.values():
-                self.chess_stats['terms_found'] += text.count(term)
+            # إحصاء المصطلحات بتمريرة واحدة
+            weights = self._term_stats_weights
+            self.chess_stats['terms_found'] += sum(
+                weights[m.group()] for m in self._term_stats_re.finditer(text)
+            )
             
         except Exception as e:
             self.errors.append(f"خطأ في تحديث الإحصائيات: {str(e)}")
@@ -1031,7 +1669,7 @@ class TextProcessor:
         return {
             'processed_blocks': self.processed_blocks,
             'total_chars': self.total_chars,
-            'cached_blocks': len(self.translation_cache),
+            'cached_blocks': self._process_block_cached.cache_info().currsize,
             'chess_statistics': self.chess_stats,
             'errors': self.errors
         }
@@ -1041,7 +1679,7 @@ class TextProcessor:
         self.processed_blocks = 0
         self.total_chars = 0
         self.errors.clear()
-        self.translation_cache.clear()
+        self._process_block_cached.cache_clear()
         self.chess_stats = {
             'pieces_found': 0,
             'moves_found': 0,
@@ -1058,7 +1696,7 @@ class TextProcessor:
 
         try:
             # إزالة الأسطر الفارغة المتتالية
-            text = re.sub(r'\n\s*\n', '\n', text)
+            text = _BLANK_LINES_RE.sub('\n', text)
             
             # معالجة النص العربي
             if self.arabic_handler:
@@ -1087,20 +1725,24 @@ class TextProcessor:
 
         try:
             # إزالة المسافات الزائدة
-            text = re.sub(r'\s+', ' ', text)
+            text = _WHITESPACE_RE.sub(' ', text)
+            
+            # المسار السريع: لا علامات ترقيم أو أقواس أو اقتباسات تحتاج إلى تصحيح
+            if not _PUNCT_PROBE_RE.search(text):
+                return text.strip()
             
             # إزالة المسافات قبل علامات الترقيم
-            text = re.sub(r'\s+([.,!?:;])', r'\1', text)
+            text = _PUNCT_SPACE_BEFORE_RE.sub(r'\1', text)
             
             # تصحيح المسافات بعد علامات الترقيم
-            text = re.sub(r'([.,!?:;])(?!\s)', r'\1 ', text)
+            text = _PUNCT_SPACE_AFTER_RE.sub(r'\1 ', text)
             
             # تصحيح علامات الاقتباس
-            text = re.sub(r'(?<!["\'"])"(?!["\'""])', '\"', text)
+            text = _QUOTE_RE.sub('\"', text)
             
             # تصحيح الأقواس
-            text = re.sub(r'\(\s+', '(', text)
-            text = re.sub(r'\s+\)', ')', text)
+            text = _PAREN_OPEN_SPACE_RE.sub('(', text)
+            text = _PAREN_CLOSE_SPACE_RE.sub(')', text)
             
             return text.strip()
 
@@ -1114,29 +1756,65 @@ class TextProcessor:
             return ""
 
         try:
-            # إزالة الأحرف الخاصة غير المرغوب فيها
-            text = re.sub(r'[\x00-\x08\x0B\x0C\x0E-\x1F\x7F-\x9F]', '', text)
+            # المسار السريع: لا شيء يحتاج إلى تنظيف
+            if not _CLEAN_PROBE_RE.search(text):
+                return text.strip()
             
-            # توحيد نوع الأقواس
-            text = text.replace('「', '"').replace('」', '"')
-            text = text.replace('『', '"').replace('』', '"')
+            # إزالة الأحرف الخاصة غير المرغوب فيها
+            text = _CTRL_CHARS_RE.sub('', text)
             
-            # تصحيح الأرقام العربية
-            arabic_numbers = {'٠': '0', '١': '1', '٢': '2', '٣': '3', '٤': '4',
-                             '٥': '5', '٦': '6', '٧': '7', '٨': '8', '٩': '9'}
-            for ar, en in arabic_numbers.items():
-                text = text.replace(ar, en)
+            # توحيد نوع الأقواس وتصحيح الأرقام العربية بتمريرة واحدة
+            text = text.translate(_CLEAN_TEXT_TT)
             
             return text.strip()
 
         except Exception as e:
             self.errors.append(f"خطأ في تنظيف النص: {str(e)}")
             return text
-    
-    
+
+    def clean_text(self, text: str) -> str:
+        """تنظيف نص واحد"""
+        return self._clean_text(text)
+
+    def clean_texts(self, texts: List[str]) -> List[str]:
+        """تنظيف مجموعة نصوص بتمريرة واحدة على نص مدمج بدلاً من تمريرة لكل نص"""
+        if not texts:
+            return []
+
+        joined = _CLEAN_SEP.join(texts)
+        # الرجوع إلى التنظيف الفردي إن احتوى أحد النصوص على الفاصل نفسه
+        if joined.count(_CLEAN_SEP) != len(texts) - 1:
+            return [self._clean_text(text) for text in texts]
+
+        if _CLEAN_PROBE_RE.search(joined):
+            joined = _CTRL_CHARS_RE.sub('', joined).translate(_CLEAN_TEXT_TT)
+        return [text.strip() for text in joined.split(_CLEAN_SEP)]
+
+    def process_text_batch(self, texts: List[str]) -> List[str]:
+        """ترجمة مجموعة نصوص بطلبات مجمّعة دون تكرار (النصوص القصيرة وغير المترجمة تُعاد فارغة)"""
+        results = [''] * len(texts)
+        indices = [index for index, text in enumerate(texts) if text and len(text.strip()) >= 3]
+        if not indices:
+            return results
+
+        try:
+            if self.translation_processor is None:
+                self.translation_processor = TranslationProcessor(ConfigManager(), CacheManager())
+            # إزالة التكرار والتقسيم إلى طلبات وإعادة المحاولة بتراجع أُسّي تتم في TranslationProcessor
+            sources = [texts[index] for index in indices]
+            translations = self.translation_processor.process_text_batch(sources)
+            for index, source, translated in zip(indices, sources, translations):
+                if translated and translated != source:
+                    results[index] = translated
+        except Exception as e:
+            self.errors.append(f"خطأ في ترجمة الدفعة: {str(e)}")
+            logging.error(f"خطأ في ترجمة دفعة من {len(indices)} نص: {str(e)}")
+
+        return results
+
     def clear_cache(self) -> None:
         """مسح الذاكرة المؤقتة"""
-        self.translation_cache.clear()
+        self._process_block_cached.cache_clear()
 
     def get_errors(self) -> List[str]:
         """الحصول على قائمة الأخطاء"""
@@ -1145,6 +1823,7 @@ class TextProcessor:
     def process_file(self, input_path: str, output_path: str) -> bool:
         """معالجة ملف PDF كامل"""
         try:
+            import pdfplumber
             # التحقق من وجود الملف
             if not Path(input_path).exists():
                 raise FileNotFoundError(f"الملف غير موجود: {input_path}")
@@ -1152,24 +1831,27 @@ class TextProcessor:
             # إعادة تعيين الإحصائيات
             self.reset_stats()
             
-            # فتح وقراءة الملف
-            with pdfplumber.open(input_path) as pdf:
-                processed_pages = []
-                
+            # فتح وقراءة الملف وكتابة كل صفحة فور معالجتها
+            pages_written = 0
+            with pdfplumber.open(input_path) as pdf, \
+                    open(output_path, 'w', encoding='utf-8') as f:
                 # معالجة كل صفحة
                 for page in pdf.pages:
                     text = page.extract_text()
-                    if text:
-                        processed_text = self.process_text(text)
-                        if processed_text:
-                            processed_pages.append(processed_text)
-
-                # حفظ النتيجة
-                if processed_pages:
-                    with open(output_path, 'w', encoding='utf-8') as f:
-                        f.write('\n\n'.join(processed_pages))
-                    return True
-                    
+                    if not text:
+                        continue
+                    processed_text = self.process_text(text)
+                    if processed_text:
+                        if pages_written:
+                            f.write('\n\n')
+                        f.write(processed_text)
+                        pages_written += 1
+
+            if pages_written:
+                return True
+
+            # عدم ترك ملف فارغ عند عدم وجود نص معالج
+            Path(output_path).unlink(missing_ok=True)
             return False
 
         except Exception as e:
@@ -1178,6 +1860,37 @@ class TextProcessor:
             return False
 
     
+class Word(NamedTuple):
+    """كلمة مستخرجة من الصفحة مع خصائصها (بديل خفيف عن قاموس pdfplumber)"""
+    text: str
+    x0: float
+    x1: float
+    top: float
+    bottom: float
+    fontname: str
+    size: float
+    strokewidth: float
+    language: str
+    direction: str
+
+
+def _anchor_boundaries(tops, n, margin, bounds):
+    """مواضع بداية المجموعات في قائمة مرتبة: عنصر يبعد عن أول عنصر في مجموعته أكثر من margin يبدأ مجموعة جديدة"""
+    count = 1
+    bounds[0] = 0
+    anchor = tops[0]
+    for i in range(n):
+        if abs(tops[i] - anchor) > margin:
+            bounds[count] = i
+            count += 1
+            anchor = tops[i]
+    return count
+
+
+# نسخة مترجمة إلى شيفرة أصلية عبر Numba عند توفرها
+_anchor_boundaries_jit = njit(cache=True)(_anchor_boundaries) if njit is not None else None
+
+
 class TextExtractor:
     """استخراج وتحليل النصوص من كتب الشطرنج PDF مع دعم متقدم للغة العربية"""
     
@@ -1199,6 +1912,14 @@ class TextExtractor:
         self.block_manager = None
         self.chess_patterns = self._init_chess_patterns()
         self.chess_keywords = self._init_chess_keywords()
+        # دمج الأنماط والكلمات المحجوزة لفحص كل كتلة بتمريرة واحدة
+        self._chess_combined_re = re.compile('|'.join(
+            f"(?P<{name}>{pattern.pattern})"
+            for name, pattern in self.chess_patterns.items()
+        ))
+        self._keyword_re = re.compile('|'.join(
+            map(re.escape, sorted(self.chess_keywords, key=len, reverse=True))
+        ))
         self.stats = self._init_stats()
 
     def _init_stats(self) -> Dict:
@@ -1243,12 +1964,62 @@ class TextExtractor:
             'كش', 'مات', 'تعادل'
         }
 
-    def extract_from_pdf(self, pdf_path: str) -> List[Dict]:
-        """استخراج النصوص من ملف PDF"""
+    # أقل عدد صفحات يستحق توزيعه على عدة عمليات
+    PARALLEL_MIN_PAGES = 8
+    # أقل عدد كلمات في الصفحة يستحق تحويل الإحداثيات إلى مصفوفة للنسخة المترجمة
+    NUMBA_MIN_WORDS = 500
+
+    def extract_from_pdf(self, pdf_path: str, max_workers: Optional[int] = None) -> List[Dict]:
+        """استخراج النصوص من ملف PDF (بالتوازي على عدة عمليات للملفات الكبيرة)"""
         try:
+            import pdfplumber
+            with pdfplumber.open(pdf_path) as pdf:
+                total_pages = len(pdf.pages)
+        except Exception as e:
+            self.logger.error(f"خطأ في معالجة الملف: {str(e)}")
+            self.stats['processing_errors'] += 1
+            return []
+
+        workers = min(max_workers or os.cpu_count() or 1, total_pages)
+        if workers <= 1 or total_pages < self.PARALLEL_MIN_PAGES:
+            return list(self.iter_pdf_pages(pdf_path))
+
+        try:
+            ranges = _page_ranges(total_pages, workers)
+            pages_content = []
+            # إحصائيات العمال تُجمع محلياً ولا تُضاف إلا بعد نجاح كل النطاقات،
+            # حتى لا تُحسب الصفحات مرتين عند الرجوع إلى المعالجة التسلسلية
+            pool_stats = Counter()
+
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = [
+                    executor.submit(_extract_pages_worker, pdf_path, start, stop, self.config_params)
+                    for start, stop in ranges
+                ]
+                # جمع النتائج بترتيب الصفحات
+                for future in futures:
+                    chunk_pages, chunk_stats = future.result()
+                    pages_content.extend(chunk_pages)
+                    for key in ('total_blocks', 'chess_blocks', 'text_blocks',
+                                'diagrams', 'processing_errors', 'processed_pages'):
+                        pool_stats[key] += chunk_stats.get(key, 0)
+
+            self.stats['total_pages'] = total_pages
+            self.stats['processed_pages'] = 0
+            for key, value in pool_stats.items():
+                self.stats[key] += value
+            return pages_content
+
+        except Exception as e:
+            self.logger.warning(f"تعذرت المعالجة المتوازية، جاري المعالجة التسلسلية: {str(e)}")
+            return list(self.iter_pdf_pages(pdf_path))
+
+    def iter_pdf_pages(self, pdf_path: str):
+        """استخراج محتوى صفحات PDF تدريجياً صفحةً بصفحة دون الاحتفاظ بها كلها"""
+        try:
+            import pdfplumber
             self.stats['total_pages'] = 0
             self.stats['processed_pages'] = 0
-            pages_content = []
 
             with pdfplumber.open(pdf_path) as pdf:
                 self.stats['total_pages'] = len(pdf.pages)
@@ -1258,15 +2029,12 @@ class TextExtractor:
                     
                     page_content = self.process_page(page)
                     if page_content['blocks']:
-                        pages_content.append(page_content)
                         self.stats['processed_pages'] += 1
-
-            return pages_content
+                        yield page_content
 
         except Exception as e:
             self.logger.error(f"خطأ في معالجة الملف: {str(e)}")
             self.stats['processing_errors'] += 1
-            return []
 
     def process_page(self, page) -> Dict:
         """معالجة صفحة واحدة"""
@@ -1304,6 +2072,30 @@ class TextExtractor:
             self.stats['processing_errors'] += 1
             return {'blocks': [], 'diagrams': [], 'metadata': {}}
 
+    # أقل عدد حواف يمكن أن يكوّن جدول رقعة 8×8
+    MIN_DIAGRAM_EDGES = 18
+
+    def _extract_chess_diagrams(self, page) -> List[Dict]:
+        """استخراج مخططات الشطرنج (جداول 8×8) من الصفحة مع إطاراتها"""
+        try:
+            # فحص رخيص قبل البحث عن الجداول: رقعة 8×8 تحتاج إلى 9 حواف أفقية و9 رأسية على الأقل
+            if 4 * len(page.rects) + len(page.lines) < self.MIN_DIAGRAM_EDGES:
+                return []
+
+            diagrams = []
+            for table in page.find_tables():
+                rows = table.extract()
+                if len(rows) == 8 and all(len(row) == 8 for row in rows):
+                    diagrams.append({
+                        'bbox': tuple(table.bbox),
+                        'squares': rows
+                    })
+            return diagrams
+        except Exception as e:
+            # تعذر اكتشاف المخططات لا يُسقط نصوص الصفحة
+            self.logger.warning(f"خطأ في استخراج مخططات الشطرنج: {str(e)}")
+            return []
+
     def _extract_words_with_attributes(self, page) -> List[Dict]:
         """استخراج الكلمات مع خصائصها"""
         return page.extract_words(
@@ -1313,93 +2105,109 @@ class TextExtractor:
             y_tolerance=self.config_params['y_tolerance']
         )
 
-    def _clean_words(self, words: List[Dict]) -> List[Dict]:
-        """تنظيف وتحسين الكلمات المستخرجة"""
+    def _clean_words(self, words: List[Dict]) -> List[Word]:
+        """تنظيف الكلمات المستخرجة وتحويلها إلى سجلات Word"""
         cleaned = []
+        append = cleaned.append
         for word in words:
             if not word['text'].strip():
                 continue
                 
-            word['text'] = self._clean_text(word['text'])
-            word['language'] = self._detect_text_language(word['text'])
-            word['direction'] = 'rtl' if word['language'] == 'ar' else 'ltr'
-            
-            cleaned.append(word)
+            text = self._clean_text(word['text'])
+            language = self._detect_text_language(text)
+            append(Word(
+                text,
+                word['x0'],
+                word['x1'],
+                word['top'],
+                word['bottom'],
+                word.get('fontname', ''),
+                word.get('size', 0),
+                word.get('strokewidth', 0),
+                language,
+                'rtl' if language == 'ar' else 'ltr'
+            ))
         return cleaned
 
     def _clean_text(self, text: str) -> str:
         """تنظيف النص من الأحرف غير المرغوب فيها"""
         text = ' '.join(text.split())
-        text = re.sub(r'[\x00-\x08\x0b\x0c\x0e-\x1f\x7f-\x9f]', '', text)
+        text = _CTRL_CHARS_RE.sub('', text)
         return text.strip()
 
     def _detect_text_language(self, text: str) -> str:
         """تحديد لغة النص"""
         try:
-            if any('\u0600' <= ch <= '\u06FF' for ch in text):
+            if _ARABIC_RE.search(text):
                 return 'ar'
             return 'en'
         except:
             return 'en'
 
-    def _analyze_and_group_blocks(self, words: List[Dict]) -> List[Dict]:
+    def _analyze_and_group_blocks(self, words: List[Word]) -> List[Dict]:
         """تحليل وتجميع الكلمات في كتل"""
         blocks = []
-        current_block = []
-        current_y = None
+        if not words:
+            return blocks
+
+        sorted_words = sorted(words, key=attrgetter('top', 'x0'))
         
-        for word in sorted(words, key=lambda w: (w['top'], w['x0'])):
-            if current_y is None:
-                current_y = word['top']
-                current_block = [word]
-            elif abs(word['top'] - current_y) <= self.config_params['line_margin']:
-                current_block.append(word)
-            else:
-                if current_block:
-                    block = self._create_content_block(current_block)
-                    if block:
-                        blocks.append(block)
-                current_block = [word]
-                current_y = word['top']
+        # حساب حدود الكتل على قائمة أرقام فقط ثم تقطيع قائمة الكلمات
+        margin = self.config_params['line_margin']
+        tops = [word.top for word in sorted_words]
+        n = len(tops)
+        if _anchor_boundaries_jit is not None and n >= self.NUMBA_MIN_WORDS:
+            bounds = np.empty(n + 1, dtype=np.int64)
+            count = _anchor_boundaries_jit(np.array(tops, dtype=np.float64), n, float(margin), bounds)
+            boundaries = bounds[:count].tolist()
+        else:
+            boundaries = [0]
+            current_y = tops[0]
+            for index, top in enumerate(tops):
+                if abs(top - current_y) > margin:
+                    boundaries.append(index)
+                    current_y = top
+        boundaries.append(n)
         
-        if current_block:
-            block = self._create_content_block(current_block)
+        for start, stop in zip(boundaries, boundaries[1:]):
+            block = self._create_content_block(sorted_words[start:stop])
             if block:
                 blocks.append(block)
         
         return blocks
 
-    def _create_content_block(self, words: List[Dict]) -> Optional[Dict]:
+    def _create_content_block(self, words: List[Word]) -> Optional[Dict]:
         """إنشاء كتلة محتوى مع تحليلها"""
         if not words or len(words) < self.config_params['min_block_size']:
             return None
 
-        text = ' '.join(w['text'] for w in words)
+        first = words[0]
+        text = ' '.join(w.text for w in words)
         block_type, content_info = self._analyze_text_content(text)
         
         return {
             'text': text,
             'bbox': self._calculate_bbox(words),
-            'font': words[0].get('fontname', ''),
-            'size': words[0].get('size', 0),
-            'language': words[0].get('language', 'en'),
-            'direction': words[0].get('direction', 'ltr'),
+            'font': first.fontname,
+            'size': first.size,
+            'language': first.language,
+            'direction': first.direction,
             'type': block_type,
-            'needs_translation': block_type == 'regular' and words[0].get('language') == 'en',
+            'needs_translation': block_type == 'regular' and first.language == 'en',
             'metadata': {
-                'is_bold': any(w.get('strokewidth', 0) > 0 for w in words),
+                'is_bold': any(w.strokewidth > 0 for w in words),
                 'word_count': len(words),
                 'content_info': content_info
             }
         }
 
-    def _calculate_bbox(self, words: List[Dict]) -> Tuple[float, float, float, float]:
+    def _calculate_bbox(self, words: List[Word]) -> Tuple[float, float, float, float]:
         """حساب الإطار المحيط للكتلة"""
         return (
-            min(w['x0'] for w in words),
-            min(w['top'] for w in words),
-            max(w['x1'] for w in words),
-            max(w['bottom'] for w in words)
+            min(w.x0 for w in words),
+            min(w.top for w in words),
+            max(w.x1 for w in words),
+            max(w.bottom for w in words)
         )
 
     def _analyze_text_content(self, text: str) -> Tuple[str, Dict]:
@@ -1413,25 +2221,23 @@ class TextExtractor:
         }
 
         # فحص الكلمات المحجوزة
-        if any(keyword in text for keyword in self.chess_keywords):
+        if self._keyword_re.search(text):
             content_info['has_chess_keywords'] = True
             return 'chess', content_info
 
-        # فحص أنماط الشطرنج
-        for pattern_name, pattern in self.chess_patterns.items():
-            matches = list(pattern.finditer(text))
-            if matches:
-                elements = [m.group() for m in matches]
-                content_info['chess_elements'].extend(elements)
-                
-                if pattern_name in ['piece_moves', 'pawn_moves', 'castling']:
-                    content_info['has_moves'] = True
-                elif pattern_name == 'evaluation':
-                    content_info['has_evaluation'] = True
-                elif pattern_name == 'annotation':
-                    content_info['has_annotation'] = True
-                elif pattern_name == 'variations':
-                    content_info['has_variation'] = True
+        # فحص أنماط الشطرنج بتمريرة واحدة وتصنيف كل تطابق حسب مجموعته
+        for match in self._chess_combined_re.finditer(text):
+            content_info['chess_elements'].append(match.group())
+            pattern_name = match.lastgroup
+            
+            if pattern_name in ('piece_moves', 'pawn_moves', 'castling'):
+                content_info['has_moves'] = True
+            elif pattern_name == 'evaluation':
+                content_info['has_evaluation'] = True
+            elif pattern_name == 'annotation':
+                content_info['has_annotation'] = True
+            elif pattern_name == 'variations':
+                content_info['has_variation'] = True
 
         return ('chess', content_info) if content_info['chess_elements'] else ('regular', content_info)
 
@@ -1447,19 +2253,56 @@ class TextExtractor:
         return self.stats
 
 
+def _page_ranges(total_pages: int, workers: int) -> List[Tuple[int, int]]:
+    """نطاقات صفحات متجاورة حتى يفتح كل عامل الملف مرة واحدة لكل نطاق"""
+    chunk_size = -(-total_pages // workers)
+    return [
+        (start, min(start + chunk_size, total_pages))
+        for start in range(0, total_pages, chunk_size)
+    ]
+
+
+def _extract_pages_worker(pdf_path: str, start: int, stop: int,
+                          config_params: Dict) -> Tuple[List[Dict], Dict]:
+    """استخراج نطاق من الصفحات داخل عملية منفصلة وإرجاع المحتوى والإحصائيات"""
+    import pdfplumber
+    extractor = TextExtractor()
+    extractor.config_params.update(config_params)
+    pages_content = []
+    with pdfplumber.open(pdf_path) as pdf:
+        for page in pdf.pages[start:stop]:
+            page_content = extractor.process_page(page)
+            if page_content['blocks']:
+                pages_content.append(page_content)
+                extractor.stats['processed_pages'] += 1
+    return pages_content, extractor.stats
+
+
 class TranslationProcessor:
     """معالج الترجمة الرئيسي مع دعم خاص لكتب الشطرنج"""
     
+    # الحد الأقصى لعدد الكتل المترجمة المحفوظة في الذاكرة (العبارات المتكررة في كتب الشطرنج كثيرة)
+    BLOCK_CACHE_SIZE = 50_000
+    # مهلة الانتظار الأولى (بالثواني) قبل إعادة محاولة الترجمة، وتتضاعف مع كل محاولة
+    RETRY_BACKOFF = 3.0
+    
     def __init__(self, config_manager: ConfigManager, cache_manager: CacheManager):
         self.logger = logging.getLogger(__name__)
         self.config = config_manager
         self.cache = cache_manager
-        self.translator = Translator()
+        self.translator = _get_translator()
         self.batch_size = self.config.get('translation', {}).get('batch_size', 10)
         self.timeout = self.config.get('translation', {}).get('timeout', 30)
         self.retries = self.config.get('translation', {}).get('retries', 3)
+        self.source_lang = self.config.get('translation', {}).get('source_lang', 'en')
+        self.target_lang = self.config.get('translation', {}).get('target_lang', 'ar')
         self.lock = threading.Lock()
+        # مترجم مستقل لكل خيط بدلاً من مترجم واحد خلف قفل يسلسل الطلبات
+        self._local = threading.local()
+        self._local.translator = self.translator
         self.translation_count = 0
+        # ذاكرة LRU للنص النهائي لكل كتلة (مفتاحها النص الأصلي) لتجاوز الحماية والترجمة والاستعادة
+        self._block_cache: OrderedDict = OrderedDict()
         
         # تهيئة الأنماط والقواعد
         self._init_patterns()
@@ -1480,20 +2323,53 @@ class TranslationProcessor:
             'e.p.', 'ep'              # أخرى
         ])
 
+        # دمج الأنماط في نمط واحد لحماية المحتوى بتمريرة واحدة
+        self._protect_re = re.compile('|'.join(
+            f"(?P<{name}>{pattern.pattern})"
+            for name, pattern in self.chess_patterns.items()
+        ))
+        # المصطلحات المحجوزة ككلمات كاملة مفصولة بمسافات
+        self._protected_terms_re = re.compile(
+            r'(?<!\S)(?:' + '|'.join(
+                map(re.escape, sorted(self.protected_terms, key=len, reverse=True))
+            ) + r')(?!\S)'
+        )
+
     def translate_page(self, page_content: Dict) -> Dict:
         """ترجمة محتوى صفحة كاملة"""
         if not page_content or 'blocks' not in page_content:
             return page_content
 
         translated_page = page_content.copy()
-        translated_blocks = []
+        blocks = [block for block in page_content['blocks'] if block]
+
+        try:
+            # 1. جمع النصوص المحمية لكل الكتل (ما لم تكن الكتلة مترجمة سابقاً)
+            pending = []
+            for block in blocks:
+                text = block.get('text', '')
+                if not text.strip():
+                    continue
+                cached_text = self._get_cached_block(text)
+                if cached_text is not None:
+                    self._apply_block_translation(block, text, cached_text)
+                    continue
+                protected_text, placeholders = self._protect_special_content(text)
+                pending.append((block, text, protected_text, placeholders))
+
+            # 2. ترجمتها دفعة واحدة بدلاً من طلب مستقل لكل كتلة
+            translations = self._translate_many([item[2] for item in pending])
+
+            # 3. توزيع الترجمات على الكتل
+            for (block, text, _, placeholders), translated_text in zip(pending, translations):
+                final_text = self._restore_protected_content(translated_text, placeholders)
+                self._store_cached_block(text, final_text)
+                self._apply_block_translation(block, text, final_text)
 
-        for block in page_content['blocks']:
-            translated_block = self._translate_block(block)
-            if translated_block:
-                translated_blocks.append(translated_block)
+        except Exception as e:
+            self.logger.error(f"خطأ في ترجمة الصفحة: {str(e)}")
 
-        translated_page['blocks'] = translated_blocks
+        translated_page['blocks'] = blocks
         return translated_page
 
     def _translate_block(self, block: Dict) -> Dict:
@@ -1504,90 +2380,193 @@ class TranslationProcessor:
 
             text = block['text']
             
-            # حماية النصوص الخاصة
-            protected_text, placeholders = self._protect_special_content(text)
-            
-            # ترجمة النص المحمي
-            translated_text = self._translate_with_retry(protected_text)
-            
-            # استعادة النصوص المحمية
-            final_text = self._restore_protected_content(translated_text, placeholders)
+            # الكتل المتكررة (عناوين، أرقام نقلات، نتائج) تُعاد من الذاكرة مباشرة
+            final_text = self._get_cached_block(text)
+            if final_text is None:
+                # حماية النصوص الخاصة
+                protected_text, placeholders = self._protect_special_content(text)
+                
+                # ترجمة النص المحمي
+                translated_text = self._translate_with_retry(protected_text)
+                
+                # استعادة النصوص المحمية
+                final_text = self._restore_protected_content(translated_text, placeholders)
+                self._store_cached_block(text, final_text)
             
             # تحديث الكتلة
-            block['original_text'] = text
-            block['translated_text'] = final_text
-            
-            if final_text != text:
-                self.translation_count += 1
-                
-            return block
+            return self._apply_block_translation(block, text, final_text)
 
         except Exception as e:
             self.logger.error(f"خطأ في ترجمة الكتلة: {str(e)}")
             return block
 
+    def _apply_block_translation(self, block: Dict, text: str, final_text: str) -> Dict:
+        """تحديث الكتلة بالنص الأصلي والمترجم"""
+        block['original_text'] = text
+        block['translated_text'] = final_text
+        if final_text != text:
+            with self.lock:
+                self.translation_count += 1
+        return block
+
+    def _get_cached_block(self, text: str) -> Optional[str]:
+        """البحث عن الترجمة النهائية لكتلة سبق ترجمتها"""
+        with self.lock:
+            final_text = self._block_cache.get(text)
+            if final_text is not None:
+                self._block_cache.move_to_end(text)
+            return final_text
+
+    def _store_cached_block(self, text: str, final_text: str) -> None:
+        """حفظ الترجمة النهائية للكتلة (الترجمات الفاشلة لا تُحفظ لتُعاد محاولتها)"""
+        if final_text == text:
+            return
+        with self.lock:
+            self._block_cache[text] = final_text
+            self._block_cache.move_to_end(text)
+            if len(self._block_cache) > self.BLOCK_CACHE_SIZE:
+                self._block_cache.popitem(last=False)
+
     def _protect_special_content(self, text: str) -> Tuple[str, Dict[str, str]]:
         """حماية المحتوى الخاص من الترجمة"""
-        protected_text = text
         placeholders = {}
-        placeholder_counter = 0
-
-        # حماية نقلات الشطرنج
-        for pattern_name, pattern in self.chess_patterns.items():
-            matches = pattern.finditer(protected_text)
-            for match in matches:
-                placeholder = f"[CHESS_{placeholder_counter}]"
-                placeholders[placeholder] = match.group()
-                protected_text = protected_text.replace(match.group(), placeholder)
-                placeholder_counter += 1
-
-        # حماية المصطلحات المحجوزة
-        words = protected_text.split()
-        protected_words = []
-        
-        for word in words:
-            if word in self.protected_terms:
-                placeholder = f"[TERM_{placeholder_counter}]"
-                placeholders[placeholder] = word
-                protected_words.append(placeholder)
-                placeholder_counter += 1
-            else:
-                protected_words.append(word)
-        
-        protected_text = ' '.join(protected_words)
-        return protected_text, placeholders
+        counter = 0
+
+        # حماية نقلات الشطرنج (C) ثم المصطلحات المحجوزة (T)، ببناء النص من
+        # مقاطع بين مواضع التطابقات بدلاً من دالة استبدال لكل تطابق
+        for prefix, pattern in (('C', self._protect_re), ('T', self._protected_terms_re)):
+            parts = []
+            last = 0
+            for match in pattern.finditer(text):
+                start, end = match.span()
+                placeholder = f"[{prefix}{counter}]"
+                placeholders[placeholder] = text[start:end]
+                parts.append(text[last:start])
+                parts.append(placeholder)
+                counter += 1
+                last = end
+            if parts:
+                parts.append(text[last:])
+                text = ''.join(parts)
+
+        return text, placeholders
 
     def _translate_with_retry(self, text: str) -> str:
         """ترجمة النص مع إعادة المحاولة"""
         if not text.strip():
             return text
+        return self._translate_many([text])[0]
+
+    def _translate_many(self, texts: List[str], batch_size: Optional[int] = None) -> List[str]:
+        """ترجمة قائمة نصوص بدفعات من batch_size نصاً لكل طلب مع إعادة المحاولة"""
+        results: List[Optional[str]] = [None] * len(texts)
+        missing: Dict[str, List[int]] = {}
+
+        # التحقق من الذاكرة المؤقتة وتجميع النصوص المكررة
+        for index, text in enumerate(texts):
+            if not text.strip():
+                results[index] = text
+                continue
+            cached = self.cache.get_translation(text, self.target_lang)
+            if cached:
+                results[index] = cached
+            else:
+                missing.setdefault(text, []).append(index)
+
+        pending = list(missing)
+        batch_size = max(1, batch_size or self.batch_size)
+        for start in range(0, len(pending), batch_size):
+            batch = pending[start:start + batch_size]
+            translated = self._translate_batch_with_retry(batch)
+            for text, translation in zip(batch, translated):
+                for index in missing[text]:
+                    results[index] = translation
+
+        return results
+
+    def translate_text(self, text: str) -> str:
+        """ترجمة نص واحد مع حماية محتوى الشطرنج"""
+        return self.process_text_batch([text])[0]
+
+    def process_text_batch(self, texts: List[str], chunk_size: int = 100,
+                           max_workers: int = 8) -> List[str]:
+        """ترجمة قائمة نصوص كاملة (مثل كل كتل الملف) بطلبات من chunk_size نصاً تُرسل بالتوازي"""
+        results = list(texts)
+        # النص المحمي -> [(موضع النص الأصلي، العناصر المحمية)]
+        pending: Dict[str, List[Tuple[int, Dict[str, str]]]] = {}
+
+        for index, text in enumerate(texts):
+            if not text or not text.strip():
+                continue
+            cached_text = self._get_cached_block(text)
+            if cached_text is not None:
+                results[index] = cached_text
+                continue
+            protected_text, placeholders = self._protect_special_content(text)
+            pending.setdefault(protected_text, []).append((index, placeholders))
+
+        if not pending:
+            return results
+
+        unique_texts = list(pending)
+        chunk_size = max(1, chunk_size)
+        chunks = [
+            unique_texts[start:start + chunk_size]
+            for start in range(0, len(unique_texts), chunk_size)
+        ]
+
+        # كل دفعة طلب واحد؛ الدفعات تُرسل بالتوازي عبر مترجم مستقل لكل خيط
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(chunks)))) as executor:
+            translated_chunks = executor.map(
+                lambda chunk: self._translate_many(chunk, chunk_size), chunks
+            )
+            for chunk, translations in zip(chunks, translated_chunks):
+                for protected_text, translated_text in zip(chunk, translations):
+                    for index, placeholders in pending[protected_text]:
+                        final_text = self._restore_protected_content(translated_text, placeholders)
+                        self._store_cached_block(texts[index], final_text)
+                        results[index] = final_text
 
-        # التحقق من الذاكرة المؤقتة
-        cached = self.cache.get_translation(text)
-        if cached:
-            return cached
+        return results
 
+    def _translate_batch_with_retry(self, texts: List[str]) -> List[str]:
+        """إرسال دفعة نصوص في طلب واحد مع إعادة المحاولة عند الفشل"""
         for attempt in range(self.retries):
             try:
-                with self.lock:
-                    translation = self.translator.translate(
-                        text,
-                        dest='ar',
-                        src='en',
-                        timeout=self.timeout
-                    )
-                    
-                if translation and translation.text:
-                    # تخزين في الذاكرة المؤقتة
-                    self.cache.store_translation(text, translation.text)
-                    return translation.text
+                translations = self._get_thread_translator().translate(
+                    texts,
+                    dest=self.target_lang,
+                    src=self.source_lang,
+                    timeout=self.timeout
+                )
+                if not isinstance(translations, list):
+                    translations = [translations]
+
+                results = []
+                for text, translation in zip(texts, translations):
+                    if translation and translation.text:
+                        # تخزين في الذاكرة المؤقتة
+                        self.cache.store_translation(text, translation.text, self.target_lang)
+                        results.append(translation.text)
+                    else:
+                        results.append(text)
+                if len(results) == len(texts):
+                    return results
                     
             except Exception as e:
                 self.logger.warning(f"محاولة الترجمة {attempt + 1} فشلت: {str(e)}")
                 if attempt < self.retries - 1:
-                    time.sleep(1)
+                    # تراجع أُسّي (3 ثم 6 ثم 12 ثانية...) حتى لا تُغرق المحاولات الخدمة المحدودة
+                    time.sleep(self.RETRY_BACKOFF * (2 ** attempt))
                     
-        return text
+        return list(texts)
+
+    def _get_thread_translator(self):
+        """الحصول على مترجم الخيط الحالي وإنشاؤه عند أول استخدام"""
+        translator = getattr(self._local, 'translator', None)
+        if translator is None:
+            translator = self._local.translator = _get_translator()
+        return translator
 
     def _restore_protected_content(self, text: str, placeholders: Dict[str, str]) -> str:
         """استعادة المحتوى المحمي"""
@@ -1598,13 +2577,17 @@ class TranslationProcessor:
 
     def translate_batch(self, blocks: List[Dict]) -> List[Dict]:
         """ترجمة مجموعة من الكتل"""
-        translated_blocks = []
+        from tqdm import tqdm
+        if not blocks:
+            return []
+
+        results: Dict[int, Dict] = {}
         
-        with ThreadPoolExecutor(max_workers=min(10, len(blocks))) as executor:
-            futures = []
-            for block in blocks:
-                future = executor.submit(self._translate_block, block)
-                futures.append(future)
+        with ThreadPoolExecutor(max_workers=max(1, min(self.batch_size, len(blocks)))) as executor:
+            futures = {
+                executor.submit(self._translate_block, block): index
+                for index, block in enumerate(blocks)
+            }
             
             for future in tqdm(
                 as_completed(futures),
@@ -1613,12 +2596,12 @@ class TranslationProcessor:
                 unit="كتلة"
             ):
                 try:
-                    result = future.result()
-                    translated_blocks.append(result)
+                    results[futures[future]] = future.result()
                 except Exception as e:
                     self.logger.error(f"خطأ في ترجمة الكتلة: {str(e)}")
                     
-        return translated_blocks
+        # الحفاظ على ترتيب الكتل الأصلي
+        return [results[index] for index in sorted(results)]
 
     def get_statistics(self) -> Dict[str, Any]:
         """الحصول على إحصائيات الترجمة"""
@@ -1638,6 +2621,115 @@ class TranslationProcessor:
             self.logger.error(f"خطأ في حفظ الذاكرة المؤقتة: {str(e)}")
     
 
+# قراءة إحداثيات الكلمة بعملية واحدة
+_word_coords = itemgetter('x0', 'y0', 'x1', 'y1')
+
+
+def _extract_page_words(page, logger: logging.Logger) -> list:
+    """استخراج الكلمات من الصفحة بشكل آمن مع معالجة محسنة"""
+    try:
+        extracted_words = page.extract_words(
+            keep_blank_chars=True,
+            x_tolerance=3,
+            y_tolerance=3,
+            extra_attrs=['fontname', 'size', 'object_type', 'color']
+        )
+
+        # حلقة واحدة تبني قواميس الكلمات مباشرة: كل المستهلكين (العمال، PDFHandler، مسار pypdfium2)
+        # يتبادلون قواميس، فمسار NumPy للتقريب سيضيف بناء مصفوفة وتحويلها إلى قوائم دون توفير المرور
+        processed_words = []
+        append = processed_words.append
+        for word in extracted_words:
+            text = word.get('text', '').strip()
+            if not text:
+                continue
+
+            # تنظيف وتحسين البيانات المستخرجة
+            x0, y0, x1, y1 = _word_coords(word)
+            get = word.get
+            append({
+                'text': text,
+                'x0': round(float(x0), 2),
+                'y0': round(float(y0), 2),
+                'x1': round(float(x1), 2),
+                'y1': round(float(y1), 2),
+                'fontname': get('fontname', 'Unknown'),
+                'size': round(float(get('size', 0)), 1),
+                'color': get('color', (0, 0, 0)),
+                'object_type': get('object_type', 'text')
+            })
+
+        return processed_words
+
+    except Exception as e:
+        logger.error(f"خطأ في استخراج الكلمات: {str(e)}")
+        return []
+
+
+def _extract_blocks_worker(pdf_path: str, start: int, stop: int,
+                           block_config: Dict) -> Tuple[List[Tuple[List[Dict], float, float]], Dict]:
+    """استخراج كتل نطاق من الصفحات عبر TextBlockManager داخل عملية منفصلة"""
+    import pdfplumber
+    block_manager = TextBlockManager()
+    block_manager.config.update(block_config)
+    block_manager.current_page = start
+    pages = []
+    with pdfplumber.open(pdf_path) as pdf:
+        for page in pdf.pages[start:stop]:
+            blocks = block_manager.process_page_content(page)
+            pages.append((blocks, float(page.width), float(page.height)))
+    return pages, block_manager.stats
+
+
+def _extract_pdfium_words(pdf_path: str, start: int, stop: int) -> List[List[Dict]]:
+    """استخراج مقاطع النص وإطاراتها عبر pypdfium2 (أسرع بكثير من pdfminer) بنفس صيغة _extract_page_words"""
+    pdf = pdfium.PdfDocument(pdf_path)
+    try:
+        pages_words = []
+        for page_index in range(start, stop):
+            page = pdf[page_index]
+            textpage = page.get_textpage()
+            try:
+                words = []
+                for rect_index in range(textpage.count_rects()):
+                    left, bottom, right, top = textpage.get_rect(rect_index)
+                    text = textpage.get_text_bounded(left, bottom, right, top).strip()
+                    if not text:
+                        continue
+                    words.append({
+                        'text': text,
+                        'x0': round(float(left), 2),
+                        'y0': round(float(bottom), 2),
+                        'x1': round(float(right), 2),
+                        'y1': round(float(top), 2),
+                        'fontname': 'Unknown',
+                        'size': round(float(top - bottom), 1),
+                        'color': (0, 0, 0),
+                        'object_type': 'text'
+                    })
+                pages_words.append(words)
+            finally:
+                textpage.close()
+                page.close()
+        return pages_words
+    finally:
+        pdf.close()
+
+
+def _extract_words_worker(pdf_path: str, start: int, stop: int,
+                          fast_parser: bool = False) -> List[List[Dict]]:
+    """استخراج كلمات نطاق من الصفحات داخل عملية منفصلة"""
+    if fast_parser and pdfium is not None:
+        return _extract_pdfium_words(pdf_path, start, stop)
+    import pdfplumber
+    logger = logging.getLogger(__name__)
+    with pdfplumber.open(pdf_path) as pdf:
+        return [
+            _extract_page_words(page, logger)
+            for page in pdf.pages[start:stop]
+        ]
+
+
 class PDFProcessor:
     """معالج ملفات PDF المتخصص في كتب الشطرنج"""
     
@@ -1650,45 +2742,63 @@ class PDFProcessor:
         self.block_manager = TextBlockManager(config_manager)  # إضافة BlockManager
         self.text_extractor.block_manager = self.block_manager  # ربط المكونات
         self.font_manager = FontManager(config_manager)
+        _register_pdf_fonts()
         self.stats = self._init_stats()
+        self.timings = self._init_timings()
+        # خيوط كتابة التقرير والذاكرة المؤقتة في الخلفية (غير خفية: المفسر ينتظرها قبل الخروج)
+        self._background_writers: List[threading.Thread] = []
 
-    def _init_stats(self) -> Dict:
-        """تهيئة الإحصائيات"""
-        return {
+    def _init_stats(self) -> Counter:
+        """تهيئة عدادات الإحصائيات"""
+        return Counter({
             'total_pages': 0,
             'processed_pages': 0,
             'translated_blocks': 0,
             'chess_moves': 0,
             'diagrams': 0,
             'annotations': 0,
+            'total_blocks': 0,
+            'failed_translations': 0
+        })
+
+    def _init_timings(self) -> Dict:
+        """تهيئة أوقات المعالجة"""
+        return {
             'start_time': None,
             'end_time': None,
-            'total_blocks': 0,
-            'failed_translations': 0,
             'processing_time': 0
         }
 
+    # أقصى عدد عمليات لاستخراج الكتل وأقل عدد صفحات يستحق التوزيع
+    MAX_WORKERS = 4
+    PARALLEL_MIN_PAGES = 8
+
     def process_pdf(self, input_path: str, output_path: str) -> bool:
         """معالجة ملف PDF"""
         try:
-            self.stats['start_time'] = datetime.now()
+            import pdfplumber
+            from tqdm import tqdm
+            self.timings['start_time'] = datetime.now()
             self.logger.info(f"بدء معالجة الملف: {input_path}")
 
-            # استخراج النصوص من الملف
             with pdfplumber.open(input_path) as pdf:
                 self.stats['total_pages'] = len(pdf.pages)
-                processed_pages = []
+            processed_pages = []
 
-                for page_num, page in enumerate(tqdm(pdf.pages, desc="تقدم المعالجة"), 1):
-                    self.logger.info(f"معالجة صفحة {page_num}")
-                    
-                    # استخراج وتحليل الكتل
-                    blocks = self.block_manager.process_page_content(page)
-                    
-                    # معالجة وترجمة المحتوى
-                    processed_page = self._process_page_blocks(blocks, page.width, page.height)
-                    processed_pages.append(processed_page)
-                    self.stats['processed_pages'] += 1
+            # استخراج الكتل (بالتوازي للملفات الكبيرة) ثم ترجمتها في العملية الرئيسية
+            page_blocks = self._iter_page_blocks(input_path, self.stats['total_pages'])
+            for page_num, (blocks, width, height) in enumerate(
+                tqdm(page_blocks, total=self.stats['total_pages'], desc="تقدم المعالجة"), 1
+            ):
+                self.logger.info(f"معالجة صفحة {page_num}")
+                
+                # معالجة وترجمة المحتوى
+                processed_page = self._process_page_blocks(blocks, width, height)
+                processed_pages.append(processed_page)
+                self.stats['processed_pages'] += 1
+
+            # ترجمة كتل جميع الصفحات دفعة واحدة
+            self._translate_pages(processed_pages)
 
             # إنشاء PDF المترجم
             self._create_output_pdf(processed_pages, output_path)
@@ -1702,38 +2812,81 @@ class PDFProcessor:
             self.logger.error(f"خطأ في معالجة الملف PDF: {str(e)}")
             return False
 
+    def _iter_page_blocks(self, input_path: str, total_pages: int):
+        """توليد (الكتل، العرض، الارتفاع) لكل صفحة بالترتيب، بالتوازي على عدة عمليات عند الإمكان"""
+        import pdfplumber
+        next_page = 0
+        workers = min(os.cpu_count() or 1, self.MAX_WORKERS, total_pages)
+
+        if workers > 1 and total_pages >= self.PARALLEL_MIN_PAGES:
+            try:
+                with ProcessPoolExecutor(max_workers=workers) as executor:
+                    futures = [
+                        executor.submit(_extract_blocks_worker, input_path, start, stop,
+                                        self.block_manager.config)
+                        for start, stop in _page_ranges(total_pages, workers)
+                    ]
+                    # جمع النتائج بترتيب الصفحات ودمج إحصائيات العمال
+                    for future in futures:
+                        pages, worker_stats = future.result()
+                        for key, value in worker_stats.items():
+                            if isinstance(value, int) and key in self.block_manager.stats:
+                                self.block_manager.stats[key] += value
+                        self.block_manager.current_page += len(pages)
+                        for page in pages:
+                            next_page += 1
+                            yield page
+                return
+
+            except Exception as e:
+                self.logger.warning(f"تعذرت المعالجة المتوازية، جاري المعالجة التسلسلية: {str(e)}")
+
+        # المعالجة التسلسلية (أو إكمال ما تبقى بعد فشل المعالجة المتوازية)
+        with pdfplumber.open(input_path) as pdf:
+            for page in pdf.pages[next_page:]:
+                blocks = self.block_manager.process_page_content(page)
+                yield blocks, page.width, page.height
+
     def _process_page_blocks(self, blocks: List[Dict], width: float, height: float) -> Dict:
         """معالجة كتل الصفحة"""
         processed_blocks = []
 
         self.logger.info(f"عدد الكتل المكتشفة: {len(blocks)}")  # إضافة
+        debug_enabled = self.logger.isEnabledFor(logging.DEBUG)
+        # عدادات محلية تُضاف إلى الإحصائيات مرة واحدة بعد الحلقة
+        chess_moves = failed = 0
 
         for block in blocks:
             try:
-                self.stats['total_blocks'] += 1
                 
                 # طباعة معلومات عن نوع الكتلة
-                self.logger.debug(f"نوع الكتلة: {block['type']}, اللغة: {block.get('language', 'غير محدد')}")  # إضافة
+                if debug_enabled:
+                    self.logger.debug(f"نوع الكتلة: {block['type']}, اللغة: {block.get('language', 'غير محدد')}")  # إضافة
                 
                 if block['type'] == 'chess':
                     chess_elements = block.get('metadata', {}).get('chess_elements', [])
-                    self.stats['chess_moves'] += len(chess_elements)
-                    self.logger.debug(f"تم اكتشاف {len(chess_elements)} حركة شطرنج")  # إضافة
+                    chess_moves += len(chess_elements)
+                    if debug_enabled:
+                        self.logger.debug(f"تم اكتشاف {len(chess_elements)} حركة شطرنج")  # إضافة
                     processed_blocks.append(block)
                     
                 elif block.get('needs_translation', False):
-                    self.logger.debug(f"محاولة ترجمة نص: {block['text'][:50]}...")  # إضافة
-                    translated_block = self._translate_block(block)
-                    processed_blocks.append(translated_block)
+                    # تُترجم لاحقاً مع كل كتل الملف في دفعة واحدة (_translate_pages)
+                    if debug_enabled:
+                        self.logger.debug(f"إضافة نص للترجمة: {block['text'][:50]}...")  # إضافة
+                    processed_blocks.append(block.copy())
                     
                 else:
+                    self._set_display_text(block)
                     processed_blocks.append(block)
 
             except Exception as e:
                 self.logger.error(f"خطأ في معالجة كتلة: {str(e)}")
                 processed_blocks.append(block)
-                self.stats['failed_translations'] += 1
+                failed += 1
 
+        self.stats.update(total_blocks=len(blocks), chess_moves=chess_moves,
+                          failed_translations=failed)
         self.logger.info(f"تمت معالجة {len(processed_blocks)} كتلة")  # إضافة
 
         return {
@@ -1742,6 +2895,42 @@ class PDFProcessor:
             'height': height
         }
 
+    # عدد النصوص في كل طلب ترجمة عند ترجمة كتل الملف كاملاً
+    TRANSLATION_CHUNK_SIZE = 100
+
+    def _translate_pages(self, pages: List[Dict]):
+        """ترجمة الكتل التي تحتاج إلى ترجمة في كل الصفحات بطلبات مجمّعة ثم توزيع الترجمات عليها"""
+        pending = [
+            block
+            for page in pages
+            for block in page['blocks']
+            if block.get('type') != 'chess' and block.get('needs_translation', False)
+        ]
+        if not pending:
+            return
+
+        self.logger.info(f"ترجمة {len(pending)} كتلة من {len(pages)} صفحة")
+        try:
+            translations = self.translation_processor.process_text_batch(
+                [block['text'] for block in pending],
+                chunk_size=self.TRANSLATION_CHUNK_SIZE
+            )
+        except Exception as e:
+            self.logger.error(f"خطأ في ترجمة النصوص: {str(e)}")
+            for block in pending:
+                block['translated_text'] = block['text']
+            self.stats['failed_translations'] += len(pending)
+            return
+
+        translated = 0
+        for block, translated_text in zip(pending, translations):
+            if translated_text and translated_text != block['text']:
+                block['translated_text'] = translated_text
+                block['original_text'] = block['text']
+                translated += 1
+            self._set_display_text(block)
+        self.stats['translated_blocks'] += translated
+
     def _translate_block(self, block: Dict) -> Dict:
         """ترجمة كتلة نصية واحدة"""
         translated_block = block.copy()
@@ -1751,6 +2940,7 @@ class PDFProcessor:
                 translated_block['translated_text'] = translated_text
                 translated_block['original_text'] = block['text']
                 self.stats['translated_blocks'] += 1
+            self._set_display_text(translated_block)
         except Exception as e:
             self.logger.error(f"خطأ في ترجمة النص: {str(e)}")
             translated_block['translated_text'] = block['text']
@@ -1761,12 +2951,41 @@ class PDFProcessor:
     def _create_output_pdf(self, pages: List[Dict], output_path: str):
         """إنشاء PDF المترجم"""
         try:
+            from reportlab.pdfgen import canvas
+            from reportlab.pdfbase import pdfmetrics
             c = canvas.Canvas(output_path, pagesize=(pages[0]['width'], pages[0]['height']))
+            # الخط العربي قد لا يكون مسجلاً (لم يُعثر عليه ولم يُحمّل)؛ يُستبدل به Helvetica مرة واحدة
+            registered = set(pdfmetrics.getRegisteredFontNames())
+            fallback_fonts = {}
 
             for page in pages:
-                # رسم النصوص
-                for block in page['blocks']:
-                    self._draw_block(c, block)
+                # إعادة استخدام اللوحة نفسها لكل الصفحات مع ضبط مقاس كل صفحة
+                c.setPageSize((page['width'], page['height']))
+                # رسم نصوص الصفحة في كائن نص واحد (BT/ET واحد)، مرتبة حسب الخط
+                # والحجم حتى لا يتغير الخط إلا عند الحاجة
+                draw_params = [self._block_draw_params(block) for block in page['blocks']]
+                draw_params = sorted(
+                    (params for params in draw_params if params),
+                    key=itemgetter(0, 1)
+                )
+                text_obj = c.beginText()
+                current_font = None
+                for font_name, size, x, y, text in draw_params:
+                    if font_name not in registered:
+                        if font_name not in fallback_fonts:
+                            self.logger.warning(f"الخط {font_name} غير مسجل، سيُستخدم Helvetica")
+                            fallback_fonts[font_name] = "Helvetica"
+                        font_name = fallback_fonts[font_name]
+                    try:
+                        if (font_name, size) != current_font:
+                            text_obj.setFont(font_name, size)
+                            current_font = (font_name, size)
+                        text_obj.setTextOrigin(x, y)
+                        text_obj.textOut(text)
+                    except Exception as e:
+                        # تخطي الكتلة المعطوبة وحدها دون إفشال المستند كله
+                        self.logger.error(f"خطأ في رسم الكتلة: {str(e)}")
+                c.drawText(text_obj)
                 c.showPage()
 
             c.save()
@@ -1776,40 +2995,61 @@ class PDFProcessor:
             self.logger.error(f"خطأ في إنشاء PDF: {str(e)}")
             raise
 
-    def _draw_block(self, canvas_obj, block: Dict):
-        """رسم كتلة نصية على PDF"""
+    def _set_display_text(self, block: Dict) -> None:
+        """تشكيل النص العربي مرة واحدة عند الترجمة وحفظه في الكتلة لاستخدامه عند الرسم"""
+        if block.get('type') != 'chess' and block.get('language') == 'ar':
+            block['display_text'] = _shape_bidi(block.get('translated_text', block['text']))
+
+    def _block_draw_params(self, block: Dict) -> Optional[Tuple[str, float, float, float, str]]:
+        """حساب الخط والحجم والموقع والنص المعروض لكتلة نصية"""
         try:
-            text = block.get('translated_text', block['text'])
             x, y = block['bbox'][0], block['bbox'][3]
             
             if block['type'] == 'chess':
+                text = block.get('translated_text', block['text'])
                 font_name = "Helvetica"
+            elif block['language'] == 'ar':
+                text = block.get('display_text')
+                if text is None:
+                    text = _shape_bidi(block.get('translated_text', block['text']))
+                font_name = "Amiri-Regular"
             else:
-                if block['language'] == 'ar':
-                    text = arabic_reshaper.reshape(text)
-                    text = get_display(text)
-                    font_name = "Amiri-Regular"
-                else:
-                    font_name = "Helvetica"
+                text = block.get('translated_text', block['text'])
+                font_name = "Helvetica"
 
             size = block['size'] or 12
-            canvas_obj.setFont(font_name, size)
-            canvas_obj.drawString(x, y, text)
+            return font_name, size, x, y, text
 
         except Exception as e:
-            self.logger.error(f"خطأ في رسم الكتلة: {str(e)}")
+            self.logger.error(f"خطأ في تجهيز الكتلة للرسم: {str(e)}")
+            return None
 
     def _finalize_processing(self, output_path: str):
         """إنهاء المعالجة وحفظ التقارير"""
-        self.stats['end_time'] = datetime.now()
-        self.stats['processing_time'] = (self.stats['end_time'] - self.stats['start_time']).total_seconds()
+        self.timings['end_time'] = datetime.now()
+        self.timings['processing_time'] = (self.timings['end_time'] - self.timings['start_time']).total_seconds()
         
-        # دمج إحصائيات المكونات
-        self.stats.update(self.block_manager.get_stats())
+        # دمج عدادات المكونات (القيم العددية فقط؛ الأوقات محفوظة في self.timings)
+        for key, value in self.block_manager.get_stats().items():
+            if isinstance(value, int):
+                self.stats[key] = value
         
-        # حفظ التقرير المفصل
-        self._save_detailed_report(output_path)
-        self.cache.save_cache()
+        # حفظ التقرير المفصل والذاكرة المؤقتة في الخلفية دون تأخير عودة process_pdf،
+        # بعد انتهاء كتابات الملف السابق حتى لا تتزامن كتابتان للذاكرة المؤقتة نفسها
+        self.wait_for_background_writes()
+        writers = [
+            threading.Thread(target=self._save_detailed_report, args=(output_path,),
+                             name='report-writer'),
+            threading.Thread(target=self.cache.save_cache, name='cache-writer')
+        ]
+        for writer in writers:
+            writer.start()
+        self._background_writers.extend(writers)
+
+    def wait_for_background_writes(self):
+        """انتظار انتهاء كتابة التقارير والذاكرة المؤقتة الجارية في الخلفية"""
+        while self._background_writers:
+            self._background_writers.pop().join()
 
     def _save_detailed_report(self, output_path: str):
         """حفظ تقرير مفصل"""
@@ -1819,7 +3059,7 @@ class PDFProcessor:
                     'total_pages': self.stats['total_pages'],
                     'processed_pages': self.stats['processed_pages'],
                     'total_blocks': self.stats['total_blocks'],
-                    'processing_time': self.stats['processing_time']
+                    'processing_time': self.timings['processing_time']
                 },
                 'content_stats': {
                     'chess_blocks': self.stats.get('chess_blocks', 0),
@@ -1833,13 +3073,13 @@ class PDFProcessor:
                     'failed_translations': self.stats['failed_translations']
                 },
                 'timing': {
-                    'start_time': self.stats['start_time'].isoformat(),
-                    'end_time': self.stats['end_time'].isoformat(),
-                    'duration_seconds': self.stats['processing_time']
+                    'start_time': self.timings['start_time'],
+                    'end_time': self.timings['end_time'],
+                    'duration_seconds': self.timings['processing_time']
                 },
                 'metadata': {
                     'version': '2.0.0',
-                    'timestamp': datetime.now().isoformat(),
+                    'timestamp': datetime.now(),
                     'user': os.getenv('USER', 'x9ci')
                 }
             }
@@ -1854,8 +3094,8 @@ class PDFProcessor:
             print(f"الترجمات الفاشلة: {self.stats['failed_translations']}")
             
             report_path = output_path.replace('.pdf', '.report.json')
-            with open(report_path, 'w', encoding='utf-8') as f:
-                json.dump(report, f, ensure_ascii=False, indent=4)
+            with open(report_path, 'wb') as f:
+                f.write(_json_dumps_pretty(report))
             
             self.logger.info(f"تم حفظ تقرير المعالجة في: {report_path}")
 
@@ -1864,12 +3104,95 @@ class PDFProcessor:
             
                
 
+def _reading_order_key(block: Dict) -> Tuple[float, float]:
+    """مفتاح ترتيب الكتل: (y, x) لإطارها، يُحسب مرة واحدة لكل كتلة مع الترتيب التنازلي"""
+    bbox = block.get('bbox', (0, 0, 0, 0))
+    return float(bbox[1]), float(bbox[0])
+
+
+class _PlacementGrid:
+    """فهرس شبكي للمستطيلات المستخدمة: فحص التداخل يقتصر على الخلايا التي يغطيها المستطيل"""
+
+    def __init__(self, cell_size: float = 50.0):
+        self.cell_size = cell_size
+        # أعمدة متوازية من الأعداد (بدلاً من صف لكل مستطيل) مع حساب الحافتين اليمنى والعليا مسبقاً
+        self.xs = array('d')
+        self.ys = array('d')
+        self.rights = array('d')
+        self.tops = array('d')
+        self.cells: Dict[Tuple[int, int], List[int]] = defaultdict(list)
+
+    def _cells(self, x, y, w, h):
+        """الخلايا التي يغطيها المستطيل (x, y, w, h)"""
+        size = self.cell_size
+        for cx in range(int(x // size), int((x + w) // size) + 1):
+            for cy in range(int(y // size), int((y + h) // size) + 1):
+                yield cx, cy
+
+    def add(self, x: float, y: float, w: float, h: float) -> None:
+        """إضافة مستطيل إلى الفهرس"""
+        index = len(self.xs)
+        self.xs.append(x)
+        self.ys.append(y)
+        self.rights.append(x + w)
+        self.tops.append(y + h)
+        for cell in self._cells(x, y, w, h):
+            self.cells[cell].append(index)
+
+    def append(self, rect) -> None:
+        """إضافة مستطيل (x, y, w, h) إلى الفهرس"""
+        self.add(*rect)
+
+    def overlaps(self, rect) -> bool:
+        """التحقق من تداخل المستطيل مع أي مستطيل مضاف"""
+        x, y, w, h = rect
+        right, top = x + w, y + h
+        xs, ys, rights, tops = self.xs, self.ys, self.rights, self.tops
+        cells = self.cells
+        for cell in self._cells(x, y, w, h):
+            for index in cells.get(cell, ()):
+                if (x < rights[index] and right > xs[index] and
+                    y < tops[index] and top > ys[index]):
+                    return True
+        return False
+
+    def __len__(self):
+        return len(self.xs)
+
+
+def _scan_free_position(x, y, w, h, xs, ys, rights, tops, n, page_w, page_h):
+    """البحث عن أول موقع خالٍ للمستطيل بنفس خطوات find_optimal_position (حلقة عددية صرفة)"""
+    while True:
+        right = x + w
+        top = y + h
+        overlap = False
+        for i in range(n):
+            if x < rights[i] and right > xs[i] and y < tops[i] and top > ys[i]:
+                overlap = True
+                break
+        if not overlap:
+            break
+        y -= h + 5
+        if y < 5:
+            y = page_h - h - 5
+            x += w + 10
+            if x + w > page_w - 5:
+                x = 5.0
+                y = page_h - h - 5
+                break
+    return x, y
+
+
+# نسخة مترجمة إلى شيفرة أصلية عبر Numba عند توفرها
+_scan_free_position_jit = njit(cache=True)(_scan_free_position) if njit is not None else None
+
+
 class PageProcessor:
     """معالج الصفحات وترجمة النصوص"""
     
     def __init__(self, text_processor):
+        self.logger = logging.getLogger(__name__)
         self.text_processor = text_processor
-        self.batch_size = 10
         self.processed_blocks = set()
         self.font_size = 12
         self.stats = {
@@ -1900,98 +3223,27 @@ class PageProcessor:
             
         try:
             # ترتيب المحتوى من أعلى إلى أسفل ومن اليمين إلى اليسار
-            sorted_content = sorted(
-                page_content,
-                key=lambda x: (-float(x.get('bbox', (0,0,0,0))[1]), -float(x.get('bbox', (0,0,0,0))[0]))
-            )
-
-            for block in sorted_content:
-                try:
-                    if not self._validate_block(block):
-                        continue
-
-                    text = self.text_processor.clean_text(block.get('text', ''))
-                    if not self._should_process_text(text):
-                        continue
-
-                    text_batch.append(text)
-                    blocks_to_process.append(block)
-
-                    if len(text_batch) >= self.batch_size:
-                        self.process_and_add_translations(
-                            text_batch, blocks_to_process, translated_blocks, page_num
-                        )
-                        text_batch = []
-                        blocks_to_process = []
-
-                except Exception as e:
-                    self._log_error(f"خطأ في معالجة كتلة النص", e, page_num)
-                    continue
-
-            # معالجة الكتل المتبقية
-            if text_batch:
-                self.process_and_add_translations(
-                    text_batch, blocks_to_process, translated_blocks, page_num
-                )
-
-            return translated_blocks
-                
-        except Exception as e:
-            self._log_error(f"خطأ في معالجة الصفحة {page_num + 1}", e, page_num)
-            return []
+            sorted_content = sorted(page_content, key=_reading_order_key, reverse=True)
+            valid_blocks = [block for block in sorted_content if self._validate_block(block)]
 
-    
-    def process_page(self, page_content, page_num: int):
-        """
-        معالجة صفحة كاملة
-        
-        Args:
-            page_content: محتوى الصفحة
-            page_num: رقم الصفحة
-            
-        Returns:
-            List[Dict]: الكتل المترجمة
-        """
-        logging.info(f"معالجة الصفحة {page_num + 1}")
-        translated_blocks = []
-        text_batch = []
-        blocks_to_process = []
-        
-        if not page_content:
-            logging.warning(f"لا يوجد محتوى في الصفحة {page_num + 1}")
-            return []
-            
-        try:
-            # ترتيب المحتوى من أعلى إلى أسفل ومن اليمين إلى اليسار
-            sorted_content = sorted(
-                page_content,
-                key=lambda x: (-float(x.get('bbox', (0,0,0,0))[1]), -float(x.get('bbox', (0,0,0,0))[0]))
+            # تنظيف نصوص الصفحة كاملة دفعة واحدة
+            cleaned_texts = self.text_processor.clean_texts(
+                [block.get('text', '') for block in valid_blocks]
             )
 
-            for block in sorted_content:
+            for block, text in zip(valid_blocks, cleaned_texts):
                 try:
-                    if not self._validate_block(block):
-                        continue
-
-                    text = self.text_processor.clean_text(block.get('text', ''))
                     if not self._should_process_text(text):
                         continue
 
                     text_batch.append(text)
                     blocks_to_process.append(block)
 
-                    if len(text_batch) >= self.batch_size:
-                        self.process_and_add_translations(
-                            text_batch, blocks_to_process, translated_blocks, page_num
-                        )
-                        text_batch = []
-                        blocks_to_process = []
-
                 except Exception as e:
                     self._log_error(f"خطأ في معالجة كتلة النص", e, page_num)
                     continue
 
-            # معالجة الكتل المتبقية
+            # ترجمة نصوص الصفحة كاملة في دفعة واحدة
             if text_batch:
                 self.process_and_add_translations(
                     text_batch, blocks_to_process, translated_blocks, page_num
@@ -2004,7 +3256,8 @@ class PageProcessor:
             return []
 
     
-    def _validate_block(self, block: Dict) -> bool:
+    @staticmethod
+    def _validate_block(block: Dict) -> bool:
         """التحقق من صحة الكتلة"""
         return (
             isinstance(block, dict) and
@@ -2024,8 +3277,13 @@ class PageProcessor:
                                   translated_blocks: List[Dict], page_num: int):
         """معالجة وإضافة الترجمات"""
         try:
-            print(f"معالجة {len(texts)} نص للترجمة")
-            translations = self.text_processor.process_text_batch(texts)
+            debug_enabled = self.logger.isEnabledFor(logging.DEBUG)
+            if debug_enabled:
+                self.logger.debug(f"معالجة {len(texts)} نص للترجمة")
+            translations = self._translate_unique(texts)
+            added = 0
+            # طابع زمني واحد لكل كتل الدفعة بدلاً من تنسيقه لكل كتلة
+            timestamp = datetime.utcnow().isoformat()
             
             for trans, block in zip(translations, blocks):
                 try:
@@ -2033,6 +3291,7 @@ class PageProcessor:
                         # إضافة معلومات الترجمة
                         translated_block = {
                             'text': trans,
+                            'display_text': _shape_bidi(trans),
                             'bbox': block['bbox'],
                             'original_bbox': block['bbox'],
                             'type': 'text',
@@ -2040,21 +3299,31 @@ class PageProcessor:
                             'original': block.get('text', ''),
                             'font': block.get('font', 'Arabic'),
                             'size': block.get('size', self.font_size),
-                            'timestamp': datetime.utcnow().isoformat()
+                            'timestamp': timestamp
                         }
                         
                         translated_blocks.append(translated_block)
-                        self.stats['translated_blocks'] += 1
-                        self.stats['processed_blocks'] += 1
-                        print(f"تمت إضافة الترجمة: {trans}")
+                        added += 1
+                        if debug_enabled:
+                            self.logger.debug(f"تمت إضافة الترجمة: {trans}")
                         
                 except Exception as e:
                     self._log_error("خطأ في إضافة الترجمة للكتلة", e, page_num)
                     continue
+            
+            self.stats['translated_blocks'] += added
+            self.stats['processed_blocks'] += added
                     
         except Exception as e:
             self._log_error("خطأ في معالجة دفعة الترجمة", e, page_num)
 
+    def _translate_unique(self, texts: List[str]) -> List[str]:
+        """ترجمة النصوص بعد إزالة المكرر منها (بعد توحيد المسافات) ثم إعادة توزيعها بالترتيب"""
+        keys = [' '.join(text.split()) for text in texts]
+        unique = list(dict.fromkeys(keys))
+        mapping = dict(zip(unique, self.text_processor.process_text_batch(unique)))
+        return [mapping.get(key) for key in keys]
+
     def _log_error(self, message: str, error: Exception, page_num: int):
         """تسجيل الأخطاء"""
         error_info = {
@@ -2064,63 +3333,20 @@ class PageProcessor:
             'time': datetime.utcnow().isoformat()
         }
         self.stats['errors'].append(error_info)
-        print(f"{message}: {str(error)}")
-        logging.error(f"{message}: {str(error)}")
-
-    # ... (باقي الدوال بدون تغيير)
-    
-    def process_and_add_translations(self, texts: List[str], blocks: List[Dict], 
-                                  translated_blocks: List[Dict], page_num: int):
-        """معالجة وإضافة الترجمات"""
-        try:
-            print(f"معالجة {len(texts)} نص للترجمة")
-            translations = self.text_processor.process_text_batch(texts)
-            
-            for trans, block in zip(translations, blocks):
-                try:
-                    if trans and trans.strip():
-                        # إضافة معلومات الترجمة
-                        translated_block = {
-                            'text': trans,
-                            'bbox': block['bbox'],
-                            'original_bbox': block['bbox'],
-                            'type': 'text',
-                            'page': page_num,
-                            'original': block.get('text', '')
-                        }
-                        
-                        translated_blocks.append(translated_block)
-                        self.stats['translated_blocks'] += 1
-                        print(f"تمت إضافة الترجمة: {trans}")
-                        
-                except Exception as e:
-                    print(f"خطأ في إضافة الترجمة للكتلة: {str(e)}")
-                    self.stats['errors'].append({
-                        'page': page_num,
-                        'error': str(e),
-                        'time': datetime.now().isoformat()
-                    })
-                    continue
-                    
-        except Exception as e:
-            print(f"خطأ في معالجة دفعة الترجمة: {str(e)}")
-            logging.error(f"خطأ في معالجة دفعة الترجمة: {str(e)}")
-            self.stats['errors'].append({
-                'page': page_num,
-                'error': str(e),
-                'time': datetime.now().isoformat()
-            })
+        self.logger.error(f"{message}: {str(error)}")
 
     def create_translated_overlay(self, translated_blocks, page_num, page_size):
         """إنشاء طبقة الترجمة"""
         try:
+            from reportlab.pdfgen import canvas
             packet = BytesIO()
             width, height = float(page_size[0]), float(page_size[1])
             c = canvas.Canvas(packet, pagesize=(width, height))
-            used_positions = []
+            used_positions = _PlacementGrid()
             
-            print(f"إنشاء طبقة الترجمة للصفحة {page_num + 1}")
-            print(f"عدد الكتل المترجمة: {len(translated_blocks)}")
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug(f"إنشاء طبقة الترجمة للصفحة {page_num + 1}")
+                self.logger.debug(f"عدد الكتل المترجمة: {len(translated_blocks)}")
 
             for block in translated_blocks:
                 try:
@@ -2146,14 +3372,14 @@ class PageProcessor:
                     # كتابة النص العربي
                     c.setFont("Arabic", self.font_size)
                     c.setFillColorRGB(0, 0, 0)  # لون أسود للنص
-                    c.drawRightString(x + text_width, y + text_height, text)
+                    c.drawRightString(x + text_width, y + text_height, block.get('display_text', text))
                     
                     # رسم خط توضيحي
                     self.draw_connection_line(c, x, y, bbox, text_width, text_height, height)
-                    used_positions.append((x, y, text_width, text_height))
+                    used_positions.add(x, y, text_width, text_height)
 
                 except Exception as e:
-                    print(f"خطأ في معالجة كتلة نص: {str(e)}")
+                    self.logger.error(f"خطأ في معالجة كتلة نص: {str(e)}")
                     continue
 
             c.save()
@@ -2161,7 +3387,7 @@ class PageProcessor:
             return packet
 
         except Exception as e:
-            print(f"خطأ في إنشاء طبقة الترجمة: {str(e)}")
+            self.logger.error(f"خطأ في إنشاء طبقة الترجمة: {str(e)}")
             # إنشاء صفحة فارغة في حالة الخطأ
             empty_packet = BytesIO()
             c = canvas.Canvas(empty_packet, pagesize=(width, height))
@@ -2182,6 +3408,16 @@ class PageProcessor:
         x = max(5, min(x, page_width - text_width - 5))
         y = max(5, min(y, page_height - text_height - 5))
         
+        if _scan_free_position_jit is not None and isinstance(used_positions, _PlacementGrid):
+            return _scan_free_position_jit(
+                float(x), float(y), float(text_width), float(text_height),
+                np.frombuffer(used_positions.xs, dtype=np.float64),
+                np.frombuffer(used_positions.ys, dtype=np.float64),
+                np.frombuffer(used_positions.rights, dtype=np.float64),
+                np.frombuffer(used_positions.tops, dtype=np.float64),
+                len(used_positions), float(page_width), float(page_height)
+            )
+        
         while self.check_overlap((x, y, text_width, text_height), used_positions):
             y -= text_height + 5
             if y < 5:
@@ -2194,8 +3430,11 @@ class PageProcessor:
 
         return x, y
 
-    def check_overlap(self, current_rect, used_positions):
+    @staticmethod
+    def check_overlap(current_rect, used_positions):
         """التحقق من تداخل النصوص"""
+        if isinstance(used_positions, _PlacementGrid):
+            return used_positions.overlaps(current_rect)
         x, y, w, h = current_rect
         for used_x, used_y, used_w, used_h in used_positions:
             if (x < used_x + used_w and x + w > used_x and
@@ -2237,18 +3476,66 @@ class PageProcessor:
         """الحصول على إحصائيات المعالجة"""
         return self.stats
 
+
+@dataclass
+class MetricsSnapshot:
+    """لقطة من مقاييس المعالجة تُحسب مرة واحدة لكل تقرير"""
+    now: datetime
+    elapsed: float          # الثواني منذ بدء المعالجة
+    rss_mb: float           # الذاكرة المقيمة بالميجابايت
+    speed: float            # الصفحات المعدلة في الثانية
+    success_rate: float     # نسبة مئوية
+    error_rate: float       # نسبة مئوية
+
+
+class _PageBitmap:
+    """مجموعة أرقام صفحات مخزنة كخريطة بتات (بت واحد لكل صفحة بدلاً من set)"""
+
+    def __init__(self, total_pages: int = 0):
+        self.bits = bytearray((total_pages + 7) // 8)
+        self._count = 0
+
+    def add(self, page_num: int) -> None:
+        """تعليم الصفحة"""
+        index, mask = page_num >> 3, 1 << (page_num & 7)
+        if index >= len(self.bits):
+            self.bits.extend(bytes(index + 1 - len(self.bits)))
+        if not self.bits[index] & mask:
+            self.bits[index] |= mask
+            self._count += 1
+
+    def clear(self) -> None:
+        """إزالة جميع العلامات مع الإبقاء على الحجم"""
+        self.bits[:] = bytes(len(self.bits))
+        self._count = 0
+
+    def __contains__(self, page_num: int) -> bool:
+        index = page_num >> 3
+        return index < len(self.bits) and bool(self.bits[index] >> (page_num & 7) & 1)
+
+    def __len__(self):
+        return self._count
+
+
 class PDFHandler:
     """معالج ملفات PDF الرئيسي مع دعم معالجة الأخطاء المتقدمة"""
     
     def __init__(self, config, page_processor):
         """تهيئة معالج PDF مع الإعدادات والمعالج المخصص للصفحات"""
+        from PyPDF2 import PdfWriter
         self.config = config
         self.page_processor = page_processor
         self.temp_dir = tempfile.mkdtemp()
         self.current_pdf_path = None
         self.writer = PdfWriter()
         self.current_pdf = None
-        self.modified_pages = set()  # استخدام set لتجنب التكرار
+        self.modified_pages = _PageBitmap()  # خريطة بتات للصفحات المعدلة
+        # طبقات الترجمة المؤجلة: (موضع الصفحة في writer، صفحة الطبقة)
+        self._pending_overlays: List[Tuple[int, Any]] = []
+        # آخر ملف تم التحقق منه: (المسار، وقت التعديل، الحجم، عدد الصفحات)
+        self._validated_pdf: Optional[Tuple[str, int, int, int]] = None
+        # استخراج الكلمات عبر pypdfium2 بدلاً من pdfplumber (عند توفره)
+        self.fast_parser = False
         
         # إحصائيات وتتبع الأخطاء
         self.stats = {
@@ -2258,12 +3545,25 @@ class PDFHandler:
             'total_pages': 0,
             'start_time': None,
             'end_time': None,
+            'error_count': 0,
             'errors': []
         }
+        # ملف NDJSON تُكتب فيه أخطاء الصفحات فور وقوعها بدلاً من تجميعها في الذاكرة
+        self._errors_path: Optional[Path] = None
+        self._errors_file = None
         
         # إعداد التسجيل
         self._setup_logging()
         
+        # تسجيل خطوط طبقة الترجمة مرة واحدة بدلاً من كل صفحة
+        _register_pdf_fonts()
+        
+        # ترجمة دالة البحث عن المواقع مسبقاً حتى لا تتأخر الصفحة الأولى
+        if _scan_free_position_jit is not None:
+            self.page_processor.find_optimal_position(
+                (0.0, 0.0, 0.0, 0.0), 1.0, 1.0, _PlacementGrid(), 100.0, 100.0
+            )
+        
     def _setup_logging(self):
         """إعداد نظام تسجيل الأحداث"""
         try:
@@ -2315,44 +3615,47 @@ class PDFHandler:
             self.logger.error(f"خطأ في تهيئة المعالجة: {str(e)}")
             raise
 
-    def _check_page_content(self, page) -> bool:
-        """التحقق من محتوى الصفحة قبل المعالجة"""
-        try:
-            # استخراج النص
-            text = page.extract_text()
-            if not text.strip():
-                return False
-
-            # استخراج الكلمات
-            words = page.extract_words()
-            if not words:
-                return False
+    # أقل عدد أحرف في الصفحة يستحق استخراج الكلمات وترجمتها
+    MIN_PAGE_CHARS = 2
 
-            # التحقق من وجود صور
-            images = page.images
-            if not words and not images:
-                return False
+    def _check_page_content(self, page) -> list:
+        """التحقق من محتوى الصفحة وإرجاع كلماتها لإعادة استخدامها (قائمة فارغة إن لم يكن فيها نص)"""
+        try:
+            # فحص رخيص لعدد الأحرف قبل استخراج الكلمات المكلف
+            if len(page.chars) < self.MIN_PAGE_CHARS:
+                return []
 
-            return True
+            # استخراج الكلمات مرة واحدة فقط
+            return self.extract_words_safely(page)
         except Exception as e:
             self.logger.error(f"خطأ في فحص محتوى الصفحة: {str(e)}")
-            return False
+            return []
     
     def translate_pdf(self, input_path: str, output_path: str = None) -> bool:
         """الدالة الرئيسية لترجمة ملف PDF"""
         try:
+            import pdfplumber
+            from PyPDF2 import PdfReader
+            from tqdm import tqdm
             # تهيئة المعالجة
             input_path, output_path = self._initialize_processing(input_path)
             self.logger.info(f"بدء معالجة الملف: {input_path}")
+            self._open_errors_stream(output_path)
 
             if not self.validate_pdf(str(input_path)):
                 raise ValueError("ملف PDF غير صالح أو تالف")
 
-            with pdfplumber.open(str(input_path)) as plumber_pdf:
-                self.current_pdf = PdfReader(str(input_path))
+            # قراءة الملف مرة واحدة ومشاركة البايتات بين pdfplumber و PdfReader
+            raw_bytes = Path(input_path).read_bytes()
+            with pdfplumber.open(BytesIO(raw_bytes)) as plumber_pdf:
+                self.current_pdf = PdfReader(BytesIO(raw_bytes))
                 total_pages = len(plumber_pdf.pages)
                 self.stats['total_pages'] = total_pages
 
+                # استخراج كلمات الصفحات مسبقاً على عدة عمليات؛ الترجمة والدمج
+                # في PdfWriter يبقيان في العملية الرئيسية لأنه غير آمن بين العمليات
+                page_words = self._extract_all_words(str(input_path), total_pages)
+
                 # إنشاء شريط التقدم
                 with tqdm(total=total_pages, desc="تقدم المعالجة") as progress_bar:
                     for page_num in range(total_pages):
@@ -2360,7 +3663,8 @@ class PDFHandler:
                             success = self._process_single_page(
                                 plumber_pdf.pages[page_num],
                                 page_num,
-                                progress_bar
+                                progress_bar,
+                                page_words[page_num] if page_words else None
                             )
                             if not success:
                                 self.stats['skipped_pages'] += 1
@@ -2368,6 +3672,9 @@ class PDFHandler:
                         except Exception as e:
                             self._handle_page_error(page_num, e)
                             continue
+                        finally:
+                            # تحرير الكائنات المحللة المخزنة في الصفحة بعد كتابتها
+                            plumber_pdf.pages[page_num].flush_cache()
 
                 # حفظ الملف النهائي
                 return self._save_final_pdf(output_path)
@@ -2378,19 +3685,61 @@ class PDFHandler:
         finally:
             self.cleanup()
 
-    def _process_single_page(self, page, page_num: int, progress_bar) -> bool:
+    # أقصى عدد عمليات لاستخراج الكلمات وأقل عدد صفحات يستحق التوزيع
+    MAX_WORKERS = 4
+    PARALLEL_MIN_PAGES = 8
+
+    def _extract_all_words(self, pdf_path: str, total_pages: int) -> Optional[List[List[Dict]]]:
+        """استخراج كلمات جميع الصفحات مسبقاً (بالتوازي أو عبر pypdfium2)، أو None للاستخراج صفحةً بصفحة"""
+        fast_parser = self.fast_parser and pdfium is not None
+        if self.fast_parser and not fast_parser:
+            self.logger.warning("مكتبة pypdfium2 غير مثبتة، سيتم استخدام pdfplumber")
+
+        workers = min(os.cpu_count() or 1, self.MAX_WORKERS, total_pages)
+        if workers <= 1 or total_pages < self.PARALLEL_MIN_PAGES:
+            if not fast_parser:
+                return None
+            try:
+                return _extract_pdfium_words(pdf_path, 0, total_pages)
+            except Exception as e:
+                self.logger.warning(f"تعذر الاستخراج عبر pypdfium2، جاري استخدام pdfplumber: {str(e)}")
+                return None
+
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = [
+                    executor.submit(_extract_words_worker, pdf_path, start, stop, fast_parser)
+                    for start, stop in _page_ranges(total_pages, workers)
+                ]
+                page_words = []
+                for future in futures:
+                    page_words.extend(future.result())
+                return page_words
+
+        except Exception as e:
+            self.logger.warning(f"تعذر الاستخراج المتوازي، جاري الاستخراج التسلسلي: {str(e)}")
+            return None
+
+    # حد الذاكرة المقيمة (ميجابايت) الذي يُستدعى بعده optimize_memory_usage
+    MEMORY_SOFT_CAP_MB = 1024
+
+    def _process_single_page(self, page, page_num: int, progress_bar,
+                             text_content: Optional[list] = None) -> bool:
         """معالجة صفحة واحدة من PDF"""
         try:
             self.logger.info(f"معالجة صفحة {page_num + 1}")
             
-            # استخراج النص
-            text_content = self.extract_words_safely(page)
+            # استخراج النص (ما لم يُستخرج مسبقاً)، مع تخطي الصفحات الخالية من النص
+            if text_content is None:
+                text_content = self._check_page_content(page)
             if not text_content:
+                self.writer.add_page(self.current_pdf.pages[page_num])
                 return False
 
             # معالجة النص
             translated_blocks = self.page_processor.process_page(text_content, page_num)
             if not translated_blocks:
+                self.writer.add_page(self.current_pdf.pages[page_num])
                 return False
 
             # إنشاء وإضافة الترجمة
@@ -2409,8 +3758,8 @@ class PDFHandler:
             if progress_bar:
                 progress_bar.update(1)
 
-            # تحسين الذاكرة كل 5 صفحات
-            if page_num % 5 == 0:
+            # تحسين الذاكرة فقط عند تجاوز الحد المسموح بدلاً من كل 5 صفحات
+            if self._get_memory_usage() > self.MEMORY_SOFT_CAP_MB:
                 self.optimize_memory_usage()
 
             return True
@@ -2422,6 +3771,7 @@ class PDFHandler:
     def _add_translation_to_page(self, translated_blocks: list, page_num: int, page_dimensions: Tuple[float, float]):
         """إضافة الترجمة إلى الصفحة"""
         try:
+            from PyPDF2 import PdfReader
             width, height = page_dimensions
             overlay_packet = self.page_processor.create_translated_overlay(
                 translated_blocks,
@@ -2429,24 +3779,33 @@ class PDFHandler:
                 (width, height)
             )
 
-            if overlay_packet:
-                overlay_pdf = PdfReader(overlay_packet)
-                page_obj = self.current_pdf.pages[page_num]
-                page_obj.merge_page(overlay_pdf.pages[0])
-                self.writer.add_page(page_obj)
-            else:
-                self.writer.add_page(self.current_pdf.pages[page_num])
+            overlay_page = PdfReader(overlay_packet).pages[0] if overlay_packet else None
+
+            # إضافة الصفحة الأصلية الآن وتأجيل دمج الطبقة إلى تمريرة واحدة عند الحفظ
+            self.writer.add_page(self.current_pdf.pages[page_num])
+            if overlay_page is not None:
+                self._pending_overlays.append((len(self.writer.pages) - 1, overlay_page))
 
         except Exception as e:
+            # الصفحة الأصلية تُضاف في _handle_page_error
             self.logger.error(f"خطأ في إضافة الترجمة للصفحة {page_num + 1}: {str(e)}")
-            self.writer.add_page(self.current_pdf.pages[page_num])
             raise
 
+    def _merge_pending_overlays(self):
+        """دمج كل طبقات الترجمة المؤجلة في صفحات writer بتمريرة واحدة"""
+        pages = self.writer.pages
+        for index, overlay_page in self._pending_overlays:
+            try:
+                pages[index].merge_page(overlay_page)
+            except Exception as e:
+                self.logger.error(f"خطأ في دمج طبقة الترجمة للصفحة {index + 1}: {str(e)}")
+        self._pending_overlays.clear()
+
     def _handle_page_error(self, page_num: int, error: Exception):
         """معالجة أخطاء الصفحات"""
         error_msg = f"خطأ في معالجة الصفحة {page_num + 1}: {str(error)}"
         self.logger.error(error_msg)
-        self.stats['errors'].append({
+        self._record_error({
             'page': page_num + 1,
             'error': str(error),
             'timestamp': datetime.now().isoformat()
@@ -2456,32 +3815,66 @@ class PDFHandler:
         if self.current_pdf and page_num < len(self.current_pdf.pages):
             self.writer.add_page(self.current_pdf.pages[page_num])
     
+    def _open_errors_stream(self, output_path: Path):
+        """تحديد ملف أخطاء المعالجة بجوار الملف الناتج (يُنشأ عند أول خطأ)"""
+        self._close_errors_stream()
+        self._errors_path = output_path.with_suffix('.errors.ndjson')
+        self._errors_path.unlink(missing_ok=True)
+
+    def _close_errors_stream(self):
+        """إغلاق ملف الأخطاء إن كان مفتوحاً"""
+        if self._errors_file is not None:
+            self._errors_file.close()
+            self._errors_file = None
+
+    def _record_error(self, error_info: dict):
+        """كتابة خطأ سطراً في ملف الأخطاء، أو حفظه في الذاكرة خارج عملية الترجمة"""
+        self.stats['error_count'] += 1
+        if self._errors_path is None:
+            self.stats['errors'].append(error_info)
+            return
+        try:
+            if self._errors_file is None:
+                self._errors_file = open(self._errors_path, 'ab')
+            self._errors_file.write(_json_dumps(error_info) + b'\n')
+        except Exception as e:
+            self.logger.warning(f"تعذر كتابة الخطأ في {self._errors_path}: {str(e)}")
+            self.stats['errors'].append(error_info)
+
     def validate_pdf(self, file_path: str) -> bool:
         """التحقق من صلاحية ملف PDF بشكل شامل"""
         try:
-            # التحقق من وجود الملف
-            if not os.path.exists(file_path):
+            from PyPDF2 import PdfReader
+            # التحقق من وجود الملف وحجمه باستدعاء stat واحد
+            try:
+                st = os.stat(file_path)
+            except FileNotFoundError:
                 raise FileNotFoundError(f"الملف غير موجود: {file_path}")
 
-            # التحقق من حجم الملف
-            file_size = os.path.getsize(file_path)
+            file_size = st.st_size
             if file_size == 0:
                 raise ValueError("ملف PDF فارغ")
 
             if file_size > self.config.max_file_size:
                 raise ValueError(f"حجم الملف يتجاوز الحد المسموح: {file_size} bytes")
 
+            # تخطي إعادة التحليل إن لم يتغير الملف منذ آخر تحقق
+            cached = self._validated_pdf
+            if cached and cached[:3] == (str(file_path), st.st_mtime_ns, file_size):
+                return True
+
             # التحقق من صحة PDF
             with open(file_path, 'rb') as file:
-                pdf = PdfReader(file)
-                if len(pdf.pages) == 0:
-                    raise ValueError("ملف PDF لا يحتوي على صفحات")
-                
-                # التحقق من إمكانية قراءة الصفحات
-                for i, page in enumerate(pdf.pages):
-                    if not hasattr(page, 'extract_text'):
-                        raise ValueError(f"الصفحة {i+1} غير قابلة للقراءة")
+                reader = PdfReader(file, strict=False)
+                if self.config.strict_validate:
+                    page_count = len(reader.pages)
+                else:
+                    # قراءة /Count من جذر شجرة الصفحات دون المرور على كل الصفحات
+                    page_count = int(reader.trailer['/Root']['/Pages']['/Count'])
+            if page_count == 0:
+                raise ValueError("ملف PDF لا يحتوي على صفحات")
 
+            self._validated_pdf = (str(file_path), st.st_mtime_ns, file_size, page_count)
             return True
 
         except Exception as e:
@@ -2490,38 +3883,7 @@ class PDFHandler:
 
     def extract_words_safely(self, page) -> list:
         """استخراج الكلمات من الصفحة بشكل آمن مع معالجة محسنة"""
-        try:
-            extracted_words = page.extract_words(
-                keep_blank_chars=True,
-                x_tolerance=3,
-                y_tolerance=3,
-                extra_attrs=['fontname', 'size', 'object_type', 'color']
-            )
-
-            processed_words = []
-            for word in extracted_words:
-                if not word.get('text', '').strip():
-                    continue
-
-                # تنظيف وتحسين البيانات المستخرجة
-                processed_word = {
-                    'text': word['text'].strip(),
-                    'x0': round(float(word['x0']), 2),
-                    'y0': round(float(word['y0']), 2),
-                    'x1': round(float(word['x1']), 2),
-                    'y1': round(float(word['y1']), 2),
-                    'fontname': word.get('fontname', 'Unknown'),
-                    'size': round(float(word.get('size', 0)), 1),
-                    'color': word.get('color', (0, 0, 0)),
-                    'object_type': word.get('object_type', 'text')
-                }
-                processed_words.append(processed_word)
-
-            return processed_words
-
-        except Exception as e:
-            self.logger.error(f"خطأ في استخراج الكلمات: {str(e)}")
-            return []
+        return _extract_page_words(page, self.logger)
 
     def optimize_memory_usage(self):
         """تحسين استخدام الذاكرة مع مراقبة"""
@@ -2543,24 +3905,22 @@ class PDFHandler:
         except Exception as e:
             self.logger.warning(f"خطأ في تحسين الذاكرة: {str(e)}")
 
-    def _get_memory_usage(self) -> float:
-        """قياس استخدام الذاكرة الحالي"""
-        import psutil
-        process = psutil.Process(os.getpid())
-        return process.memory_info().rss / 1024 / 1024  # تحويل إلى ميجابايت
-
     def _clean_temp_files(self):
         """تنظيف الملفات المؤقتة بشكل آمن"""
+        if not self.temp_dir:
+            return
         try:
-            if self.temp_dir and os.path.exists(self.temp_dir):
-                for file_name in os.listdir(self.temp_dir):
-                    file_path = os.path.join(self.temp_dir, file_name)
+            # scandir يعيد نوع الملف مع المدخل دون استدعاء stat إضافي لكل ملف
+            with os.scandir(self.temp_dir) as entries:
+                for entry in entries:
                     try:
-                        if os.path.isfile(file_path):
-                            os.unlink(file_path)
-                    except Exception as e:
-                        self.logger.warning(f"فشل في حذف الملف المؤقت {file_path}: {str(e)}")
+                        if entry.is_file(follow_symlinks=False):
+                            os.unlink(entry.path)
+                    except OSError as e:
+                        self.logger.warning(f"فشل في حذف الملف المؤقت {entry.path}: {str(e)}")
                         
+        except FileNotFoundError:
+            pass
         except Exception as e:
             self.logger.error(f"خطأ في تنظيف الملفات المؤقتة: {str(e)}")
 
@@ -2568,15 +3928,16 @@ class PDFHandler:
         """تنظيف نهائي للموارد"""
         try:
             # إغلاق الملفات المفتوحة
+            self._close_errors_stream()
             if hasattr(self, 'current_pdf'):
                 del self.current_pdf
             
             if hasattr(self, 'writer'):
                 del self.writer
 
-            # حذف المجلد المؤقت
-            if self.temp_dir and os.path.exists(self.temp_dir):
-                shutil.rmtree(self.temp_dir)
+            # حذف المجلد المؤقت كاملاً (دون المرور على ملفاته أولاً)
+            if self.temp_dir:
+                shutil.rmtree(self.temp_dir, ignore_errors=True)
             
             # تحرير الذاكرة
             gc.collect()
@@ -2615,6 +3976,9 @@ class PDFHandler:
             # إنشاء المجلد إذا لم يكن موجوداً
             output_path.parent.mkdir(parents=True, exist_ok=True)
             
+            # دمج طبقات الترجمة
+            self._merge_pending_overlays()
+            
             # إضافة البيانات الوصفية
             self.writer.add_metadata({
                 '/Producer': f'PDF Translator v{self.config.version}',
@@ -2635,144 +3999,121 @@ class PDFHandler:
             self.logger.error(f"خطأ في حفظ PDF النهائي: {str(e)}")
             return False
 
-    def _get_performance_metrics(self) -> dict:
-        """حساب وإرجاع مقاييس الأداء للمعالجة"""
-        try:
-            metrics = {
-                'processing_speed': 0,
-                'memory_usage': 0,
-                'success_rate': 0,
-                'error_rate': 0,
-                'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            }
-
-            # حساب سرعة المعالجة
-            if self.stats['start_time'] and self.stats['end_time']:
-                duration = (self.stats['end_time'] - self.stats['start_time']).total_seconds()
-                if duration > 0 and self.stats['processed_pages'] > 0:
-                    metrics['processing_speed'] = self.stats['processed_pages'] / duration
-
-            # حساب استخدام الذاكرة
-            import psutil
-            process = psutil.Process()
-            metrics['memory_usage'] = process.memory_info().rss / 1024 / 1024  # تحويل إلى ميجابايت
-
-            # حساب معدلات النجاح والخطأ
-            if self.stats['total_pages'] > 0:
-                metrics['success_rate'] = (self.stats['processed_pages'] / self.stats['total_pages']) * 100
-                metrics['error_rate'] = (len(self.stats['errors']) / self.stats['total_pages']) * 100
-
-            # إضافة معلومات إضافية
-            metrics['processed_pages_per_second'] = metrics['processing_speed']
-            metrics['average_memory_per_page'] = metrics['memory_usage'] / max(self.stats['processed_pages'], 1)
-
-            return metrics
-
-        except Exception as e:
-            self.logger.error(f"خطأ في حساب مقاييس الأداء: {str(e)}")
-            return {
-                'error': str(e),
-                'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            }
-    
-    
     def _save_processing_report(self, pdf_path: Path):
         """حفظ تقرير مفصل عن المعالجة"""
         try:
-            # تحويل التواريخ إلى نصوص
-            current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            # لقطة واحدة للمقاييس يشترك فيها التقرير والتحذيرات (التواريخ تُحوَّل إلى ISO 8601 عند التسلسل)
+            snap = self._snapshot()
+            now, elapsed = snap.now, snap.elapsed
+            start_time = self.stats['start_time']
             
-            # تحضير الإحصائيات مع معالجة التواريخ
+            # تحضير الإحصائيات
             stats = {
                 'total_pages': self.stats['total_pages'],
                 'processed_pages': self.stats['processed_pages'],
                 'translated_blocks': self.stats['translated_blocks'],
                 'skipped_pages': self.stats['skipped_pages'],
-                'start_time': self.stats['start_time'].strftime("%Y-%m-%d %H:%M:%S") if self.stats['start_time'] else None,
-                'end_time': current_time,
-                'duration': f"{(datetime.now() - self.stats['start_time']).total_seconds():.2f} seconds" if self.stats['start_time'] else "0 seconds"
+                'start_time': start_time,
+                'end_time': now,
+                'duration': f"{elapsed:.2f} seconds" if start_time else "0 seconds"
             }
 
             # تحضير التقرير
             report = {
                 'file_info': {
                     'input_file': self.current_pdf_path,
-                    'output_file': str(pdf_path),
+                    'output_file': pdf_path,
                     'file_size': os.path.getsize(pdf_path),
-                    'creation_date': current_time
+                    'creation_date': now
                 },
                 'processing_stats': stats,
                 'configuration': {
-                    'processing_date': current_time
+                    'processing_date': now
                 },
                 'performance': {
-                    'memory_usage_mb': self._get_memory_usage(),
-                    'processing_speed_pages_per_second': len(self.modified_pages) / max((datetime.now() - self.stats['start_time']).total_seconds(), 1) if self.stats['start_time'] else 0,
-                    'success_rate': (self.stats['processed_pages'] / self.stats['total_pages'] * 100) if self.stats['total_pages'] > 0 else 0
+                    'memory_usage_mb': snap.rss_mb,
+                    'processing_speed_pages_per_second': snap.speed,
+                    'success_rate': snap.success_rate
                 },
-                'errors': [
+                'warnings': self._get_warnings(snap),
+                # الأخطاء نفسها في ملف NDJSON المرافق؛ التقرير يحمل المرجع والعدد فقط
+                'errors_file': (self._errors_path.name
+                                if self._errors_path is not None
+                                and self.stats['error_count'] > len(self.stats['errors'])
+                                else None),
+                'errors_count': self.stats['error_count']
+            }
+            if self.stats['errors']:
+                report['errors'] = [
                     {
                         'page': err.get('page'),
                         'error': str(err.get('error')),
-                        'time': err.get('timestamp', current_time)
+                        'time': err.get('timestamp', now)
                     }
                     for err in self.stats['errors']
                 ]
-            }
+            self._close_errors_stream()
 
             # حفظ التقرير
             report_path = pdf_path.with_suffix('.report.json')
-            with open(report_path, 'w', encoding='utf-8') as f:
-                json.dump(report, f, ensure_ascii=False, indent=2)
+            report_path.write_bytes(_json_dumps_pretty(report))
                 
             self.logger.info(f"تم حفظ تقرير المعالجة في: {report_path}")
 
         except Exception as e:
             self.logger.error(f"خطأ في حفظ تقرير المعالجة: {str(e)}")
 
+    # مدة صلاحية آخر قراءة للذاكرة المقيمة (بالثواني)
+    RSS_CACHE_TTL = 0.25
+    _rss_mb = 0.0
+    _rss_ts = float('-inf')
+
     def _get_memory_usage(self) -> float:
-        """قياس استخدام الذاكرة الحالي بالميجابايت"""
-        try:
-            import psutil
-            process = psutil.Process(os.getpid())
-            return process.memory_info().rss / 1024 / 1024  # تحويل إلى ميجابايت
-        except:
-            return 0.0
-        
-    def _get_warnings(self) -> List[dict]:
-        """تجميع التحذيرات والملاحظات"""
-        current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        warnings = []
-        
-        # تحذيرات الذاكرة
-        memory_usage = self._get_memory_usage()
-        if hasattr(self.config, 'memory_threshold') and memory_usage > self.config.memory_threshold:
-            warnings.append({
-                'type': 'memory_warning',
-                'message': f'استخدام الذاكرة مرتفع: {memory_usage:.2f} MB',
-                'time': current_time
-            })
+        """قياس استخدام الذاكرة الحالي بالميجابايت (مع تخزين القراءة لفترة قصيرة)"""
+        now = time.monotonic()
+        if now - self._rss_ts < self.RSS_CACHE_TTL:
+            return self._rss_mb
 
-        # تحذيرات معدل النجاح
-        if self.stats['total_pages'] > 0:
-            success_rate = (self.stats['processed_pages'] / self.stats['total_pages']) * 100
-            if success_rate < 90:
-                warnings.append({
-                    'type': 'success_rate_warning',
-                    'message': f'معدل نجاح المعالجة منخفض: {success_rate:.2f}%',
-                    'time': current_time
-                })
+        try:
+            # قراءة الذاكرة المقيمة مباشرة من /proc على لينكس
+            with open('/proc/self/statm', 'rb') as f:
+                resident_pages = int(f.read().split()[1])
+            rss_mb = resident_pages * _PAGESIZE / 1024 / 1024
+        except (OSError, ValueError, IndexError):
+            if psutil is None:
+                return 0.0
+            try:
+                rss_mb = _current_process().memory_info().rss / 1024 / 1024  # تحويل إلى ميجابايت
+            except Exception:
+                return 0.0
 
-        return warnings
-    
+        self._rss_mb = rss_mb
+        self._rss_ts = now
+        return rss_mb
+        
+    def _snapshot(self) -> MetricsSnapshot:
+        """حساب المقاييس المشتقة مرة واحدة (وقت واحد وقراءة ذاكرة واحدة)"""
+        now = datetime.now()
+        start_time = self.stats['start_time']
+        elapsed = (now - start_time).total_seconds() if start_time else 0.0
+        total_pages = self.stats['total_pages']
+        return MetricsSnapshot(
+            now=now,
+            elapsed=elapsed,
+            rss_mb=self._get_memory_usage(),
+            speed=len(self.modified_pages) / max(elapsed, 1) if start_time else 0,
+            success_rate=(self.stats['processed_pages'] / total_pages * 100) if total_pages > 0 else 0,
+            error_rate=(self.stats['error_count'] / total_pages * 100) if total_pages > 0 else 0
+        )
 
-    def _get_performance_metrics(self) -> dict:
+    def _get_performance_metrics(self, snap: Optional[MetricsSnapshot] = None) -> dict:
         """حساب مقاييس الأداء"""
+        snap = snap or self._snapshot()
         metrics = {
             'processing_speed': 0,
-            'memory_usage': self._get_memory_usage(),
-            'success_rate': 0,
-            'error_rate': 0
+            'memory_usage': snap.rss_mb,
+            'success_rate': snap.success_rate,
+            'error_rate': snap.error_rate
         }
 
         if self.stats['total_pages'] > 0:
@@ -2781,39 +4122,37 @@ class PDFHandler:
                 if duration > 0:
                     metrics['processing_speed'] = self.stats['processed_pages'] / duration
 
-            metrics['success_rate'] = (self.stats['processed_pages'] / self.stats['total_pages']) * 100
-            metrics['error_rate'] = (len(self.stats['errors']) / self.stats['total_pages']) * 100
-
         return metrics
 
-    def _get_warnings(self) -> List[dict]:
+    def _get_warnings(self, snap: Optional[MetricsSnapshot] = None) -> List[dict]:
         """تجميع التحذيرات والملاحظات"""
+        snap = snap or self._snapshot()
         warnings = []
+        timestamp = snap.now.isoformat()
         
         # تحذيرات الذاكرة
-        memory_usage = self._get_memory_usage()
+        memory_usage = snap.rss_mb
         if memory_usage > self.config.memory_threshold:
             warnings.append({
                 'type': 'memory_warning',
                 'message': f'استخدام الذاكرة مرتفع: {memory_usage:.2f} MB',
-                'timestamp': datetime.now().isoformat()
+                'timestamp': timestamp
             })
 
         # تحذيرات معدل النجاح
-        if self.stats['total_pages'] > 0:
-            success_rate = (self.stats['processed_pages'] / self.stats['total_pages']) * 100
-            if success_rate < 90:
-                warnings.append({
-                    'type': 'success_rate_warning',
-                    'message': f'معدل نجاح المعالجة منخفض: {success_rate:.2f}%',
-                    'timestamp': datetime.now().isoformat()
-                })
+        if self.stats['total_pages'] > 0 and snap.success_rate < 90:
+            warnings.append({
+                'type': 'success_rate_warning',
+                'message': f'معدل نجاح المعالجة منخفض: {snap.success_rate:.2f}%',
+                'timestamp': timestamp
+            })
 
         return warnings
 
     def reset(self):
         """إعادة تعيين المعالج للاستخدام مجدداً"""
         try:
+            from PyPDF2 import PdfWriter
             # تنظيف الموارد الحالية
             self.cleanup()
             
@@ -2822,7 +4161,8 @@ class PDFHandler:
             self.current_pdf_path = None
             self.writer = PdfWriter()
             self.current_pdf = None
-            self.modified_pages = set()
+            self.modified_pages = _PageBitmap()
+            self._pending_overlays = []
             
             # إعادة تعيين الإحصائيات
             self.stats = {
@@ -2832,8 +4172,10 @@ class PDFHandler:
                 'total_pages': 0,
                 'start_time': None,
                 'end_time': None,
+                'error_count': 0,
                 'errors': []
             }
+            self._errors_path = None
             
             self.logger.info("تم إعادة تعيين المعالج بنجاح")
             
@@ -2846,14 +4188,39 @@ class PDFHandler:
         """التحقق من حالة المعالج"""
         return self.current_pdf_path is not None
 
+def _scan_pages_worker(pdf_path: str, start: int, stop: int) -> List[Dict]:
+    """استخراج نص نطاق من الصفحات ومسح محتوى الشطرنج فيها داخل عملية منفصلة"""
+    import pdfplumber
+    translator = PDFTranslator()
+    scans = []
+    with pdfplumber.open(pdf_path, pages=list(range(start + 1, stop + 1))) as pdf:
+        for page in pdf.pages:
+            try:
+                text = page.extract_text()
+                scans.append({
+                    'text': text,
+                    'notations': len(translator.extract_chess_notations(text)) if text else 0,
+                    'diagram': translator.detect_chess_diagram(page) if text else False
+                })
+            except Exception as e:
+                scans.append({'error': str(e)})
+            finally:
+                page.flush_cache()
+    return scans
+
+
 class PDFTranslator:
+    # أقصى عدد عمليات لمسح الصفحات وأقل عدد صفحات يستحق التوزيع
+    MAX_WORKERS = 4
+    PARALLEL_MIN_PAGES = 8
+
     def __init__(self, text_processor=None, page_processor=None, pdf_handler=None):
         self.text_processor = text_processor
         self.page_processor = page_processor
         self.pdf_handler = pdf_handler
         self._processing_lock = False
         self._current_page = None
-        self._processed_pages = set()
+        self._processed_pages = _PageBitmap()
         self._current_pdf = None
         self._temp_files = []
         
@@ -2876,6 +4243,10 @@ class PDFTranslator:
             'check': r'\+',
             'mate': r'#'
         }
+        # دمج الأنماط في نمط واحد لمسح النص بتمريرة واحدة
+        self._chess_re = re.compile('|'.join(
+            f'(?P<{name}>{pattern})' for name, pattern in self.chess_patterns.items()
+        ))
 
     def initialize_processing(self):
         """تهيئة عملية المعالجة"""
@@ -2892,6 +4263,9 @@ class PDFTranslator:
             'errors': []
         })
 
+    # عدد الصفحات بين كل عملية جمع للمهملات أثناء الترجمة
+    GC_EVERY_PAGES = 50
+
     def translate_pdf(self, input_path: str, output_path: str) -> bool:
         """ترجمة ومعالجة ملف PDF"""
         if self._processing_lock:
@@ -2902,6 +4276,8 @@ class PDFTranslator:
         self.initialize_processing()
 
         try:
+            import pdfplumber
+            from tqdm import tqdm
             logging.info(f"بدء معالجة الملف: {input_path}")
             
             # التحقق من وجود الملف
@@ -2911,17 +4287,28 @@ class PDFTranslator:
             with pdfplumber.open(input_path) as pdf:
                 self._current_pdf = pdf
                 total_pages = len(pdf.pages)
+                self._processed_pages = _PageBitmap(total_pages)
+                
+                # استخراج النصوص ومسح الشطرنج مسبقاً على عدة عمليات؛ معالجة
+                # النص تبقى في العملية الرئيسية لأن معالجات النصوص غير قابلة للنقل
+                page_scans = self._scan_all_pages(str(input_path), total_pages)
                 
                 with tqdm(total=total_pages, desc="تقدم المعالجة") as pbar:
-                    for page_num in range(total_pages):
+                    for page_num, page in enumerate(pdf.pages):
                         if page_num not in self._processed_pages:
-                            if self.process_page(page_num):
+                            scan = page_scans[page_num] if page_scans else None
+                            if self.process_page(page_num, page, scan):
                                 self._processed_pages.add(page_num)
                                 self.stats['processed_pages'] += 1
                                 pbar.update(1)
                             else:
                                 logging.warning(f"فشل في معالجة الصفحة {page_num + 1}")
 
+                        # تحرير الكائنات المحللة المخزنة في الصفحة بعد معالجتها
+                        page.flush_cache()
+                        if (page_num + 1) % self.GC_EVERY_PAGES == 0:
+                            gc.collect()
+
             # حفظ الملف النهائي
             if self.stats['processed_pages'] > 0:
                 success = self.pdf_handler.save_pdf(output_path)
@@ -2944,18 +4331,45 @@ class PDFTranslator:
             self.cleanup()
             self.stats['end_time'] = datetime.now()
 
-    def process_page(self, page_num: int) -> bool:
-        """معالجة صفحة واحدة من الملف"""
+    def _scan_all_pages(self, pdf_path: str, total_pages: int) -> Optional[List[Dict]]:
+        """مسح جميع الصفحات مسبقاً بالتوازي، أو None للمعالجة صفحةً بصفحة"""
+        workers = min(os.cpu_count() or 1, self.MAX_WORKERS, total_pages)
+        if workers <= 1 or total_pages < self.PARALLEL_MIN_PAGES:
+            return None
+
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = [
+                    executor.submit(_scan_pages_worker, pdf_path, start, stop)
+                    for start, stop in _page_ranges(total_pages, workers)
+                ]
+                page_scans = []
+                for future in futures:
+                    page_scans.extend(future.result())
+                return page_scans
+
+        except Exception as e:
+            logging.warning(f"تعذر المسح المتوازي، جاري المعالجة التسلسلية: {str(e)}")
+            return None
+
+    def process_page(self, page_num: int, page=None, scan: Optional[Dict] = None) -> bool:
+        """معالجة صفحة واحدة من الملف (scan: نتيجة مسح مسبق للصفحة إن وُجدت)"""
         if self._current_page == page_num or not self._current_pdf:
             return False
 
         self._current_page = page_num
         try:
             logging.info(f"معالجة صفحة {page_num + 1}")
-            page = self._current_pdf.pages[page_num]
 
-            # استخراج النص
-            text = page.extract_text()
+            # استخراج النص (ما لم يُستخرج مسبقاً)
+            if scan is not None:
+                if 'error' in scan:
+                    raise RuntimeError(scan['error'])
+                text = scan['text']
+            else:
+                if page is None:
+                    page = self._current_pdf.pages[page_num]
+                text = page.extract_text()
             if not text:
                 return False
 
@@ -2966,7 +4380,11 @@ class PDFTranslator:
                 self.page_processor.process_page(processed_text, page_num)
 
             # معالجة تدوينات الشطرنج
-            self.process_chess_content(text, page)
+            if scan is not None:
+                self.stats['chess_notations'] += scan['notations']
+                self.stats['diagrams'] += scan['diagram']
+            else:
+                self.process_chess_content(text, page)
 
             return True
 
@@ -2990,15 +4408,19 @@ class PDFTranslator:
 
     def extract_chess_notations(self, text: str) -> list:
         """استخراج تدوينات الشطرنج من النص"""
-        notations = []
-        for name, pattern in self.chess_patterns.items():
-            matches = re.finditer(pattern, text)
-            notations.extend(match.group() for match in matches)
-        return notations
+        return [match.group() for match in self._chess_re.finditer(text)]
+
+    # أقل عدد حواف يمكن أن يكوّن جدول رقعة 8×8
+    MIN_DIAGRAM_EDGES = 18
 
     def detect_chess_diagram(self, page) -> bool:
         """اكتشاف وجود مخطط شطرنج في الصفحة"""
         try:
+            # فحص رخيص قبل استخراج الجداول: رقعة 8×8 تحتاج إلى 9 حواف أفقية و9 رأسية
+            # على الأقل، وكل مستطيل يعطي 4 حواف وكل خط حافة واحدة
+            if 4 * len(page.rects) + len(page.lines) < self.MIN_DIAGRAM_EDGES:
+                return False
+
             tables = page.extract_tables()
             for table in tables:
                 if len(table) == 8 and all(len(row) == 8 for row in table):
@@ -3098,16 +4520,16 @@ class PDFTextProcessor:
         """تنظيف النص من العناصر غير المرغوب فيها"""
         try:
             # إزالة الفراغات الزائدة
-            text = re.sub(r'\s+', ' ', text)
+            text = _WHITESPACE_RE.sub(' ', text)
             
             # إزالة الرموز الخاصة
-            text = re.sub(r'[^\w\s\.\,\!\?\;\:\-\(\)\[\]\{\}\'\"\،\؛\؟]', '', text)
+            text = _BADCHAR_RE.sub('', text)
             
             # تنظيف علامات الترقيم
-            text = re.sub(r'[\.\,\!\?\;\:\-]{2,}', '.', text)
+            text = _PUNCT_RUN_RE.sub('.', text)
             
             # تنظيف الأقواس الفارغة
-            text = re.sub(r'\(\s*\)|\[\s*\]|\{\s*\}', '', text)
+            text = _EMPTY_BRACKETS_RE.sub('', text)
             
             return text.strip()
             
@@ -3118,30 +4540,43 @@ class PDFTextProcessor:
     def _split_long_paragraph(self, paragraph: str) -> List[str]:
         """تقسيم الفقرات الطويلة إلى أجزاء أصغر"""
         sections = []
+
+        def add_section(start: int, end: int, irregular: bool):
+            # القسم شريحة من الفقرة؛ تُوحَّد الفواصل بين الجمل إلى مسافة واحدة عند الحاجة فقط
+            section = paragraph[start:end]
+            sections.append(_SENTENCE_BREAK_RE.sub(' ', section) if irregular else section)
+
         try:
-            # تقسيم حسب الجمل
-            sentences = re.split(r'(?<=[.!?])\s+', paragraph)
+            # حدود الجمل كمواضع داخل الفقرة بدلاً من نسخ كل جملة
+            breaks = [(m.start(), m.end()) for m in _SENTENCE_BREAK_RE.finditer(paragraph)]
+            starts = [0] + [end for _, end in breaks]
+            ends = [start for start, _ in breaks] + [len(paragraph)]
             
-            current_section = []
+            section_start = None
             current_length = 0
+            irregular = False
+            prev_end = 0
             
-            for sentence in sentences:
-                sentence_length = len(sentence)
+            for start, end in zip(starts, ends):
+                sentence_length = end - start
                 
-                if current_length + sentence_length > 500:
-                    # حفظ القسم الحالي
-                    if current_section:
-                        sections.append(' '.join(current_section))
-                    # بدء قسم جديد
-                    current_section = [sentence]
+                if section_start is None:
+                    section_start = start
                     current_length = sentence_length
+                elif current_length + sentence_length > 500:
+                    # حفظ القسم الحالي وبدء قسم جديد
+                    add_section(section_start, prev_end, irregular)
+                    section_start = start
+                    current_length = sentence_length
+                    irregular = False
                 else:
-                    current_section.append(sentence)
                     current_length += sentence_length
+                    if paragraph[prev_end:start] != ' ':
+                        irregular = True
+                prev_end = end
             
             # إضافة القسم الأخير
-            if current_section:
-                sections.append(' '.join(current_section))
+            add_section(section_start, prev_end, irregular)
                 
         except Exception as e:
             self.logger.error(f"خطأ في تقسيم الفقرة: {e}")
@@ -3154,9 +4589,7 @@ class PDFTextProcessor:
         elements = []
         try:
             # تحليل النص
-            text_type = self._determine_text_type(section)
-            direction = self._determine_text_direction(section)
-            language = self._detect_language(section)
+            text_type, direction, language = self._classify_text(section)
             
             # إنشاء عنصر النص
             text_element = {
@@ -3182,8 +4615,30 @@ class PDFTextProcessor:
             
         return elements
 
-    def _determine_text_type(self, text: str) -> str:
-        """تحديد نوع النص"""
+    def _classify_text(self, text: str) -> Tuple[str, str, str]:
+        """تحديد نوع النص واتجاهه ولغته معاً مع مشاركة عمليات المسح بينها"""
+        # أول حرف عربي (بالنطاقات الممتدة) يحدد الاتجاه، ومنه يُكمل البحث عن حرف من النطاق الأساسي
+        first = None if text.isascii() else _ARABIC_EXTENDED_RE.search(text)
+        if first is None:
+            direction = 'ltr'
+            has_arabic = False
+        else:
+            direction = 'rtl'
+            has_arabic = first.group() <= '\u06FF' or _ARABIC_RE.search(text, first.end()) is not None
+
+        is_number = None
+        if has_arabic:
+            language = 'ar'
+        elif _LATIN_RE.search(text):
+            language = 'en'
+        else:
+            is_number = text.replace('.', '').isdigit()
+            language = 'numeric' if is_number else 'unknown'
+
+        return self._determine_text_type(text, is_number), direction, language
+
+    def _determine_text_type(self, text: str, is_number: Optional[bool] = None) -> str:
+        """تحديد نوع النص (is_number: نتيجة فحص الأرقام إن حُسبت مسبقاً)"""
         if not text.strip():
             return 'empty'
             
@@ -3192,7 +4647,7 @@ class PDFTextProcessor:
             return 'header'
             
         # التحقق من القوائم
-        if re.match(r'^\s*[\-\*\•\d]+\.?\s', text):
+        if _LIST_ITEM_RE.match(text):
             return 'list_item'
             
         # التحقق من الجداول
@@ -3200,29 +4655,26 @@ class PDFTextProcessor:
             return 'table_content'
             
         # التحقق من الأرقام
-        if text.replace('.', '').isdigit():
+        if is_number is None:
+            is_number = text.replace('.', '').isdigit()
+        if is_number:
             return 'number'
             
         return 'paragraph'
 
     def _determine_text_direction(self, text: str) -> str:
-        """تحديد اتجاه النص"""
-        # التحقق من وجود حروف عربية
-        arabic_pattern = re.compile(r'[\u0600-\u06FF\u0750-\u077F\u08A0-\u08FF]+')
-        if arabic_pattern.search(text):
-            return 'rtl'
-            
-        return 'ltr'
+        """تحديد اتجاه النص (rtl عند وجود حروف عربية)"""
+        return 'rtl' if _has_arabic(text) else 'ltr'
 
     def _detect_language(self, text: str) -> str:
         """اكتشاف لغة النص"""
         try:
             # التحقق من وجود حروف عربية
-            if re.search(r'[\u0600-\u06FF]', text):
+            if _ARABIC_RE.search(text):
                 return 'ar'
                 
             # التحقق من وجود حروف إنجليزية
-            if re.search(r'[a-zA-Z]', text):
+            if _LATIN_RE.search(text):
                 return 'en'
                 
             # التحقق من وجود أرقام فقط
@@ -3283,68 +4735,49 @@ class ChessNotationProcessor:
             'x': 'يأسر',
             'en passant': 'أخذ في المرور'
         }
+        # نمط واحد لكل أسماء القطع والمصطلحات (الأطول أولاً) يُستبدل بتمريرة واحدة
+        self._word_mapping = {**self.chess_pieces, **self.chess_terms}
+        words_pattern = '|'.join(
+            re.escape(word) for word in sorted(self._word_mapping, key=len, reverse=True)
+        )
+        self._combined_re = re.compile(r'\b(' + words_pattern + r')\b')
+        # الحركات الخاصة والكلمات معاً: تمريرة واحدة على النص مع التوزيع حسب اسم المجموعة
+        self._notation_re = re.compile(
+            _SPECIAL_MOVES_PATTERN + r'|\b(?P<word>' + words_pattern + r')\b'
+        )
         
     def process_chess_notation(self, text: str) -> str:
         """معالجة تدوين الشطرنج وترجمته"""
         try:
-            # معالجة الحركات الخاصة
-            text = self._process_special_moves(text)
-            
-            # معالجة قطع الشطرنج
-            text = self._process_chess_pieces(text)
-            
-            # معالجة المصطلحات
-            text = self._process_chess_terms(text)
-            
-            return text
+            return self._notation_re.sub(self._replace_notation, text)
             
         except Exception as e:
             self.logger.error(f"خطأ في معالجة تدوين الشطرنج: {e}")
             return text
 
-    def _process_special_moves(self, text: str) -> str:
-        """معالجة الحركات الخاصة في الشطرنج"""
-        try:
-            # التبييت القصير
-            text = re.sub(r'O-O(?!-O)', 'تبييت قصير', text)
-            
-            # التبييت الطويل
-            text = re.sub(r'O-O-O', 'تبييت طويل', text)
-            
-            # الأسر
-            text = re.sub(r'(\w+)x(\w+)', r'\1 يأسر \2', text)
-            
-            return text
-            
-        except Exception as e:
-            self.logger.error(f"خطأ في معالجة الحركات الخاصة: {e}")
-            return text
-
-    def _process_chess_pieces(self, text: str) -> str:
-        """معالجة أسماء قطع الشطرنج"""
-        try:
-            for eng, arab in self.chess_pieces.items():
-                text = re.sub(rf'\b{eng}\b', arab, text)
-            return text
-        except Exception as e:
-            self.logger.error(f"خطأ في معالجة قطع الشطرنج: {e}")
-            return text
-
-    def _process_chess_terms(self, text: str) -> str:
-        """معالجة مصطلحات الشطرنج"""
-        try:
-            for eng, arab in self.chess_terms.items():
-                text = re.sub(rf'\b{eng}\b', arab, text)
-            return text
-        except Exception as e:
-            self.logger.error(f"خطأ في معالجة مصطلحات الشطرنج: {e}")
-            return text
+    def _replace_notation(self, match: re.Match) -> str:
+        """استبدال رمز واحد من تدوين الشطرنج حسب نوعه"""
+        kind = match.lastgroup
+        if kind == 'word':
+            return self._word_mapping[match.group('word')]
+        if kind == 'capture':
+            # طرفا الأسر قد يحتويان أسماء قطع (مثل Nxe4)
+            return f"{self._process_words(match.group('src'))} يأسر {self._process_words(match.group('dst'))}"
+        if kind == 'long':
+            return 'تبييت طويل'
+        return 'تبييت قصير'
+
+    def _process_words(self, text: str) -> str:
+        """ترجمة أسماء قطع الشطرنج ومصطلحاته بتمريرة واحدة"""
+        mapping = self._word_mapping
+        return self._combined_re.sub(lambda m: mapping[m.group(1)], text)
         
 
 class PDFRenderer:
     """معالج عرض وتنسيق PDF"""
     
     def __init__(self, config_manager: ConfigManager, font_manager: FontManager):
+        from reportlab.lib.pagesizes import A4
         self.logger = logging.getLogger(__name__)
         self.config = config_manager
         self.font_manager = font_manager
@@ -3352,6 +4785,13 @@ class PDFRenderer:
         self.current_page = 0
         self.total_pages = 0
         self.page_size = A4
+        # وقت معالجة المستند ونص التذييل المشكّل منه (يُحسبان مرة واحدة لكل مستند)
+        self._doc_timestamp = ''
+        self._footer = ''
+        self.refresh_timestamp()
+        # اسم الخط العربي المسجل لكل مسار خط (يُحسب مرة واحدة بدلاً من كل صفحة)
+        self._font_path: Optional[str] = None
+        self._font_name: Optional[str] = None
         self.margins = {
             'top': 50,
             'bottom': 50,
@@ -3361,23 +4801,37 @@ class PDFRenderer:
 
     def create_page(self, canvas_obj, elements: List[Dict[str, Any]]) -> None:
         """إنشاء صفحة جديدة في PDF"""
+        # معالجة الأخطاء هنا فقط؛ دوال العرض الداخلية تحويلات مباشرة دون try خاصة بها
+        index = None
         try:
             # إعداد الصفحة
             self._setup_page(canvas_obj)
             
-            # معالجة العناصر
+            # معالجة العناصر: أسطر الصفحة كلها في كائن نص واحد (كتلة BT/ET واحدة)
+            # بدلاً من drawString مستقلة تعيد ضبط الخط والحالة لكل عنصر
             y_position = self.page_size[1] - self.margins['top']
-            for element in elements:
-                y_position = self._render_element(canvas_obj, element, y_position)
-                
-                # التحقق من الحاجة لصفحة جديدة
-                if y_position < self.margins['bottom']:
-                    canvas_obj.showPage()
-                    self._setup_page(canvas_obj)
-                    y_position = self.page_size[1] - self.margins['top']
+            text_obj = canvas_obj.beginText()
+            try:
+                for index, element in enumerate(elements):
+                    y_position = self._render_element(canvas_obj, element, y_position, text_obj)
+                    
+                    # التحقق من الحاجة لصفحة جديدة
+                    if y_position < self.margins['bottom']:
+                        canvas_obj.drawText(text_obj)
+                        text_obj = None
+                        canvas_obj.showPage()
+                        self._setup_page(canvas_obj)
+                        text_obj = canvas_obj.beginText()
+                        y_position = self.page_size[1] - self.margins['top']
+            finally:
+                if text_obj is not None:
+                    canvas_obj.drawText(text_obj)
                     
         except Exception as e:
-            self.logger.error(f"خطأ في إنشاء الصفحة: {e}")
+            if index is None:
+                self.logger.error(f"خطأ في إنشاء الصفحة: {e}")
+            else:
+                self.logger.error(f"خطأ في إنشاء الصفحة عند العنصر {index}: {e}")
 
     def _setup_page(self, canvas_obj) -> None:
         """إعداد الصفحة الجديدة"""
@@ -3385,8 +4839,11 @@ class PDFRenderer:
             # تعيين الخط
             arabic_font = self.font_manager.get_arabic_font()
             if arabic_font:
-                font_name = f"Arabic_{Path(arabic_font).stem}"
-                canvas_obj.setFont(font_name, 12)
+                # قد تُحمّل الخطوط بعد إنشاء المعالج، لذا يُعاد الحساب فقط عند تغير المسار
+                if arabic_font != self._font_path:
+                    self._font_path = arabic_font
+                    self._font_name = f"Arabic_{Path(arabic_font).stem}"
+                canvas_obj.setFont(self._font_name, 12)
                 
             # إضافة ترويسة الصفحة
             self._add_header(canvas_obj)
@@ -3397,45 +4854,46 @@ class PDFRenderer:
         except Exception as e:
             self.logger.error(f"خطأ في إعداد الصفحة: {e}")
 
-    def _render_element(self, canvas_obj, element: Dict[str, Any], y_position: float) -> float:
-        """عرض عنصر على الصفحة"""
-        try:
-            text = element['text']
-            
-            # معالجة تدوين الشطرنج إذا وجد
-            if self._contains_chess_notation(text):
-                text = self.chess_processor.process_chess_notation(text)
-            
-            # معالجة النص العربي
-            if element['direction'] == 'rtl':
-                text = get_display(arabic_reshaper.reshape(text))
-            
-            # حساب موضع النص
-            text_width = canvas_obj.stringWidth(text)
-            x_position = self._calculate_x_position(text_width, element['direction'])
-            
-            # رسم النص
+    def _render_element(self, canvas_obj, element: Dict[str, Any], y_position: float,
+                        text_obj=None) -> float:
+        """عرض عنصر على الصفحة (ضمن كائن النص text_obj إن وُجد)"""
+        text = element['text']
+        
+        # معالجة تدوين الشطرنج إذا وجد
+        if self._contains_chess_notation(text):
+            text = self.chess_processor.process_chess_notation(text)
+        
+        # معالجة النص العربي (النص ASCII بالكامل لا يتغير بالتشكيل أو الترتيب)
+        if element['direction'] == 'rtl' and not text.isascii():
+            text = _shape_bidi(text)
+        
+        # حساب موضع النص
+        text_width = canvas_obj.stringWidth(text)
+        x_position = self._calculate_x_position(text_width, element['direction'])
+        
+        # رسم النص
+        if text_obj is None:
             canvas_obj.drawString(x_position, y_position, text)
-            
-            # تحديث الموضع العمودي
-            return y_position - 20
-            
-        except Exception as e:
-            self.logger.error(f"خطأ في عرض العنصر: {e}")
-            return y_position - 20
+        else:
+            text_obj.setTextOrigin(x_position, y_position)
+            text_obj.textOut(text)
+        
+        # تحديث الموضع العمودي
+        return y_position - 20
+
+    # أجزاء تدوين الشطرنج الثابتة: التبييت (القصير والطويل يحتويان O-O) والكش والكش مات
+    _chess_literals = ('O-O', '+', '#')
+    # الأنماط ذات فئات المحارف: حركات القطع والأسر
+    _chess_notation_re = re.compile('|'.join([
+        r'[KQRBN][a-h][1-8]',  # حركات القطع
+        r'[a-h]x[a-h][1-8]',    # الأسر
+    ]))
 
     def _contains_chess_notation(self, text: str) -> bool:
         """التحقق من وجود تدوين شطرنج"""
-        chess_patterns = [
-            r'O-O(?!-O)',  # التبييت القصير
-            r'O-O-O',      # التبييت الطويل
-            r'[KQRBN][a-h][1-8]',  # حركات القطع
-            r'[a-h]x[a-h][1-8]',    # الأسر
-            r'\+',         # الكش
-            r'\#'          # الكش مات
-        ]
-        
-        return any(re.search(pattern, text) for pattern in chess_patterns)
+        # البحث عن الأجزاء الثابتة أولاً (بحث نصي مباشر) ثم النمط عند الحاجة فقط
+        return (any(literal in text for literal in self._chess_literals) or
+                self._chess_notation_re.search(text) is not None)
 
     def _calculate_x_position(self, text_width: float, direction: str) -> float:
         """حساب الموضع الأفقي للنص"""
@@ -3448,7 +4906,7 @@ class PDFRenderer:
         try:
             # معلومات الترجمة
             header_text = f"ترجمة PDF - الصفحة {self.current_page}/{self.total_pages}"
-            header_text = get_display(arabic_reshaper.reshape(header_text))
+            header_text = _shape_bidi(header_text)
             
             canvas_obj.drawString(
                 self.margins['left'],
@@ -3458,12 +4916,22 @@ class PDFRenderer:
         except Exception as e:
             self.logger.error(f"خطأ في إضافة الترويسة: {e}")
 
+    def refresh_timestamp(self) -> None:
+        """تحديث وقت المعالجة المعروض في التذييل (عند بدء مستند جديد)"""
+        self._doc_timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        self._footer = ''
+
+    def _footer_text(self) -> str:
+        """نص التذييل المشكّل (يُشكّل مرة واحدة لكل وقت معالجة)"""
+        if not self._footer:
+            self._footer = _shape_bidi(f"تمت المعالجة في {self._doc_timestamp}")
+        return self._footer
+
     def _add_footer(self, canvas_obj) -> None:
         """إضافة تذييل الصفحة"""
         try:
             # معلومات المعالجة
-            footer_text = f"تمت المعالجة في {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
-            footer_text = get_display(arabic_reshaper.reshape(footer_text))
+            footer_text = self._footer_text()
             
             canvas_obj.drawString(
                 self.margins['left'],
@@ -3504,12 +4972,12 @@ class PDFSecurityHandler:
     def secure_pdf(self, input_path: str, output_path: str, owner_pwd: str = None, user_pwd: str = None) -> bool:
         """تأمين ملف PDF"""
         try:
+            from PyPDF2 import PdfReader, PdfWriter
             reader = PdfReader(input_path)
             writer = PdfWriter()
 
             # نسخ جميع الصفحات
-            for page in reader.pages:
-                writer.add_page(page)
+            writer.append_pages_from_reader(reader)
 
             # إضافة التشفير
             if owner_pwd or user_pwd:
@@ -3542,12 +5010,12 @@ class PDFMetadataProcessor:
     def update_metadata(self, pdf_path: str, metadata: Dict[str, str]) -> bool:
         """تحديث البيانات الوصفية للملف"""
         try:
+            from PyPDF2 import PdfReader, PdfWriter
             reader = PdfReader(pdf_path)
             writer = PdfWriter()
 
             # نسخ الصفحات
-            for page in reader.pages:
-                writer.add_page(page)
+            writer.append_pages_from_reader(reader)
 
             # تحديث البيانات الوصفية
             writer.add_metadata({
@@ -3569,9 +5037,45 @@ class PDFMetadataProcessor:
             return False
         
 
+def _enhance_ocr_image(image_path: str) -> 'Image.Image':
+    """تحويل الصورة إلى تدرج الرمادي وتحسين التباين وتنعيمها قبل التعرف"""
+    from PIL import Image, ImageEnhance, ImageFilter
+    if cv2 is not None:
+        gray = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
+        if gray is not None:
+            import numpy
+            # نفس تحويل ImageEnhance.Contrast(2.0): القيمة = 2 × البكسل - المتوسط، عبر جدول بحث
+            mean = int(cv2.mean(gray)[0] + 0.5)
+            lut = numpy.clip(numpy.arange(256) * 2 - mean, 0, 255).astype(numpy.uint8)
+            # الوسيط يتبادل مع أي تحويل نقطي متزايد، فيمكن تطبيقه أولاً
+            return Image.fromarray(cv2.LUT(cv2.medianBlur(gray, 3), lut))
+
+    img = Image.open(image_path)
+
+    # تحويل إلى تدرج الرمادي
+    if img.mode != 'L':
+        img = img.convert('L')
+
+    # تحسين التباين
+    img = ImageEnhance.Contrast(img).enhance(2.0)
+
+    # تنعيم الصورة
+    return img.filter(ImageFilter.MedianFilter(size=3))
+
+
+def _ocr_image_worker(image_path: str, lang: str, config: str) -> str:
+    """التعرف على نص صورة واحدة داخل عملية منفصلة (على مستوى الوحدة ليمكن تمريرها للعمليات)"""
+    import pytesseract
+    text = pytesseract.image_to_string(_enhance_ocr_image(image_path), lang=lang, config=config)
+    return text.strip()
+
+
 class OCRProcessor:
     """معالج التعرف الضوئي على النصوص"""
     
+    # الحد الأقصى لعمليات Tesseract المتوازية
+    MAX_WORKERS = 4
+    
     def __init__(self, config_manager: ConfigManager):
         self.logger = logging.getLogger(__name__)
         self.config = config_manager
@@ -3589,6 +5093,7 @@ class OCRProcessor:
     def process_image(self, image_path: str) -> str:
         """معالجة صورة واحدة"""
         try:
+            import pytesseract
             # التحقق من نوع الملف
             if not self._is_valid_image(image_path):
                 raise ValueError(f"نوع ملف غير مدعوم: {image_path}")
@@ -3617,27 +5122,33 @@ class OCRProcessor:
         """معالجة صور PDF"""
         results = []
         try:
-            # تحويل PDF إلى صور
-            images = convert_from_path(
-                pdf_path,
-                dpi=self.dpi,
-                output_folder=str(self.temp_dir)
-            )
+            from pdf2image import convert_from_path
+            # مجلد مؤقت خاص بهذا الاستدعاء يُحذف بما أُنشئ فيه فقط عند الخروج
+            with tempfile.TemporaryDirectory(dir=self.temp_dir) as work_dir:
+                # تحويل PDF إلى صور
+                images = convert_from_path(
+                    pdf_path,
+                    dpi=self.dpi,
+                    output_folder=work_dir
+                )
 
-            # معالجة كل صورة
-            for i, img in enumerate(images, 1):
-                temp_path = self.temp_dir / f"page_{i}.png"
-                img.save(str(temp_path), 'PNG')
+                # حفظ الصور أولاً ثم تشغيل Tesseract عليها
+                image_paths = []
+                for i, img in enumerate(images, 1):
+                    temp_path = os.path.join(work_dir, f"page_{i}.png")
+                    img.save(temp_path, 'PNG')
+                    image_paths.append(temp_path)
 
-                # التعرف على النص
-                text = self.process_image(str(temp_path))
-                if text:
-                    results.append({
-                        'page': i,
-                        'text': text,
-                        'image_path': str(temp_path),
-                        'timestamp': datetime.now().isoformat()
-                    })
+                # التعرف على النص مع الحفاظ على ترتيب الصفحات
+                for i, (image_path, text) in enumerate(
+                        zip(image_paths, self._recognize_images(image_paths)), 1):
+                    if text:
+                        results.append({
+                            'page': i,
+                            'text': text,
+                            'image_path': image_path,
+                            'timestamp': datetime.now().isoformat()
+                        })
 
             return results
 
@@ -3645,55 +5156,92 @@ class OCRProcessor:
             self.logger.error(f"خطأ في معالجة صور PDF: {e}")
             return results
 
-        finally:
-            self._cleanup_temp_files()
+    def _recognize_images(self, image_paths: List[str]) -> List[str]:
+        """التعرف على نصوص الصور بالتوازي عبر عمليات منفصلة، أو تسلسلياً عند تعذر ذلك"""
+        workers = min(os.cpu_count() or 1, self.MAX_WORKERS, len(image_paths))
+        if workers <= 1:
+            return [self.process_image(image_path) for image_path in image_paths]
+
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = [
+                    executor.submit(
+                        _ocr_image_worker, image_path,
+                        self.tesseract_config['lang'], self.tesseract_config['config']
+                    )
+                    for image_path in image_paths
+                ]
+                texts = []
+                for image_path, future in zip(image_paths, futures):
+                    try:
+                        texts.append(future.result())
+                        self.stats['processed_images'] += 1
+                    except Exception as e:
+                        self.logger.error(f"خطأ في معالجة الصورة {image_path}: {e}")
+                        self.stats['failed_images'] += 1
+                        texts.append("")
+                return texts
+
+        except Exception as e:
+            self.logger.warning(f"تعذر التعرف المتوازي، جاري المعالجة التسلسلية: {e}")
+            return [self.process_image(image_path) for image_path in image_paths]
 
     def _is_valid_image(self, image_path: str) -> bool:
         """التحقق من صلاحية الصورة"""
         return Path(image_path).suffix.lower() in self.image_types
 
-    def _preprocess_image(self, image_path: str) -> Optional[Image.Image]:
+    def _preprocess_image(self, image_path: str) -> Optional['Image.Image']:
         """تحسين الصورة قبل المعالجة"""
         try:
-            img = Image.open(image_path)
-
-            # تحويل إلى تدرج الرمادي
-            if img.mode != 'L':
-                img = img.convert('L')
-
-            # تحسين التباين
-            img = ImageEnhance.Contrast(img).enhance(2.0)
-
-            # تنعيم الصورة
-            img = img.filter(ImageFilter.MedianFilter(size=3))
-
-            return img
+            return _enhance_ocr_image(image_path)
 
         except Exception as e:
             self.logger.error(f"خطأ في تحسين الصورة: {e}")
             return None
 
-    def _cleanup_temp_files(self):
-        """تنظيف الملفات المؤقتة"""
-        try:
-            if self.temp_dir.exists():
-                shutil.rmtree(self.temp_dir)
-                self.temp_dir.mkdir()
-        except Exception as e:
-            self.logger.error(f"خطأ في تنظيف الملفات المؤقتة: {e}")
-
     def get_statistics(self) -> Dict[str, int]:
         """الحصول على إحصائيات المعالجة"""
         return dict(self.stats)
     
 
+def _bin_columns(x0s, x1s, n, bins):
+    """حساب عمود كل عنصر من مركزه الأفقي بخطوة 50 نقطة (بديل NumPy عند غيابها)"""
+    for i in range(n):
+        bins[i] = int((x0s[i] + x1s[i]) / 2 // 50) * 50
+    return bins
+
+
+def _group_paragraph_ids(ys, n, groups):
+    """تعيين رقم فقرة لكل عنصر مرتب عمودياً وفق قاعدة المسافة <= 1.5 × تباعد الأسطر"""
+    group = 0
+    line_spacing = 0.0
+    for i in range(1, n):
+        spacing = abs(ys[i] - ys[i - 1])
+        if line_spacing == 0:
+            line_spacing = spacing
+        if spacing > line_spacing * 1.5:
+            group += 1
+        groups[i] = group
+    return groups
+
+
+# نسخة مترجمة إلى شيفرة أصلية عبر Numba عند توفرها
+_group_paragraph_ids_jit = njit(cache=True)(_group_paragraph_ids) if njit is not None else None
+
+
 class TextLayoutAnalyzer:
     """محلل تخطيط النص"""
     
+    # أقل عدد عناصر يستحق تحويل الإطارات إلى مصفوفة NumPy
+    NUMPY_MIN_ELEMENTS = 8
+    # أقل عدد عناصر يستحق الترتيب بـ NumPy argsort
+    NUMPY_SORT_MIN_ELEMENTS = 500
+    
     def __init__(self):
         self.logger = logging.getLogger(__name__)
-        self.direction_cache = {}
         self.layout_stats = defaultdict(int)
+        # إحصائيات خطوط آخر صفحة بمجموعات خام (تُرتب عند الطلب فقط)
+        self.font_stats: Dict[str, Dict[str, Any]] = {}
 
     def analyze_layout(self, page_elements: List[Dict]) -> Dict[str, Any]:
         """تحليل تخطيط الصفحة"""
@@ -3703,7 +5251,8 @@ class TextLayoutAnalyzer:
                 'columns': self._detect_columns(page_elements),
                 'paragraphs': self._group_paragraphs(page_elements),
                 'headers': self._detect_headers(page_elements),
-                'font_stats': self._analyze_fonts(page_elements)
+                # المجموعات الخام تبقى في self.font_stats؛ المُعاد قوائم مرتبة قابلة للتسلسل
+                'font_stats': self.get_font_report(self._analyze_fonts(page_elements))
             }
 
             self._update_statistics(layout_info)
@@ -3717,19 +5266,13 @@ class TextLayoutAnalyzer:
         """تحديد الاتجاه الرئيسي للنص"""
         rtl_count = ltr_count = 0
 
+        # فحص مباشر دون تخزين؛ النصوص نادراً ما تتكرر
         for element in elements:
             text = element.get('text', '')
             if not text:
                 continue
 
-            # استخدام الذاكرة المؤقتة
-            if text in self.direction_cache:
-                direction = self.direction_cache[text]
-            else:
-                direction = self._detect_text_direction(text)
-                self.direction_cache[text] = direction
-
-            if direction == 'rtl':
+            if _has_arabic(text):
                 rtl_count += 1
             else:
                 ltr_count += 1
@@ -3739,8 +5282,7 @@ class TextLayoutAnalyzer:
     def _detect_text_direction(self, text: str) -> str:
         """اكتشاف اتجاه النص"""
         # التحقق من وجود حروف عربية
-        arabic_pattern = re.compile(r'[\u0600-\u06FF\u0750-\u077F\u08A0-\u08FF]+')
-        if arabic_pattern.search(text):
+        if _has_arabic(text):
             return 'rtl'
         return 'ltr'
 
@@ -3749,11 +5291,17 @@ class TextLayoutAnalyzer:
         columns = []
         try:
             # تجميع العناصر حسب المواقع الأفقية
+            n = len(elements)
+            bboxes = [element.get('bbox', [0, 0, 0, 0]) for element in elements]
+            x0s = [bbox[0] for bbox in bboxes]
+            x1s = [bbox[2] for bbox in bboxes]
+            if np is not None:
+                return self._detect_columns_numpy(elements, x0s, x1s)
+            bins = _bin_columns(x0s, x1s, n, [0] * n)
+
             x_positions = defaultdict(list)
-            for element in elements:
-                bbox = element.get('bbox', [0, 0, 0, 0])
-                x_center = (bbox[0] + bbox[2]) / 2
-                x_positions[int(x_center // 50) * 50].append(element)
+            for x_pos, element in zip(bins, elements):
+                x_positions[x_pos].append(element)
 
             # تحليل الأعمدة
             for x_pos, column_elements in x_positions.items():
@@ -3769,6 +5317,29 @@ class TextLayoutAnalyzer:
 
         return columns
 
+    def _detect_columns_numpy(self, elements: List[Dict], x0s: List[float],
+                              x1s: List[float]) -> List[Dict[str, Any]]:
+        """اكتشاف الأعمدة بحساب الخانات وعدّها دفعة واحدة عبر NumPy"""
+        centers = (np.array(x0s, dtype=np.float64) + np.array(x1s, dtype=np.float64)) / 2
+        bins = (centers // 50).astype(np.int64) * 50
+        unique_bins, first_index, inverse, counts = np.unique(
+            bins, return_index=True, return_inverse=True, return_counts=True
+        )
+        # فهارس عناصر كل خانة بترتيبها الأصلي
+        groups = np.split(np.argsort(inverse, kind='stable'), np.cumsum(counts)[:-1])
+
+        columns = []
+        # الأعمدة بترتيب أول ظهور لها كما في التجميع بالقاموس
+        for k in np.argsort(first_index, kind='stable').tolist():
+            if counts[k] > 2:  # تجاهل الأعمدة القصيرة
+                column_elements = [elements[i] for i in groups[k].tolist()]
+                columns.append({
+                    'x_position': int(unique_bins[k]),
+                    'elements_count': int(counts[k]),
+                    'width': self._calculate_column_width(column_elements)
+                })
+        return columns
+
     def _calculate_column_width(self, elements: List[Dict]) -> float:
         """حساب عرض العمود"""
         try:
@@ -3785,43 +5356,42 @@ class TextLayoutAnalyzer:
         """تجميع العناصر في فقرات"""
         paragraphs = []
         current_paragraph = []
-        last_y = None
-        line_spacing = 0
 
         try:
             # ترتيب العناصر من أعلى إلى أسفل
-            sorted_elements = sorted(
-                elements,
-                key=lambda x: (-x.get('bbox', [0, 0, 0, 0])[1])
-            )
-
-            for element in sorted_elements:
-                bbox = element.get('bbox', [0, 0, 0, 0])
-                current_y = bbox[1]
-
-                if last_y is None:
-                    last_y = current_y
-                    current_paragraph.append(element)
-                    continue
-
-                # حساب المسافة بين السطور
-                spacing = abs(current_y - last_y)
-                if line_spacing == 0:
-                    line_spacing = spacing
-
-                # تحديد إذا كان العنصر جزءاً من نفس الفقرة
-                if spacing <= line_spacing * 1.5:
-                    current_paragraph.append(element)
-                else:
-                    if current_paragraph:
-                        paragraphs.append({
-                            'elements': current_paragraph,
-                            'bbox': self._calculate_paragraph_bbox(current_paragraph),
-                            'text': self._extract_paragraph_text(current_paragraph)
-                        })
-                    current_paragraph = [element]
+            n = len(elements)
+            if np is not None and n >= self.NUMPY_SORT_MIN_ELEMENTS:
+                # ترتيب مستقر بـ argsort على مصفوفة الإحداثيات بدلاً من sorted
+                ys = np.array([e.get('bbox', [0, 0, 0, 0])[1] for e in elements], dtype=np.float64)
+                order = np.argsort(-ys, kind='stable')
+                sorted_elements = [elements[i] for i in order.tolist()]
+                ys = ys[order]
+            else:
+                sorted_elements = sorted(
+                    elements,
+                    key=lambda x: (-x.get('bbox', [0, 0, 0, 0])[1])
+                )
+                ys = [element.get('bbox', [0, 0, 0, 0])[1] for element in sorted_elements]
 
-                last_y = current_y
+            # تحديد أرقام الفقرات في حلقة عددية ثم بناء القواميس هنا
+            if _group_paragraph_ids_jit is not None:
+                groups = _group_paragraph_ids_jit(
+                    np.asarray(ys, dtype=np.float64), n, np.zeros(n, dtype=np.int64)
+                ).tolist()
+            else:
+                groups = _group_paragraph_ids(ys, n, [0] * n)
+
+            last_group = 0
+            for group, element in zip(groups, sorted_elements):
+                if group != last_group:
+                    paragraphs.append({
+                        'elements': current_paragraph,
+                        'bbox': self._calculate_paragraph_bbox(current_paragraph),
+                        'text': self._extract_paragraph_text(current_paragraph)
+                    })
+                    current_paragraph = []
+                    last_group = group
+                current_paragraph.append(element)
 
             # إضافة الفقرة الأخيرة
             if current_paragraph:
@@ -3883,43 +5453,59 @@ class TextLayoutAnalyzer:
         })
 
         try:
+            # توحيد نسخ أسماء الخطوط المتكررة حتى تصبح المقارنة في القاموس مقارنة هوية
+            intern = sys.intern
             for element in elements:
                 font = element.get('font', {})
                 font_name = font.get('name', 'unknown')
-                font_size = font.get('size', 0)
                 font_style = font.get('style', 'normal')
+                if type(font_name) is str:
+                    font_name = intern(font_name)
+                if type(font_style) is str:
+                    font_style = intern(font_style)
 
-                font_stats[font_name]['count'] += 1
-                font_stats[font_name]['sizes'].add(font_size)
-                font_stats[font_name]['styles'].add(font_style)
-
-            # تحويل المجموعات إلى قوائم للتسلسل JSON
-            for font_name in font_stats:
-                font_stats[font_name]['sizes'] = sorted(font_stats[font_name]['sizes'])
-                font_stats[font_name]['styles'] = sorted(font_stats[font_name]['styles'])
+                fs = font_stats[font_name]
+                fs['count'] += 1
+                fs['sizes'].add(font.get('size', 0))
+                fs['styles'].add(font_style)
 
         except Exception as e:
             self.logger.error(f"خطأ في تحليل الخطوط: {e}")
 
-        return dict(font_stats)
+        self.font_stats = dict(font_stats)
+        return self.font_stats
+
+    def get_font_report(self, font_stats: Optional[Dict[str, Dict[str, Any]]] = None) -> Dict[str, Any]:
+        """تقرير الخطوط بقوائم مرتبة قابلة للتسلسل JSON"""
+        if font_stats is None:
+            font_stats = self.font_stats
+        return {
+            font_name: {
+                'count': fs['count'],
+                'sizes': sorted(fs['sizes']),
+                'styles': sorted(fs['styles'])
+            }
+            for font_name, fs in font_stats.items()
+        }
 
     def _calculate_paragraph_bbox(self, elements: List[Dict]) -> List[float]:
         """حساب الإطار المحيط للفقرة"""
-        try:
-            x0 = min(e['bbox'][0] for e in elements)
-            y0 = min(e['bbox'][1] for e in elements)
-            x1 = max(e['bbox'][2] for e in elements)
-            y1 = max(e['bbox'][3] for e in elements)
-            return [x0, y0, x1, y1]
-        except Exception:
+        bboxes = [e.get('bbox') for e in elements]
+        if not bboxes or None in bboxes:
             return [0, 0, 0, 0]
+        if np is not None and len(bboxes) >= self.NUMPY_MIN_ELEMENTS:
+            # مصفوفة واحدة متصلة في الذاكرة بدلاً من أربع مرات مرور على القائمة
+            boxes = np.array([bbox[:4] for bbox in bboxes], dtype=np.float64)
+            return boxes[:, :2].min(axis=0).tolist() + boxes[:, 2:].max(axis=0).tolist()
+        x0 = min(bbox[0] for bbox in bboxes)
+        y0 = min(bbox[1] for bbox in bboxes)
+        x1 = max(bbox[2] for bbox in bboxes)
+        y1 = max(bbox[3] for bbox in bboxes)
+        return [x0, y0, x1, y1]
 
     def _extract_paragraph_text(self, elements: List[Dict]) -> str:
         """استخراج النص الكامل للفقرة"""
-        try:
-            return ' '.join(e.get('text', '') for e in elements)
-        except Exception:
-            return ''
+        return ' '.join(e.get('text', '') for e in elements)
 
     def _update_statistics(self, layout_info: Dict[str, Any]):
         """تحديث إحصائيات التخطيط"""
@@ -3941,8 +5527,9 @@ class TextLayoutAnalyzer:
     def cleanup_all():
         """تنظيف جميع الملفات المؤقتة والموارد"""
         try:
+            # مجلد cache يبقى: ذاكرة الترجمات المؤقتة على القرص تُستخدم بين التشغيلات
             temp_dirs = [
-                'temp', 'cache', 'images', 'ocr',
+                'temp', 'images', 'ocr',
                 'security', 'output', 'logs'
             ]
             base_path = Path(__file__).parent
@@ -3978,13 +5565,13 @@ class PDFOptimizer:
     def optimize_pdf(self, input_path: str, output_path: str) -> bool:
         """تحسين ملف PDF"""
         try:
+            from PyPDF2 import PdfReader, PdfWriter
             # قراءة الملف الأصلي
             reader = PdfReader(input_path)
             writer = PdfWriter()
             
             # نسخ الصفحات مع التحسين
-            for page in reader.pages:
-                writer.add_page(page)
+            writer.append_pages_from_reader(reader)
             
             # تطبيق خيارات التحسين
             if self.optimization_options['compress_images']:
@@ -4009,7 +5596,7 @@ class PDFOptimizer:
             self.logger.error(f"خطأ في تحسين الملف: {e}")
             return False
             
-    def _compress_images(self, writer: PdfWriter):
+    def _compress_images(self, writer: 'PdfWriter'):
         """ضغط الصور"""
         try:
             for page in writer.pages:
@@ -4019,7 +5606,7 @@ class PDFOptimizer:
         except Exception as e:
             self.logger.error(f"خطأ في ضغط الصور: {e}")
             
-    def _optimize_fonts(self, writer: PdfWriter):
+    def _optimize_fonts(self, writer: 'PdfWriter'):
         """تحسين الخطوط"""
         try:
             # تحديد الخطوط المستخدمة
@@ -4061,6 +5648,8 @@ class PDFOptimizer:
         parser.add_argument('input', help='مسار ملف PDF المدخل', nargs='?')
         parser.add_argument('-o', '--output', help='مسار ملف PDF المخرج')
         parser.add_argument('-d', '--debug', action='store_true', help='تفعيل وضع التصحيح')
+        parser.add_argument('--fast-parser', action='store_true',
+                            help='استخراج الكلمات عبر pypdfium2 بدلاً من pdfplumber')
         return parser.parse_args()
 
     def setup_logging(debug_mode: bool):
@@ -4092,6 +5681,8 @@ class PDFOptimizer:
             text_processor = TextProcessor()
             arabic_handler = ArabicTextHandler()
             text_processor.arabic_handler = arabic_handler
+            # ترجمة PageProcessor المجمّعة بنفس الإعدادات والذاكرة المؤقتة على القرص
+            text_processor.translation_processor = TranslationProcessor(config, CacheManager())
             page_processor = PageProcessor(text_processor)
             pdf_handler = PDFHandler(config, page_processor)
 
@@ -4121,10 +5712,13 @@ class PDFOptimizer:
             parser.add_argument('-o', '--output', help='Output PDF file')
             parser.add_argument('-d', '--debug', action='store_true', 
                               help='Enable debug mode')
+            parser.add_argument('--fast-parser', action='store_true',
+                              help='Extract words with pypdfium2 instead of pdfplumber')
             args = parser.parse_args()
 
             if args.debug:
                 logging.getLogger().setLevel(logging.DEBUG)
+            pdf_handler.fast_parser = args.fast_parser
 
             # تحديد ملف المدخلات
             input_file = Path(args.input)
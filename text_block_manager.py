@@ -10,15 +10,20 @@
 
 import re
 import os
+import bisect
+from itertools import count, groupby
+from operator import itemgetter
 import sys
 import logging
 import json
-from typing import Dict, List, Tuple
+import functools
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, Iterator, List, Tuple
 from datetime import datetime
 try:
-    from langdetect import detect
+    from langdetect.detector_factory import DetectorFactory, PROFILES_DIRECTORY
 except ImportError:
-    detect = lambda x: 'en' if x.isascii() else 'ar'
+    DetectorFactory = None
 
 
 
@@ -34,8 +39,10 @@ DEFAULT_CONFIG = {
     'merge_distance': 20,
     'min_block_size': 2,
     'max_cache_size': 1000,
+    'chess_block_ratio': 0.5,  # نسبة كلمات الشطرنج التي تجعل الكتلة كتلة شطرنج لا تُترجم
     'supported_languages': ['ar', 'en'],
-    'debug_mode': False
+    'debug_mode': False,
+    'retain_raw': False  # الإبقاء على قوائم الكلمات والسطور في الكتل النهائية (للتصحيح)
 }
 
 # أنماط الشطرنج
@@ -53,6 +60,67 @@ CHESS_PATTERNS = {
     'comments': r'\{[^}]*\}'
 }
 
+# أنماط الشطرنج مُجمّعة مرة واحدة عند الاستيراد وتتشاركها كل النسخ
+_CHESS_COMPILED = {
+    name: re.compile(pattern)
+    for name, pattern in CHESS_PATTERNS.items()
+}
+# جميع أنماط الشطرنج في نمط واحد: بحث واحد يحدد إن كانت الكلمة شطرنجية
+_COMBINED_CHESS_RE = re.compile('|'.join(
+    f'(?:{pattern})' for pattern in CHESS_PATTERNS.values()
+))
+
+
+def _simple_detect(text: str) -> str:
+    """كشف بسيط عند غياب langdetect"""
+    return 'en' if text.isascii() else 'ar'
+
+
+def _build_language_detector(languages) -> Callable[[str], str]:
+    """
+    بناء كاشف langdetect بملفات اللغات المدعومة فقط بدلاً من جميع اللغات (55 ملفاً)
+    """
+    profiles = []
+    for lang in languages:
+        with open(os.path.join(PROFILES_DIRECTORY, lang), encoding='utf-8') as f:
+            profiles.append(f.read())
+
+    factory = DetectorFactory()
+    factory.load_json_profile(profiles)
+    factory.set_seed(0)
+
+    def detect(text: str) -> str:
+        detector = factory.create()
+        detector.append(text)
+        return detector.detect()
+
+    return detect
+
+
+if DetectorFactory is not None:
+    try:
+        detect = _build_language_detector(DEFAULT_CONFIG['supported_languages'])
+    except Exception:
+        from langdetect import detect
+else:
+    detect = _simple_detect
+
+# جدول حذف محارف التحكم لـ str.translate (يُبنى مرة واحدة)
+_CTRL_TABLE = dict.fromkeys([*range(0x00, 0x09), 0x0b, 0x0c, *range(0x0e, 0x20), *range(0x7f, 0xa0)])
+# مفتاح ترتيب الكلمات أفقياً (itemgetter أسرع من lambda)
+_x0_key = itemgetter('x0')
+_top_x0_key = itemgetter('top', 'x0')
+_ARABIC_RE = re.compile(r'[\u0600-\u06FF]')
+
+
+@functools.lru_cache(maxsize=4096)
+def _detect_cached(text: str) -> str:
+    """كشف لغة النص مع حفظ النتائج للكلمات المتكررة"""
+    try:
+        return detect(text)
+    except Exception:
+        return 'en'
+
 
 class TextBlockManager:
     """مدير الكتل النصية المتخصص في معالجة كتب الشطرنج مع دعم كامل للغة العربية"""
@@ -74,8 +142,14 @@ class TextBlockManager:
         # تهيئة المتغيرات الداخلية
         self.stats = self._init_stats()
         self.current_page = 0
-        self._cached_blocks = {}
-        self.chess_patterns = self._compile_chess_patterns()
+        # وقت معالجة الصفحة الحالية (يُحسب مرة واحدة لكل صفحة بدلاً من كل كلمة وكتلة)
+        self._page_timestamp = ''
+        # ذاكرة مؤقتة محدودة بـ max_cache_size (الأقدم استخداماً يُحذف أولاً)
+        self._cached_blocks = OrderedDict()
+        # معرفات الكتل أعداد متزايدة؛ مع page_number تكوّن مفتاحاً مركباً عند الحاجة
+        self._next_block_id = count()
+        self.chess_patterns = _CHESS_COMPILED
+        self._combined_chess_re = _COMBINED_CHESS_RE
         self.language_detector = self._init_language_detector()
         
         # تسجيل بدء التشغيل
@@ -116,23 +190,13 @@ class TextBlockManager:
             'cache_misses': 0
         }
 
-    def _compile_chess_patterns(self) -> Dict:
-        """تجميع أنماط الشطرنج"""
-        return {
-            name: re.compile(pattern)
-            for name, pattern in CHESS_PATTERNS.items()
-        }
-
     def _init_language_detector(self):
         """تهيئة كاشف اللغة"""
-        try:
-            from langdetect import detect
-            return detect
-        except ImportError:
+        if DetectorFactory is None:
             self.logger.warning(
                 "لم يتم العثور على مكتبة langdetect. سيتم استخدام الكشف البسيط."
             )
-            return lambda x: 'en' if x.isascii() else 'ar'
+        return detect
         
     def process_page_content(self, page_data) -> List[Dict]:
         """
@@ -164,6 +228,11 @@ class TextBlockManager:
             
             # 3. تحليل وتصنيف الكتل
             analyzed_blocks = self._analyze_blocks(blocks)
+            if not self.config['retain_raw']:
+                # الكلمات والسطور لازمة للتحليل فقط؛ حذفها يقلل ذاكرة الكتل المحفوظة بعد الصفحة
+                for block in analyzed_blocks:
+                    block.pop('words', None)
+                    block.pop('lines', None)
             
             # 4. تحديث الإحصائيات
             self._update_stats(analyzed_blocks)
@@ -175,193 +244,300 @@ class TextBlockManager:
             self.stats['failed_blocks'] += 1
             return []
 
+    def _validate_page_data(self, page_data):
+        """
+        التحقق من أن الصفحة تدعم استخراج الكلمات
+        """
+        if page_data is None:
+            raise ValueError("بيانات الصفحة فارغة")
+        if not callable(getattr(page_data, 'extract_words', None)):
+            raise ValueError(f"نوع صفحة غير مدعوم: {type(page_data).__name__}")
+
     def _extract_words(self, page_data) -> List[Dict]:
         """
         استخراج الكلمات من الصفحة مع تحسين الدقة
         """
-        try:
-            # استخراج النص مع خيارات متقدمة
-            words = page_data.extract_words(
-                keep_blank_chars=True,
-                extra_attrs=['fontname', 'size', 'strokewidth', 'fill'],
-                x_tolerance=self.config['x_tolerance'],
-                y_tolerance=self.config['y_tolerance'],
-                split_at_punctuation=False  # لتحسين استخراج حركات الشطرنج
-            )
-            
-            # معالجة وتنظيف الكلمات
-            cleaned_words = []
-            for word in words:
-                if not word['text'].strip():
-                    continue
-                    
-                # تنظيف وتحسين النص
-                cleaned_text = self._clean_text(word['text'])
-                if not cleaned_text:
-                    continue
-                    
-                # إضافة معلومات إضافية
-                word.update({
-                    'text': cleaned_text,
-                    'language': self._detect_text_language(cleaned_text),
-                    'is_chess': bool(any(p.search(cleaned_text) for p in self.chess_patterns.values())),
-                    'processing_time': datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')
-                })
+        # استخراج النص مع خيارات متقدمة
+        words = page_data.extract_words(
+            keep_blank_chars=True,
+            extra_attrs=['fontname', 'size', 'strokewidth', 'fill'],
+            x_tolerance=self.config['x_tolerance'],
+            y_tolerance=self.config['y_tolerance'],
+            split_at_punctuation=False  # لتحسين استخراج حركات الشطرنج
+        )
+        
+        # معالجة وتنظيف الكلمات
+        self._page_timestamp = datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')
+        cleaned_words = []
+        for word in words:
+            if not word['text'].strip():
+                continue
                 
-                cleaned_words.append(word)
+            # تنظيف وتحسين النص
+            cleaned_text = self._clean_text(word['text'])
+            if not cleaned_text:
+                continue
                 
-            self.logger.debug(f"تم استخراج {len(cleaned_words)} كلمة من الصفحة {self.current_page}")
-            return cleaned_words
-
-        except Exception as e:
-            self.logger.error(f"خطأ في استخراج الكلمات: {str(e)}")
-            return []
+            # إضافة معلومات إضافية
+            word.update({
+                'text': cleaned_text,
+                'is_chess': self._combined_chess_re.search(cleaned_text) is not None,
+                'processing_time': self._page_timestamp
+            })
+            
+            cleaned_words.append(word)
+            
+        self.logger.debug(f"تم استخراج {len(cleaned_words)} كلمة من الصفحة {self.current_page}")
+        return cleaned_words
 
     def _process_words_to_blocks(self, words: List[Dict]) -> List[Dict]:
         """
         تحويل الكلمات إلى كتل مع تحسين الدقة
         """
-        try:
-            # 1. ترتيب الكلمات حسب الموقع
-            sorted_words = sorted(words, key=lambda w: (w['top'], w['x0']))
-            
-            # 2. تجميع الكلمات في سطور
-            lines = self._group_words_to_lines(sorted_words)
-            
-            # 3. تجميع السطور في كتل
-            raw_blocks = self._group_lines_to_blocks(lines)
-            
-            # 4. دمج الكتل المتقاربة
-            merged_blocks = self._merge_related_blocks(raw_blocks)
-            
-            return merged_blocks
-
-        except Exception as e:
-            self.logger.error(f"خطأ في معالجة الكلمات: {str(e)}")
-            return []
+        # 1. ترتيب الكلمات حسب الموقع
+        sorted_words = sorted(words, key=_top_x0_key)
+        
+        # 2-3. تجميع الكلمات في سطور ثم السطور في كتل؛ السطور تُمرَّر تباعاً دون قائمة وسيطة
+        lines = self._group_words_to_lines(sorted_words)
+        raw_blocks = list(self._group_lines_to_blocks(lines))
+        del lines, sorted_words
+        
+        # 4. دمج الكتل المتقاربة
+        merged_blocks = self._merge_related_blocks(raw_blocks)
+        
+        return merged_blocks
 
-    def _group_words_to_lines(self, words: List[Dict]) -> List[List[Dict]]:
+    def _group_words_to_lines(self, words: List[Dict]) -> Iterator[List[Dict]]:
         """
-        تجميع الكلمات في سطور
+        تجميع الكلمات في سطور (الكلمات مرتبة تصاعدياً حسب top)، يُنتج كل سطر عند اكتماله
         """
-        lines = []
-        current_line = []
-        current_y = None
-
-        for word in words:
-            if current_y is None:
-                current_y = word['top']
-                current_line = [word]
-            elif abs(word['top'] - current_y) <= self.config['y_tolerance']:
-                current_line.append(word)
+        tolerance = self.config['y_tolerance']
+        tops = [word['top'] for word in words]
+        count = len(tops)
+        start = 0
+
+        # كل سطر يضم الكلمات التي لا يبعد top لها عن أول كلمة فيه أكثر من السماحية؛
+        # نهاية السطر تُحدد بالبحث الثنائي بدلاً من مقارنة كل كلمة
+        while start < count:
+            current_y = tops[start]
+            end = bisect.bisect_right(tops, current_y + tolerance, start + 1)
+            # تصحيح حدود التقريب العشري لتطابق شرط المقارنة الأصلي تماماً
+            while end > start + 1 and abs(tops[end - 1] - current_y) > tolerance:
+                end -= 1
+            while end < count and abs(tops[end] - current_y) <= tolerance:
+                end += 1
+            yield sorted(words[start:end], key=_x0_key)
+            start = end
+
+    def _group_lines_to_blocks(self, lines: Iterable[List[Dict]]) -> Iterator[Dict]:
+        """
+        تجميع السطور في كتل، تُنتج كل كتلة عند اكتمالها
+        """
+        merge_distance = self.config['merge_distance']
+        block_y = None
+        block_index = 0
+
+        def block_key(line):
+            # كتلة جديدة عندما يبتعد السطر عن أول سطر في الكتلة أكثر من مسافة الدمج
+            nonlocal block_y, block_index
+            top = line[0]['top']
+            if block_y is None or abs(top - block_y) > merge_distance:
+                block_y = top
+                block_index += 1
+            return block_index
+
+        for _, group in groupby((line for line in lines if line), key=block_key):
+            block_lines = list(group)
+            # يتوقف الفحص عند أول كلمة شطرنج في الكتلة
+            is_chess = any(w.get('is_chess', False) for line in block_lines for w in line)
+            block = self._create_block_from_lines(block_lines, is_chess)
+            if block:
+                yield block
+    
+    def _merge_related_blocks(self, blocks: List[Dict]) -> List[Dict]:
+        """
+        دمج الكتل الصغيرة (أقل من min_block_size كلمة) في الكتلة السابقة القريبة من النوع نفسه
+        """
+        min_size = self.config['min_block_size']
+        merge_distance = self.config['merge_distance']
+        merged = []
+
+        for block in blocks:
+            previous = merged[-1] if merged else None
+            if (previous is not None
+                    and min(previous['metadata']['word_count'], block['metadata']['word_count']) < min_size
+                    and previous['metadata']['is_chess'] == block['metadata']['is_chess']
+                    and block['bbox'][1] - previous['bbox'][3] <= merge_distance):
+                self._merge_into(previous, block)
+                self.stats['merged_blocks'] += 1
             else:
-                if current_line:
-                    lines.append(sorted(current_line, key=lambda w: w['x0']))
-                current_line = [word]
-                current_y = word['top']
-
-        if current_line:
-            lines.append(sorted(current_line, key=lambda w: w['x0']))
+                merged.append(block)
 
-        return lines
+        return merged
 
-    def _group_lines_to_blocks(self, lines: List[List[Dict]]) -> List[Dict]:
+    def _merge_into(self, target: Dict, block: Dict):
         """
-        تجميع السطور في كتل
+        إلحاق كلمات وسطور كتلة بالكتلة السابقة وتحديث نصها وإطارها وبياناتها
         """
-        blocks = []
-        current_block_lines = []
-        current_block_y = None
+        target['words'].extend(block['words'])
+        target['lines'].extend(block['lines'])
+        target['text'] = f"{target['text']} {block['text']}"
+        x0, top, x1, bottom = target['bbox']
+        bx0, btop, bx1, bbottom = block['bbox']
+        target['bbox'] = [min(x0, bx0), min(top, btop), max(x1, bx1), max(bottom, bbottom)]
+        target['language'] = self._detect_text_language(target['text'])
+        metadata = target['metadata']
+        metadata['word_count'] = len(target['words'])
+        metadata['line_count'] = len(target['lines'])
+
+        # الكتلة المدموجة لم تعد موجودة؛ نسخة الهدف في الذاكرة المؤقتة تُحدَّث
+        self._cached_blocks.pop(block['block_id'], None)
+        self._add_to_cache(target['block_id'], target)
 
-        for line in lines:
-            if not line:
-                continue
-
-            if current_block_y is None:
-                current_block_y = line[0]['top']
-                current_block_lines = [line]
-            elif abs(line[0]['top'] - current_block_y) <= self.config['merge_distance']:
-                current_block_lines.append(line)
-            else:
-                if current_block_lines:
-                    block = self._create_block_from_lines(current_block_lines)
-                    if block:
-                        blocks.append(block)
-                current_block_lines = [line]
-                current_block_y = line[0]['top']
-
-        if current_block_lines:
-            block = self._create_block_from_lines(current_block_lines)
-            if block:
-                blocks.append(block)
-
-        return blocks
-    
     def _clean_text(self, text: str) -> str:
         """
         تنظيف وتحسين النص
         """
-        try:
-            # إزالة المسافات الزائدة
-            text = ' '.join(text.split())
-            
-            # تنظيف الأحرف الخاصة
-            text = re.sub(r'[\x00-\x08\x0b\x0c\x0e-\x1f\x7f-\x9f]', '', text)
-            
-            # تحسين علامات الشطرنج
-            text = text.replace('0-0', 'O-O')  # تصحيح التحصين
-            text = text.replace('0-0-0', 'O-O-O')
-            
-            return text.strip()
-        except Exception as e:
-            self.logger.error(f"خطأ في تنظيف النص: {str(e)}")
-            return text
+        # إزالة المسافات الزائدة
+        text = ' '.join(text.split())
+        
+        # تنظيف الأحرف الخاصة
+        text = text.translate(_CTRL_TABLE)
+        
+        # تحسين علامات الشطرنج (الأطول أولاً حتى لا يصبح 0-0-0 هو O-O-0)
+        text = text.replace('0-0-0', 'O-O-O')
+        text = text.replace('0-0', 'O-O')  # تصحيح التحصين
+        
+        return text.strip()
 
-    def _create_block_from_lines(self, lines: List[List[Dict]]) -> Dict:
+    def _detect_text_language(self, text: str) -> str:
         """
-        إنشاء كتلة من مجموعة سطور
+        كشف لغة نص الكتلة مع تجاوز الكاشف الكامل في الحالات الواضحة
         """
-        try:
-            all_words = [word for line in lines for word in line]
-            if not all_words:
-                return None
-
-            # تجميع النص
-            text = ' '.join(
-                ' '.join(w['text'] for w in line)
-                for line in lines
-            )
+        # أي حرف عربي يكفي، والنصوص القصيرة (نتائج الكاشف عليها غير موثوقة) أو ASCII إنجليزية
+        if _ARABIC_RE.search(text):
+            return 'ar'
+        if len(text) < 20 or text.isascii():
+            return 'en'
+        return _detect_cached(text)
+
+    def _create_block_from_lines(self, lines: List[List[Dict]], is_chess: bool = None) -> Dict:
+        """
+        إنشاء كتلة من مجموعة سطور (is_chess: محسوبة مسبقاً أثناء تجميع السطور إن وُجدت)
+        """
+        all_words = [word for line in lines for word in line]
+        if not all_words:
+            return None
+        if is_chess is None:
+            is_chess = any(w.get('is_chess', False) for w in all_words)
 
-            # حساب الإطار المحيط
-            bbox = self._calculate_bbox(all_words)
-            
-            # إنشاء معرف فريد للكتلة
-            block_id = f"block_{self.current_page}_{len(self._cached_blocks)}_{datetime.utcnow().strftime('%H%M%S')}"
-
-            # إنشاء الكتلة
-            block = {
-                'block_id': block_id,
-                'text': text,
-                'bbox': bbox,
-                'font': all_words[0].get('fontname', ''),
-                'size': all_words[0].get('size', 0),
-                'language': self._get_dominant_language(all_words),
-                'page_number': self.current_page,
-                'words': all_words,
-                'lines': lines,
-                'metadata': {
-                    'word_count': len(all_words),
-                    'line_count': len(lines),
-                    'creation_time': datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S'),
-                    'is_chess': any(w.get('is_chess', False) for w in all_words)
-                }
+        # تجميع النص (السطور غير فارغة، فربط كل الكلمات مرة واحدة يعطي النتيجة نفسها)
+        text = ' '.join([w['text'] for w in all_words])
+
+        # حساب الإطار المحيط
+        bbox = self._calculate_bbox(all_words)
+        
+        # إنشاء معرف فريد للكتلة
+        block_id = next(self._next_block_id)
+
+        # إنشاء الكتلة
+        block = {
+            'block_id': block_id,
+            'text': text,
+            'bbox': bbox,
+            'font': all_words[0].get('fontname', ''),
+            'size': all_words[0].get('size', 0),
+            'language': self._detect_text_language(text),
+            'page_number': self.current_page,
+            'words': all_words,
+            'lines': lines,
+            'metadata': {
+                'word_count': len(all_words),
+                'line_count': len(lines),
+                'creation_time': self._page_timestamp,
+                'is_chess': is_chess
             }
+        }
 
-            # تخزين في الذاكرة المؤقتة
-            self._add_to_cache(block_id, block)
+        # تخزين في الذاكرة المؤقتة
+        self._add_to_cache(block_id, block)
 
-            return block
+        return block
 
-        except Exception as e:
-            self.logger.error(f"خطأ في إنشاء الكتلة: {str(e)}")
-            return None
\ No newline at end of file
+    def _calculate_bbox(self, words: List[Dict]) -> List[float]:
+        """
+        حساب الإطار المحيط للكلمات في مرور واحد بدلاً من أربع دورات min/max
+        """
+        if not words:
+            return [0, 0, 0, 0]
+        first = words[0]
+        x0, top, x1, bottom = first['x0'], first['top'], first['x1'], first['bottom']
+        for word in words:
+            if word['x0'] < x0:
+                x0 = word['x0']
+            if word['top'] < top:
+                top = word['top']
+            if word['x1'] > x1:
+                x1 = word['x1']
+            if word['bottom'] > bottom:
+                bottom = word['bottom']
+        return [x0, top, x1, bottom]
+
+    def _add_to_cache(self, block_id: int, block: Dict):
+        """
+        تخزين نسخة خفيفة من الكتلة (بدون الكلمات والسطور) مع حذف الأقدم عند تجاوز الحد
+        """
+        cache = self._cached_blocks
+        cache[block_id] = {
+            key: value for key, value in block.items()
+            if key not in ('words', 'lines')
+        }
+        cache.move_to_end(block_id)
+        max_size = self.config['max_cache_size']
+        while len(cache) > max_size:
+            cache.popitem(last=False)
+
+    def _analyze_blocks(self, blocks: List[Dict]) -> List[Dict]:
+        """
+        تصنيف الكتل (شطرنج أو نص) وتحديد ما يحتاج منها إلى ترجمة
+        """
+        ratio = self.config['chess_block_ratio']
+        cache = self._cached_blocks
+
+        for block in blocks:
+            words = block['words']
+            chess_elements = [w['text'] for w in words if w.get('is_chess', False)]
+            # كلمة شطرنج واحدة داخل فقرة لا تجعلها تدويناً؛ المعيار نسبة كلمات الشطرنج
+            block_type = 'chess' if words and len(chess_elements) >= ratio * len(words) else 'text'
+            block['type'] = block_type
+            block['needs_translation'] = block_type == 'text' and block['language'] == 'en'
+            block['metadata']['chess_elements'] = chess_elements
+
+            cached = cache.get(block['block_id'])
+            if cached is not None:
+                cached['type'] = block_type
+                cached['needs_translation'] = block['needs_translation']
+
+        return blocks
+
+    def _update_stats(self, blocks: List[Dict]):
+        """
+        تحديث الإحصائيات بكتل الصفحة المعالجة
+        """
+        stats = self.stats
+        chess_count = sum(1 for block in blocks if block['type'] == 'chess')
+        arabic_count = sum(1 for block in blocks if block['language'] == 'ar')
+        stats['total_blocks'] += len(blocks)
+        stats['processed_blocks'] += len(blocks)
+        stats['chess_blocks'] += chess_count
+        stats['text_blocks'] += len(blocks) - chess_count
+        stats['arabic_blocks'] += arabic_count
+        stats['english_blocks'] += sum(1 for block in blocks if block['language'] == 'en')
+
+    def get_stats(self) -> Dict:
+        """
+        نسخة من إحصائيات المعالجة
+        """
+        stats = dict(self.stats)
+        stats['cached_blocks'] = len(self._cached_blocks)
+        return stats
\ No newline at end of file